@@ -1,19 +1,239 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.utils.functional import cached_property
 
+from user.models import User
+
+from .deletion import schedule_deletion
 from .models import (
+    Comment,
+    DeletionJob,
     Post,
     PostLike,
+    Profile,
+    city_key,
 )
 
+CURSOR_VAR = "cursor"
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Counts at most `count_limit` rows. Past that an unfiltered table is
+    estimated from its highest primary key, and a filtered one is reported
+    as `count_limit`.
+    """
+
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list.order_by()
+        count = queryset[: self.count_limit + 1].count()
+        self.estimated = count > self.count_limit
+        if not self.estimated:
+            return count
+        # The default manager's own filter (hiding deleted rows) still counts
+        # as unfiltered.
+        if queryset.query.where == queryset.model._default_manager.all().query.where:
+            return queryset.aggregate(max_pk=Max("pk"))["max_pk"]
+        return self.count_limit
+
+
+class CursorChangeList(ChangeList):
+    """Changelist paged by `?cursor=<pk>` (keyset) instead of OFFSET pages."""
+
+    def get_results(self, request):
+        paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        self.cursor = getattr(request, "admin_cursor", None)
+        queryset = self.queryset
+        if self.cursor:
+            queryset = queryset.filter(pk__lt=self.cursor)
+        rows = list(queryset[: self.list_per_page + 1])
+
+        self.result_list = rows[: self.list_per_page]
+        self.next_cursor = (
+            self.result_list[-1].pk if len(rows) > self.list_per_page else None
+        )
+        self.result_count = paginator.count
+        self.estimated_count = paginator.estimated
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.can_show_all = False
+        self.multi_page = bool(self.cursor or self.next_cursor)
+        self.paginator = paginator
+
+    def get_ordering(self, request, queryset):
+        # Keyset paging needs one fixed order that matches the cursor.
+        return ["-pk"]
+
+    def next_page_query(self):
+        return self.get_query_string({CURSOR_VAR: self.next_cursor})
+
+    def first_page_query(self):
+        return self.get_query_string(remove=[CURSOR_VAR])
+
+
+class InputFilter(admin.SimpleListFilter):
+    """
+    Filter by a typed value instead of listing every distinct one. `clean`
+    turns the input into the indexed column's form; a value it rejects, with
+    ValueError or None, matches nothing.
+    """
+
+    template = "admin/input_filter.html"
+    lookup = None
+    clean = staticmethod(str)
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        try:
+            value = self.clean(self.value().strip())
+        except ValueError:
+            value = None
+        if value is None:
+            return queryset.none()
+        return queryset.filter(**{self.lookup: value})
+
+    def choices(self, changelist):
+        yield {
+            "other_params": {
+                name: value
+                for name, value in changelist.get_filters_params().items()
+                if name != self.parameter_name
+            },
+            "remove_query_string": changelist.get_query_string(
+                remove=[self.parameter_name]
+            ),
+        }
+
+
+def input_filter(title, parameter_name, lookup, clean=str):
+    return type(
+        f"{parameter_name.title()}InputFilter",
+        (InputFilter,),
+        {
+            "title": title,
+            "parameter_name": parameter_name,
+            "lookup": lookup,
+            "clean": staticmethod(clean),
+        },
+    )
+
+
+def email_filter(title, parameter_name, lookup):
+    # Emails are stored normalized, so the unique index answers an exact match.
+    return input_filter(title, parameter_name, lookup, User.objects.normalize_email)
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    """Changelist whose cost does not grow with the size of the table."""
+
+    change_list_template = "admin/cursor_change_list.html"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    sortable_by = ()
+    list_per_page = 50
+
+    def get_changelist(self, request, **kwargs):
+        return CursorChangeList
+
+    def changelist_view(self, request, extra_context=None):
+        # The cursor is not a field lookup, so keep it away from the filters.
+        # A malformed one starts over from the first page.
+        request.admin_cursor = None
+        if CURSOR_VAR in request.GET:
+            try:
+                request.admin_cursor = int(request.GET[CURSOR_VAR])
+            except ValueError:
+                pass
+            request.GET = request.GET.copy()
+            del request.GET[CURSOR_VAR]
+        return super().changelist_view(request, extra_context)
+
+
+class ScheduledDeletionMixin:
+    """Deletes by hiding the rows now and purging them in the background."""
+
+    def delete_model(self, request, obj):
+        schedule_deletion(obj, request.user)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            schedule_deletion(obj, request.user)
+
+
+@admin.register(Profile)
+class ProfileAdmin(ScheduledDeletionMixin, ScalableModelAdmin):
+    list_display = ["username", "user", "city"]
+    list_filter = [
+        input_filter("city", "city", "city_key", city_key),
+        email_filter("user email", "email", "user__email"),
+    ]
+    list_select_related = ["user"]
+    search_fields = ["username__istartswith"]
+    autocomplete_fields = ["user"]
+    raw_id_fields = ["following"]
+
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
-    list_display = ["title", "owner", "created_time"]
-    list_filter = ["title", "owner", "created_time"]
-    search_fields = ["title"]
+class PostAdmin(ScheduledDeletionMixin, ScalableModelAdmin):
+    list_display = ["title", "owner", "created_time", "is_published"]
+    list_filter = [email_filter("owner email", "owner", "owner__email")]
+    list_select_related = ["owner"]
+    date_hierarchy = "created_time"
+    search_fields = ["title__istartswith"]
+    autocomplete_fields = ["owner", "profile"]
 
 
 @admin.register(PostLike)
-class PostLikeAdmin(admin.ModelAdmin):
-    list_display = ["author", "post", "created_time"]
-    list_filter = ["author", "post", "created_time"]
+class PostLikeAdmin(ScalableModelAdmin):
+    list_display = ["author", "post", "status", "created_time"]
+    list_filter = [
+        email_filter("author email", "author", "author__email"),
+        input_filter("post id", "post", "post_id", int),
+    ]
+    list_select_related = ["author", "post"]
+    date_hierarchy = "created_time"
+    autocomplete_fields = ["author", "post"]
+
+
+@admin.register(Comment)
+class CommentAdmin(ScalableModelAdmin):
+    list_display = ["post", "user", "created_time"]
+    list_filter = [
+        email_filter("author email", "author", "user__email"),
+        input_filter("post id", "post", "post_id", int),
+    ]
+    list_select_related = ["user", "post"]
+    date_hierarchy = "created_time"
+    autocomplete_fields = ["user", "post"]
+
+
+@admin.register(DeletionJob)
+class DeletionJobAdmin(ScalableModelAdmin):
+    list_display = ["target", "object_id", "status", "deleted_rows", "created_time"]
+    list_filter = ["status"]
+    readonly_fields = [
+        "target",
+        "object_id",
+        "requested_by",
+        "status",
+        "deleted_rows",
+        "finished_time",
+    ]
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,199 @@
+"""
+Async versions of the hot read endpoints, for the ASGI deployment.
+
+Django 4.0 has no async ORM, so every query runs in a worker thread through
+`read()`; the point of these views is that independent queries of one request
+(count and page, comments and like counts, profile header and relationship
+flags) run at the same time instead of one after another.
+"""
+import asyncio
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count, Prefetch, prefetch_related_objects
+from django.http import JsonResponse
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from app.models import Comment, Post, PostLike, Profile
+from app.pagination import PyNetListPagination
+from app.ranking import FEED_ORDERINGS
+from app.permissions import HasProfilePermission
+from app.serializers import CountedPostSerializer, ProfileNoPostSerializer
+from app.views import profiles_with_posts, visible_posts
+from py_net.db.routers import choose_read_alias, read_alias
+
+
+def _in_worker(func, *args):
+    close_old_connections()
+    return func(*args)
+
+
+def read(func, *args):
+    """Run `func(*args)` in a thread; concurrently with other reads if enabled."""
+    if not settings.ASYNC_PARALLEL_READS:
+        return sync_to_async(func)(*args)
+    return sync_to_async(partial(_in_worker, func), thread_sensitive=False)(*args)
+
+
+def _authenticate(request):
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    user = result[0] if result else request.user
+    return user if user.is_authenticated else None
+
+
+def error(detail, status):
+    return JsonResponse({"detail": detail}, status=status)
+
+
+def page_params(request):
+    paginator = PyNetListPagination
+    try:
+        page = int(request.GET.get("page", 1))
+        size = int(request.GET.get(paginator.page_size_query_param, 0))
+    except ValueError:
+        return None, None
+    size = min(size, paginator.max_page_size) if size > 0 else paginator.page_size
+    return (page, size) if page > 0 else (None, None)
+
+
+def page_links(request, page, size, count):
+    url = request.build_absolute_uri()
+    next_link = None
+    if page * size < count:
+        next_link = replace_query_param(url, "page", page + 1)
+    previous_link = None
+    if page == 2:
+        previous_link = remove_query_param(url, "page")
+    elif page > 2:
+        previous_link = replace_query_param(url, "page", page - 1)
+    return next_link, previous_link
+
+
+def _like_counts(post_ids):
+    rows = (
+        PostLike.objects.filter(post_id__in=post_ids)
+        .values_list("post_id", "status")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    return {(post_id, status): count for post_id, status, count in rows}
+
+
+def _prefetch_comments(posts):
+    comments = Comment.objects.select_related("user__profile")
+    prefetch_related_objects(posts, Prefetch("comments", queryset=comments))
+
+
+async def serialize_posts(request, posts):
+    """PostSerializer output, with comments and like counts fetched together."""
+    post_ids = [post.id for post in posts]
+    like_counts, _ = await asyncio.gather(
+        read(_like_counts, post_ids), read(_prefetch_comments, posts)
+    )
+    serializer = CountedPostSerializer(
+        posts, many=True, context={"request": request, "like_counts": like_counts}
+    )
+    return await read(lambda: serializer.data)
+
+
+async def with_read_alias(request, view):
+    user = await read(_authenticate, request)
+    if user is None:
+        return error("Authentication credentials were not provided.", 401)
+    token = read_alias.set(await read(choose_read_alias, user))
+    try:
+        return await view(request, user)
+    finally:
+        read_alias.reset(token)
+
+
+async def _feed(request, user):
+    # PostViewSet's HasProfilePermission.
+    if not await read(hasattr, user, "profile"):
+        return error(HasProfilePermission.message, 403)
+    page, size = page_params(request)
+    if page is None:
+        return error("Invalid page.", 404)
+    queryset = visible_posts(user).select_related("owner")
+    ordering = FEED_ORDERINGS.get(request.GET.get("order"))
+    if ordering:
+        queryset = queryset.order_by(*ordering)
+    offset = (page - 1) * size
+    count, posts = await asyncio.gather(
+        read(queryset.count), read(lambda: list(queryset[offset : offset + size]))
+    )
+    if not posts and page > 1:
+        return error("Invalid page.", 404)
+    next_link, previous_link = page_links(request, page, size, count)
+    return JsonResponse(
+        {
+            "count": count,
+            "next": next_link,
+            "previous": previous_link,
+            "results": await serialize_posts(request, posts),
+        }
+    )
+
+
+async def feed(request):
+    """Async /api/post/: the user's feed, one page of PostSerializer data."""
+    if request.method != "GET":
+        return error(f'Method "{request.method}" not allowed.', 405)
+    return await with_read_alias(request, _feed)
+
+
+def _profile_header(request, pk):
+    profile = Profile.objects.filter(pk=pk).first()
+    if profile is None:
+        return None
+    return ProfileNoPostSerializer(profile, context={"request": request}).data
+
+
+def _follows(follower, followed):
+    return Profile.following.through.objects.filter(
+        **{f"from_profile__{k}": v for k, v in follower.items()},
+        **{f"to_profile__{k}": v for k, v in followed.items()},
+    ).exists()
+
+
+async def _profile_posts(request, pk):
+    posts = await read(
+        lambda: list(
+            Post.objects.filter(profile_id=pk, is_published=True).select_related(
+                "owner"
+            )[: PyNetListPagination.page_size]
+        )
+    )
+    return await serialize_posts(request, posts)
+
+
+async def _profile_detail(request, user, pk):
+    header, is_following, follows_you, with_posts, posts = await asyncio.gather(
+        read(_profile_header, request, pk),
+        read(_follows, {"user": user}, {"pk": pk}),
+        read(_follows, {"pk": pk}, {"user": user}),
+        read(profiles_with_posts, user, [pk]),
+        _profile_posts(request, pk),
+    )
+    if header is None:
+        return error("Not found.", 404)
+    data = {**header, "is_following": is_following, "follows_you": follows_you}
+    if pk in with_posts:
+        data["posts"] = posts
+    return JsonResponse(data)
+
+
+async def profile_detail(request, pk):
+    """Async /api/profile/<pk>/: header, relationship flags and first posts page."""
+    if request.method != "GET":
+        return error(f'Method "{request.method}" not allowed.', 405)
+    return await with_read_alias(
+        request, lambda request, user: _profile_detail(request, user, pk)
+    )
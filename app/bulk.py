@@ -0,0 +1,34 @@
+from django.db import connections, router
+
+
+def bulk_insert(model, objs, using=None, ignore_conflicts=False):
+    """
+    Insert fully prepared instances in as few statements as possible.
+
+    Unlike `bulk_create()` this skips every field's `pre_save()`, so
+    `auto_now_add` times and slugs (including the per-row uniqueness query
+    of AutoSlugField) must already be set on the instances. With
+    `ignore_conflicts` rows clashing with a unique key are skipped.
+
+    `bulk_create()` has no way to skip `pre_save()`: it would replace the
+    `created_time` of every loaded fixture row with the load time and query
+    once per profile for a slug. Hence the `raw` `_insert()`, the path
+    `loaddata` takes too; BulkInsertTests pins both differences.
+    """
+    if not objs:
+        return
+    using = using or router.db_for_write(model)
+    fields = [
+        field
+        for field in model._meta.local_concrete_fields
+        if not (field.primary_key and objs[0].pk is None)
+    ]
+    batch_size = max(connections[using].ops.bulk_batch_size(fields, objs), 1)
+    queryset = model._base_manager.using(using)
+    for start in range(0, len(objs), batch_size):
+        queryset._insert(
+            objs[start:start + batch_size],
+            fields=fields,
+            raw=True,
+            ignore_conflicts=ignore_conflicts,
+        )
@@ -0,0 +1,151 @@
+"""
+Deletion of users, profiles and posts in two steps.
+
+`schedule_deletion()` marks the row (and a user's profile) with `deleted_at`,
+which hides it from the default managers at once, and queues a DeletionJob.
+`purge()` then deletes everything that cascades from it, children first,
+`batch_size` rows per short transaction, counting them on the job as it goes,
+so even a prolific account never holds SQLite's write lock for long.
+"""
+import logging
+
+from django.apps import apps
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from app.models import Comment, DeletionJob, Notification, PostLike, Profile
+from app.notifications import recount_unread
+from app.ranking import recompute_scores
+from app.signals import recount_followers
+from py_net.db.transaction import atomic_immediate
+from user.models import User
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = 500
+# Tables referencing users from apps a role may leave out (the Celery worker
+# has no admin). The delete collector cannot see them, so their rows go by
+# hand before the users, or SQLite's foreign key check fails the purge.
+UNINSTALLED_USER_REFERENCES = (
+    ("django.contrib.admin", "django_admin_log", "user_id"),
+)
+
+
+def schedule_deletion(instance, requested_by=None):
+    """Hide a user, profile or post now and purge it in the background."""
+    from app.tasks import purge_deletion
+
+    now = timezone.now()
+    model = type(instance)
+    with atomic_immediate():
+        model._base_manager.filter(pk=instance.pk).update(deleted_at=now)
+        if model is User:
+            Profile._base_manager.filter(user=instance).update(deleted_at=now)
+        job = DeletionJob.objects.create(
+            target=model._meta.label_lower,
+            object_id=instance.pk,
+            requested_by=requested_by,
+        )
+    instance.deleted_at = now
+    transaction.on_commit(lambda: purge_deletion.delay(job.id))
+    return job
+
+
+def cascades(model):
+    """Relations whose rows go with a row of `model`."""
+    return [
+        relation
+        for relation in model._meta.get_fields(include_hidden=True)
+        if relation.auto_created
+        and not relation.concrete
+        and (relation.one_to_many or relation.one_to_one)
+        and relation.on_delete is models.CASCADE
+    ]
+
+
+def delete_uninstalled_references(user_ids):
+    deleted = 0
+    tables = None
+    for app, table, column in UNINSTALLED_USER_REFERENCES:
+        if apps.is_installed(app):
+            continue
+        if tables is None:
+            tables = connection.introspection.table_names()
+        if table in tables:
+            with connection.cursor() as cursor:
+                placeholders = ", ".join(["%s"] * len(user_ids))
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE {column} IN ({placeholders})",
+                    list(user_ids),
+                )
+                deleted += cursor.rowcount
+    return deleted
+
+
+class Purge:
+    def __init__(self, job, batch_size):
+        self.job = job
+        self.batch_size = batch_size
+        # Posts that lose likes or comments but stay, to be rescored, and
+        # profiles that lose followers and users that lose unread
+        # notifications, to be recounted.
+        self.touched_posts = set()
+        self.touched_profiles = set()
+        self.touched_inboxes = set()
+
+    def delete_rows(self, model, pks):
+        """Delete rows of `model` after everything that cascades from them."""
+        for relation in cascades(model):
+            children = relation.related_model._base_manager.filter(
+                **{f"{relation.field.name}__in": pks}
+            )
+            self.delete_batches(children)
+        if model in (Comment, PostLike):
+            rows = model._base_manager.filter(pk__in=pks)
+            self.touched_posts.update(rows.values_list("post_id", flat=True))
+        if model is Profile.following.through:
+            rows = model._base_manager.filter(pk__in=pks)
+            self.touched_profiles.update(rows.values_list("to_profile_id", flat=True))
+        if model is Notification:
+            rows = model._base_manager.filter(pk__in=pks, is_read=False)
+            self.touched_inboxes.update(rows.values_list("recipient_id", flat=True))
+        with atomic_immediate():
+            deleted = 0
+            if model is User:
+                deleted += delete_uninstalled_references(pks)
+            deleted += model._base_manager.filter(pk__in=pks).delete()[0]
+        DeletionJob.objects.filter(pk=self.job.pk).update(
+            deleted_rows=models.F("deleted_rows") + deleted,
+            updated_time=timezone.now(),
+        )
+
+    def delete_batches(self, queryset):
+        while pks := list(queryset.values_list("pk", flat=True)[: self.batch_size]):
+            self.delete_rows(queryset.model, pks)
+
+
+def purge(job_id, batch_size=PURGE_BATCH_SIZE):
+    """Run a DeletionJob; returns the number of rows it deleted."""
+    job = DeletionJob.objects.get(pk=job_id)
+    if job.status == DeletionJob.StatusChoices.DONE:
+        return job.deleted_rows
+    job.status = DeletionJob.StatusChoices.RUNNING
+    job.save(update_fields=["status", "updated_time"])
+    model = apps.get_model(job.target)
+    run = Purge(job, batch_size)
+    try:
+        run.delete_rows(model, [job.object_id])
+        recompute_scores(run.touched_posts)
+        recount_followers(run.touched_profiles)
+        recount_unread(run.touched_inboxes)
+    except Exception:
+        logger.exception("Deletion job %s failed", job.pk)
+        DeletionJob.objects.filter(pk=job.pk).update(
+            status=DeletionJob.StatusChoices.FAILED, updated_time=timezone.now()
+        )
+        raise
+    job.refresh_from_db()
+    job.status = DeletionJob.StatusChoices.DONE
+    job.finished_time = timezone.now()
+    job.save(update_fields=["status", "finished_time", "updated_time"])
+    return job.deleted_rows
@@ -0,0 +1,106 @@
+import gzip
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from app.models import Comment, Post, PostLike, Profile
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def export_querysets(user):
+    """`(type, queryset)` pairs of everything that belongs to the user."""
+    return (
+        (
+            "profile",
+            Profile.objects.filter(user=user).values(
+                "id", "username", "city", "birth_date", "avatar"
+            ),
+        ),
+        (
+            "post",
+            Post.objects.filter(owner=user)
+            .order_by("id")
+            .values(
+                "id",
+                "profile_id",
+                "title",
+                "content",
+                "image",
+                "video",
+                "created_time",
+                "publish_at",
+                "is_published",
+            ),
+        ),
+        (
+            "comment",
+            Comment.objects.filter(user=user)
+            .order_by("id")
+            .values("id", "post_id", "content", "created_time"),
+        ),
+        (
+            "like",
+            PostLike.objects.filter(author=user)
+            .order_by("id")
+            .values("id", "post_id", "status", "created_time"),
+        ),
+        (
+            "follow",
+            Profile.following.through.objects.filter(from_profile__user=user)
+            .order_by("id")
+            .values("to_profile_id"),
+        ),
+    )
+
+
+def export_lines(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the user's data as NDJSON lines, one database chunk at a time."""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for kind, queryset in export_querysets(user):
+        for row in queryset.iterator(chunk_size=chunk_size):
+            yield (encoder.encode({"type": kind, **row}) + "\n").encode()
+
+
+def export_storage():
+    """Archives live outside media storage; only their owner may download them."""
+    return FileSystemStorage(location=settings.EXPORT_ROOT)
+
+
+def new_archive_id():
+    return uuid.uuid4().hex
+
+
+def archive_name(user, archive_id):
+    return f"{user.id}/{archive_id}.ndjson.gz"
+
+
+def write_archive(user, name):
+    """Write a gzipped export to export storage without holding it in memory."""
+    with tempfile.TemporaryFile() as file:
+        with gzip.GzipFile(fileobj=file, mode="wb") as archive:
+            for line in export_lines(user):
+                archive.write(line)
+        file.seek(0)
+        return export_storage().save(name, File(file))
+
+
+def delete_old_archives(max_age=None):
+    """Delete archives older than `max_age`; returns how many went."""
+    storage = export_storage()
+    if not storage.exists(""):
+        return 0
+    threshold = timezone.now() - (max_age or settings.EXPORT_MAX_AGE)
+    deleted = 0
+    for directory in storage.listdir("")[0]:
+        for filename in storage.listdir(directory)[1]:
+            name = f"{directory}/{filename}"
+            if storage.get_modified_time(name) < threshold:
+                storage.delete(name)
+                deleted += 1
+    return deleted
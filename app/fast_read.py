@@ -0,0 +1,173 @@
+"""
+List pages read as `values()` rows instead of model instances.
+
+ModelSerializer builds an instance per row and walks its field objects, which
+on feed pages costs more than the SQL. For the serializers in SOURCES,
+`compile_serializer()` works out once where each field is found in a
+`values()` row and how its value is rendered; `FastRows` then builds the
+response dicts straight from the rows. The output is the serializer's, byte
+for byte (see app/tests/test_fast_read.py).
+"""
+from functools import lru_cache, partial
+
+from rest_framework import serializers
+
+from app.models import Comment, Post, PostLike
+from app.serializers import (
+    CommentSerializer,
+    PostSerializer,
+    ProfileNoPostSerializer,
+    ProfileSerializer,
+    count_related,
+)
+
+
+class Nested:
+    """A `many=True` field read from `queryset` rows pointing at the parent."""
+
+    def __init__(self, queryset, parent):
+        self.queryset = queryset
+        self.parent = parent
+
+
+def likes_of_status(status):
+    return count_related(PostLike.objects.filter(status=status), "post")
+
+
+# Fields without a plain model source, by serializer: a values() lookup, an
+# expression annotated under the field's name, or Nested rows.
+SOURCES = {
+    CommentSerializer: {
+        "post_title": "post__title",
+    },
+    PostSerializer: {
+        "comments": Nested(Comment.objects.all(), "post"),
+        "likes_count": likes_of_status(PostLike.StatusChoices.LIKE),
+        "unlikes_count": likes_of_status(PostLike.StatusChoices.UNLIKE),
+    },
+    ProfileSerializer: {
+        "posts": Nested(Post.objects.filter(is_published=True), "profile"),
+    },
+    ProfileNoPostSerializer: {},
+}
+
+# Their to_representation() returns the values() value unchanged.
+PLAIN_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+    serializers.ReadOnlyField,
+)
+
+
+def file_url(storage, request, name):
+    # FileField.to_representation() of the FieldFile a model instance holds.
+    if not name:
+        return None
+    url = storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class):
+    """
+    `{name: (lookup, expression, render)}` for the fields of `serializer_class`.
+    `render` is None for values passed through, a callable taking the request
+    and returning the value's renderer, or the Nested source of a list field.
+    """
+    sources = SOURCES[serializer_class]
+    model = serializer_class.Meta.model
+    compiled = {}
+    for name, field in serializer_class().fields.items():
+        source = sources.get(name)
+        if isinstance(source, Nested):
+            compiled[name] = ("pk", None, (source, field.child.__class__))
+        elif isinstance(source, str):
+            compiled[name] = (source, None, None)
+        elif source is not None:
+            compiled[name] = (name, source, None)
+        elif isinstance(field, serializers.FileField):
+            storage = model._meta.get_field(field.source).storage
+            compiled[name] = (
+                field.source,
+                None,
+                lambda request, storage=storage: partial(file_url, storage, request),
+            )
+        elif isinstance(field, PLAIN_FIELDS):
+            compiled[name] = (field.source.replace(".", "__"), None, None)
+        else:
+            render = field.to_representation
+            compiled[name] = (
+                field.source.replace(".", "__"),
+                None,
+                lambda request, render=render: render,
+            )
+    return compiled
+
+
+def reads_fast(serializer_class):
+    return serializer_class in SOURCES
+
+
+class FastRows:
+    """`serializer_class(..., many=True).data` for `names`, from values() rows."""
+
+    def __init__(self, serializer_class, names, request):
+        compiled = compile_serializer(serializer_class)
+        self.lookups = ["pk"]
+        self.annotations = {}
+        self.fields = []
+        self.nested = []
+        for name in names:
+            lookup, expression, render = compiled[name]
+            if expression is not None:
+                self.annotations[lookup] = expression
+            elif lookup not in self.lookups:
+                self.lookups.append(lookup)
+            if isinstance(render, tuple):
+                source, child = render
+                child_rows = FastRows(child, child.Meta.fields, request)
+                self.nested.append((name, source, child_rows))
+                render = None
+            elif render is not None:
+                render = render(request)
+            self.fields.append((name, lookup, render))
+
+    def values(self, queryset, *extra):
+        return queryset.values(*self.lookups, *extra, **self.annotations)
+
+    def group(self, source, parent_pks):
+        rows = list(
+            self.values(
+                source.queryset.filter(**{f"{source.parent}__in": parent_pks}),
+                source.parent,
+            )
+        )
+        groups = {}
+        for row, data in zip(rows, self.assemble(rows)):
+            groups.setdefault(row[source.parent], []).append(data)
+        return groups
+
+    def assemble(self, rows):
+        """Response dicts of `values()` rows."""
+        renders = {}
+        if self.nested and rows:
+            pks = [row["pk"] for row in rows]
+            for name, source, child_rows in self.nested:
+                groups = child_rows.group(source, pks)
+                renders[name] = lambda pk, groups=groups: groups.get(pk, [])
+        fields = [
+            (name, lookup, renders.get(name, render))
+            for name, lookup, render in self.fields
+        ]
+        data = []
+        for row in rows:
+            item = {}
+            for name, lookup, render in fields:
+                value = row[lookup]
+                if render is not None and value is not None:
+                    value = render(value)
+                item[name] = value
+            data.append(item)
+        return data
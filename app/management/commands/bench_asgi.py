@@ -0,0 +1,141 @@
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Count
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from app.management.commands.bench_endpoints import percentile
+from app.models import Profile
+
+# name: (sync URL, async URL)
+PAGES = {
+    "feed": (
+        lambda c: reverse("app:post-list"),
+        lambda c: reverse("app:async-feed"),
+    ),
+    "profile": (
+        lambda c: reverse("app:profile-detail", args=[c["star_id"]]),
+        lambda c: reverse("app:async-profile-detail", args=[c["star_id"]]),
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the sync (WSGI, thread per request) feed and profile endpoints "
+        "with their async (ASGI) versions under concurrent load"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=16)
+
+    def handle(self, *args, **options):
+        setup_test_environment(debug=False)
+        old_name = connection.settings_dict["NAME"]
+        # A file, not the in-memory test database: requests run in many threads.
+        with tempfile.TemporaryDirectory() as directory:
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(
+                directory, "bench.sqlite3"
+            )
+            connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            try:
+                call_command(
+                    "generate_social_data",
+                    users=options["users"],
+                    seed=options["seed"],
+                    stdout=StringIO(),
+                )
+                results = self.run(self.build_context(), options)
+            finally:
+                connections.close_all()
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+
+        self.stdout.write(
+            f"{'page':<10}{'stack':<7}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}"
+        )
+        for (page, stack), result in results.items():
+            self.stdout.write(
+                f"{page:<10}{stack:<7}{result['rps']:>9.1f}"
+                f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+            )
+
+    def build_context(self):
+        viewer = (
+            Profile.objects.annotate(follows=Count("following"))
+            .select_related("user")
+            .order_by("-follows", "id")
+            .first()
+        )
+        if viewer is None:
+            raise CommandError("generate_social_data created no profiles")
+        star = viewer.following.order_by("id").first() or viewer
+        token = RefreshToken.for_user(viewer.user).access_token
+        return {"star_id": star.id, "authorization": f"Bearer {token}"}
+
+    def run(self, context, options):
+        results = {}
+        for page, (sync_url, async_url) in PAGES.items():
+            results[page, "sync"] = self.run_sync(sync_url(context), context, options)
+            results[page, "async"] = asyncio.run(
+                self.run_async(async_url(context), context, options)
+            )
+        return results
+
+    def run_sync(self, url, context, options):
+        def call(i):
+            client = Client(HTTP_AUTHORIZATION=context["authorization"])
+            start = time.perf_counter()
+            response = client.get(url)
+            elapsed = time.perf_counter() - start
+            connections.close_all()
+            return response.status_code, elapsed
+
+        with ThreadPoolExecutor(options["concurrency"]) as pool:
+            start = time.perf_counter()
+            calls = list(pool.map(call, range(options["requests"])))
+            wall = time.perf_counter() - start
+        return self.summarize(url, calls, wall)
+
+    async def run_async(self, url, context, options):
+        client = AsyncClient()
+        limit = asyncio.Semaphore(options["concurrency"])
+
+        async def call():
+            async with limit:
+                start = time.perf_counter()
+                response = await client.get(
+                    url, authorization=context["authorization"]
+                )
+                return response.status_code, time.perf_counter() - start
+
+        start = time.perf_counter()
+        calls = await asyncio.gather(*(call() for _ in range(options["requests"])))
+        return self.summarize(url, calls, time.perf_counter() - start)
+
+    def summarize(self, url, calls, wall):
+        failed = [status for status, _ in calls if status != 200]
+        if failed:
+            raise CommandError(f"{url} returned {failed[0]}")
+        timings = [elapsed * 1000 for _, elapsed in calls]
+        return {
+            "rps": len(calls) / wall,
+            "p50_ms": statistics.median(timings),
+            "p95_ms": percentile(timings, 0.95),
+        }
@@ -0,0 +1,304 @@
+import json
+import statistics
+import time
+from dataclasses import dataclass, field
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from rest_framework.test import APIClient
+
+from app.management.commands.generate_social_data import EMAIL_DOMAIN, PASSWORD
+from app.models import Comment, Post, Profile
+
+BASELINE_PATH = settings.BASE_DIR / "benchmarks" / "endpoints.json"
+
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    url: object
+    data: object = field(default=None)
+
+    def request(self, client, context, i):
+        url = self.url(context, i) if callable(self.url) else self.url
+        data = self.data(context, i) if callable(self.data) else self.data
+        return getattr(client, self.method.lower())(url, data=data, format="json")
+
+
+ENDPOINTS = [
+    Endpoint("post-list", "GET", "/api/post/"),
+    Endpoint("post-search", "GET", "/api/post/?search=%23tag1"),
+    Endpoint("post-detail", "GET", lambda c, i: f"/api/post/{c['post_id']}/"),
+    Endpoint(
+        "post-create",
+        "POST",
+        "/api/post/",
+        lambda c, i: {"title": f"Benchmark {i}", "content": "Benchmark #bench"},
+    ),
+    Endpoint(
+        "post-update",
+        "PATCH",
+        lambda c, i: f"/api/post/{c['own_post_id']}/",
+        lambda c, i: {"content": f"Updated {i}"},
+    ),
+    Endpoint(
+        "postlike-create",
+        "POST",
+        lambda c, i: f"/api/post/{c['post_ids'][i]}/postlike/create/",
+        {"status": "LIKE"},
+    ),
+    Endpoint(
+        "comment-create",
+        "POST",
+        lambda c, i: f"/api/post/{c['post_id']}/comment/create/",
+        {"content": "Benchmark comment"},
+    ),
+    Endpoint("comment-list", "GET", "/api/comment/"),
+    Endpoint(
+        "comment-detail", "GET", lambda c, i: f"/api/comment/{c['comment_id']}/"
+    ),
+    Endpoint("liked-posts", "GET", "/api/posts/liked/"),
+    Endpoint("profile-list", "GET", "/api/profile/"),
+    Endpoint(
+        "profile-detail", "GET", lambda c, i: f"/api/profile/{c['star_id']}/"
+    ),
+    Endpoint("profile-search", "GET", "/api/profile/search/user1/"),
+    Endpoint(
+        "profile-follow",
+        "POST",
+        lambda c, i: f"/api/profile/{c['profile_ids'][i]}/follow/",
+    ),
+    Endpoint(
+        "profile-followers",
+        "GET",
+        lambda c, i: f"/api/profile/{c['star_id']}/followers/",
+    ),
+    Endpoint(
+        "profile-directory",
+        "GET",
+        "/api/profile/directory/?city=Kyiv&min_age=18&max_age=40",
+    ),
+    Endpoint(
+        "profile-following",
+        "GET",
+        lambda c, i: f"/api/profile/{c['viewer_profile_id']}/following/",
+    ),
+    Endpoint(
+        "user-register",
+        "POST",
+        "/api/user/register/",
+        lambda c, i: {"email": f"bench{i}@{EMAIL_DOMAIN}", "password": PASSWORD},
+    ),
+    Endpoint(
+        "user-token",
+        "POST",
+        "/api/user/token/",
+        lambda c, i: {"email": c["viewer_email"], "password": PASSWORD},
+    ),
+    Endpoint(
+        "user-token-refresh",
+        "POST",
+        "/api/user/token/refresh/",
+        lambda c, i: {"refresh": c["refresh"]},
+    ),
+    Endpoint(
+        "user-token-verify",
+        "POST",
+        "/api/user/token/verify/",
+        lambda c, i: {"token": c["access"]},
+    ),
+    Endpoint("user-me", "GET", "/api/user/me/"),
+]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every API endpoint against synthetic datasets of several sizes "
+        "and compare latency and query counts with a stored baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", default="100,1000", help="Comma-separated user counts"
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--baseline", default=str(BASELINE_PATH))
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Store this run as the new baseline",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=1.5,
+            help="Allowed p50 slowdown before a result counts as a regression",
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",")]
+        results = {}
+        # Like the test runner: no debug toolbar, no technical error pages.
+        setup_test_environment(debug=False)
+        try:
+            for size in sizes:
+                results[str(size)] = self.run_size(size, options)
+        finally:
+            teardown_test_environment()
+
+        self.report(results)
+        if options["save_baseline"]:
+            with open(options["baseline"], "w") as file:
+                json.dump(results, file, indent=2, sort_keys=True)
+                file.write("\n")
+            self.stdout.write(self.style.SUCCESS(f"Saved {options['baseline']}"))
+            return
+
+        regressions = self.compare(results, options)
+        if regressions:
+            raise CommandError("Regressions:\n" + "\n".join(regressions))
+
+    def run_size(self, size, options):
+        """Benchmark one dataset size in a throwaway test database."""
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            call_command(
+                "generate_social_data",
+                users=size,
+                seed=options["seed"],
+                stdout=StringIO(),
+            )
+            client = APIClient()
+            context = self.build_context(client, options["repeat"] + 1)
+            return {
+                endpoint.name: self.run_endpoint(
+                    endpoint, client, context, options["repeat"]
+                )
+                for endpoint in ENDPOINTS
+            }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def build_context(self, client, calls):
+        viewer = (
+            Profile.objects.annotate(follows=Count("following"))
+            .select_related("user")
+            .order_by("-follows", "id")
+            .first()
+        )
+        star = Profile.objects.order_by("-followers_count", "id").first()
+        visible = Post.objects.filter(profile__in=viewer.following.all())
+        liked = viewer.user.postlikes.values("post_id")
+        post_ids = list(
+            visible.exclude(id__in=liked).values_list("id", flat=True)[:calls]
+        )
+        profile_ids = list(
+            Profile.objects.exclude(id=viewer.id)
+            .exclude(id__in=viewer.following.values("id"))
+            .values_list("id", flat=True)[:calls]
+        )
+        own_post = Post.objects.filter(profile=viewer).first()
+        if own_post is None:
+            own_post = Post.objects.create(
+                owner=viewer.user,
+                profile=viewer,
+                title="Benchmark",
+                content="Benchmark",
+            )
+        tokens = client.post(
+            "/api/user/token/",
+            {"email": viewer.user.email, "password": PASSWORD},
+            format="json",
+        ).data
+        client.force_authenticate(viewer.user)
+        return {
+            "viewer_email": viewer.user.email,
+            "viewer_profile_id": viewer.id,
+            "star_id": star.id,
+            "post_id": post_ids[0],
+            "post_ids": post_ids,
+            "own_post_id": own_post.id,
+            "comment_id": Comment.objects.filter(post__in=visible).first().id,
+            "profile_ids": profile_ids,
+            "access": tokens["access"],
+            "refresh": tokens["refresh"],
+        }
+
+    def run_endpoint(self, endpoint, client, context, repeat):
+        endpoint.request(client, context, 0)
+        timings = []
+        queries = None
+        for i in range(1, repeat + 1):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = endpoint.request(client, context, i)
+                timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                raise CommandError(
+                    f"{endpoint.name} returned {response.status_code}: "
+                    f"{getattr(response, 'data', response.content)}"
+                )
+            if queries is None:
+                queries = len(captured)
+        return {
+            "p50_ms": round(statistics.median(timings), 2),
+            "p99_ms": round(percentile(timings, 0.99), 2),
+            "queries": queries,
+        }
+
+    def report(self, results):
+        for size, endpoints in results.items():
+            self.stdout.write(f"\n{size} users")
+            self.stdout.write(
+                f"{'endpoint':<22}{'p50 ms':>10}{'p99 ms':>10}{'queries':>9}"
+            )
+            for name, result in endpoints.items():
+                self.stdout.write(
+                    f"{name:<22}{result['p50_ms']:>10.2f}"
+                    f"{result['p99_ms']:>10.2f}{result['queries']:>9}"
+                )
+
+    def compare(self, results, options):
+        try:
+            with open(options["baseline"]) as file:
+                baseline = json.load(file)
+        except FileNotFoundError:
+            self.stdout.write(f"No baseline at {options['baseline']}")
+            return []
+
+        regressions = []
+        for size, endpoints in results.items():
+            for name, result in endpoints.items():
+                previous = baseline.get(size, {}).get(name)
+                if previous is None:
+                    continue
+                if result["queries"] > previous["queries"]:
+                    regressions.append(
+                        f"{size} users {name}: {result['queries']} queries "
+                        f"(baseline {previous['queries']})"
+                    )
+                if result["p50_ms"] > previous["p50_ms"] * options["tolerance"]:
+                    regressions.append(
+                        f"{size} users {name}: p50 {result['p50_ms']} ms "
+                        f"(baseline {previous['p50_ms']} ms)"
+                    )
+        return regressions
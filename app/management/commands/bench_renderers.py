@@ -0,0 +1,102 @@
+import statistics
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from app.models import Profile
+from app.renderers import MessagePackRenderer, ORJSONRenderer
+
+RENDERERS = {
+    "json (stdlib)": JSONRenderer,
+    "json (orjson)": ORJSONRenderer,
+    "msgpack": MessagePackRenderer,
+}
+PAGES = {
+    "feed": "/api/post/?page={page}",
+    "ranked feed": "/api/post/?order=ranked&page={page}",
+    "profiles": "/api/profile/?page={page}",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare encode time and payload size of the response renderers on "
+        "feed and profile pages of a synthetic dataset"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--pages", type=int, default=5)
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options):
+        setup_test_environment(debug=False)
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            call_command(
+                "generate_social_data",
+                users=options["users"],
+                seed=options["seed"],
+                stdout=StringIO(),
+            )
+            pages = self.fetch_pages(options["pages"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(f"{'page':<13}{'renderer':<15}{'p50 us':>10}{'bytes':>10}")
+        for name, datas in pages.items():
+            for renderer_name, renderer_class in RENDERERS.items():
+                timings, size = self.encode(renderer_class(), datas, options)
+                self.stdout.write(
+                    f"{name:<13}{renderer_name:<15}"
+                    f"{statistics.median(timings):>10.1f}{size:>10}"
+                )
+
+    def fetch_pages(self, count):
+        """Response data of the first `count` pages, as the viewer sees them."""
+        viewer = (
+            Profile.objects.annotate(follows=Count("following"))
+            .select_related("user")
+            .order_by("-follows", "id")
+            .first()
+        )
+        if viewer is None:
+            raise CommandError("generate_social_data created no profiles")
+        viewer.user.is_staff = True
+        client = APIClient()
+        client.force_authenticate(viewer.user)
+        pages = {}
+        for name, url in PAGES.items():
+            datas = []
+            for page in range(1, count + 1):
+                response = client.get(url.format(page=page))
+                if response.status_code == 404:
+                    break
+                if response.status_code != 200:
+                    raise CommandError(f"{url} returned {response.status_code}")
+                datas.append(response.data)
+            pages[name] = datas
+        return pages
+
+    def encode(self, renderer, datas, options):
+        """Per-page encode times in microseconds and the mean payload size."""
+        timings, sizes = [], []
+        for data in datas:
+            start = time.perf_counter()
+            for _ in range(options["repeat"]):
+                content = renderer.render(data)
+            timings.append((time.perf_counter() - start) / options["repeat"] * 1e6)
+            sizes.append(len(content))
+        return timings, int(statistics.mean(sizes)) if sizes else 0
@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from py_net.db.backends.sqlite3.base import PRAGMAS
+
+SCHEMA = """
+CREATE TABLE post (id INTEGER PRIMARY KEY, title TEXT, created_time REAL);
+CREATE TABLE postlike (
+    id INTEGER PRIMARY KEY,
+    post_id INTEGER,
+    author_id INTEGER,
+    status TEXT,
+    UNIQUE (author_id, post_id)
+);
+CREATE INDEX postlike_post_status ON postlike (post_id, status);
+"""
+POSTS = 1000
+
+
+class Mode:
+    def __init__(self, name, pragmas, begin, persistent):
+        self.name = name
+        self.pragmas = pragmas
+        self.begin = begin
+        self.persistent = persistent
+
+    def connect(self, path):
+        conn = sqlite3.connect(path, isolation_level=None)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+
+MODES = [
+    Mode("default", {}, "BEGIN", persistent=False),
+    Mode("production", PRAGMAS, "BEGIN IMMEDIATE", persistent=True),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent read/write throughput of a plain SQLite setup "
+        "with the tuned production backend"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writers", type=int, default=4)
+        parser.add_argument("--seconds", type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'mode':<12}{'reads/s':>10}{'writes/s':>10}{'locked':>10}")
+        for mode in MODES:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "bench.db")
+                result = self.run_mode(mode, path, options)
+            self.stdout.write(
+                f"{mode.name:<12}{result['reads']:>10.0f}"
+                f"{result['writes']:>10.0f}{result['locked']:>10}"
+            )
+
+    def run_mode(self, mode, path, options):
+        conn = mode.connect(path)
+        conn.executescript(SCHEMA)
+        conn.executemany(
+            "INSERT INTO post (title, created_time) VALUES (?, ?)",
+            ((f"post {i}", time.time()) for i in range(POSTS)),
+        )
+        conn.close()
+
+        counters = {"reads": 0, "writes": 0, "locked": 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options["seconds"]
+
+        def worker(operation, counter, seed):
+            conn = mode.connect(path) if mode.persistent else None
+            i = 0
+            while time.monotonic() < deadline:
+                i += 1
+                current = conn or mode.connect(path)
+                try:
+                    operation(current, seed, i)
+                    key = counter
+                except sqlite3.OperationalError:
+                    if current.in_transaction:
+                        current.execute("ROLLBACK")
+                    key = "locked"
+                finally:
+                    if conn is None:
+                        current.close()
+                with lock:
+                    counters[key] += 1
+            if conn is not None:
+                conn.close()
+
+        def read(conn, seed, i):
+            post_id = (seed * 7919 + i) % POSTS + 1
+            conn.execute(
+                "SELECT COUNT(*) FROM postlike "
+                "WHERE post_id = ? AND status = 'LIKE'",
+                (post_id,),
+            ).fetchone()
+            conn.execute(
+                "SELECT id, title FROM post ORDER BY created_time DESC LIMIT 10"
+            ).fetchall()
+
+        def write(conn, seed, i):
+            # Same shape as PostLikeSerializer.validate() + save().
+            author_id = seed * 1_000_000 + i
+            post_id = i % POSTS + 1
+            conn.execute(mode.begin)
+            conn.execute(
+                "SELECT 1 FROM postlike WHERE author_id = ? AND post_id = ?",
+                (author_id, post_id),
+            ).fetchone()
+            conn.execute(
+                "INSERT INTO postlike (post_id, author_id, status) "
+                "VALUES (?, ?, 'LIKE')",
+                (post_id, author_id),
+            )
+            conn.execute("COMMIT")
+
+        threads = [
+            threading.Thread(target=worker, args=(read, "reads", n))
+            for n in range(options["readers"])
+        ] + [
+            threading.Thread(target=worker, args=(write, "writes", n))
+            for n in range(options["writers"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return {
+            "reads": counters["reads"] / options["seconds"],
+            "writes": counters["writes"] / options["seconds"],
+            "locked": counters["locked"],
+        }
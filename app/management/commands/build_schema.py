@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from py_net.schema import build_schema, committed_schema, generate_schema
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema artifact served at /api/schema/"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Fail if the committed schema or its version differ from the code",
+        )
+
+    def handle(self, *args, **options):
+        path = settings.SCHEMA_PATH
+        if options["check"]:
+            if committed_schema() != generate_schema():
+                raise CommandError(
+                    f"{path} is out of date, run `python manage.py build_schema`."
+                )
+            self.stdout.write(self.style.SUCCESS(f"{path} is up to date"))
+            return
+
+        build_schema()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
@@ -0,0 +1,301 @@
+import json
+import time
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.python import Deserializer
+from django.db import connection
+from django.utils import timezone
+from django.utils.text import slugify
+
+from app.bulk import bulk_insert
+from app.models import Comment, Post, PostLike, Profile, city_key
+from app.ranking import hot_score, recompute_scores
+from app.signals import (
+    MEDIA_FIELDS,
+    change_ref_count,
+    media_names,
+    recount_followers,
+)
+from py_net.db.transaction import atomic_immediate
+
+READ_SIZE = 1 << 16
+
+
+def profile_slugify(value):
+    return Profile._meta.get_field("slug").slugify(value)
+
+
+# model: (source field, slugify, first suffix) -- the same slugs that
+# Post.generate_unique_slug and Profile's AutoSlugField would produce.
+SLUG_SOURCES = {
+    Post: ("title", slugify, 1),
+    Profile: ("username", profile_slugify, 2),
+}
+
+
+def iter_json_array(file):
+    """Yield the objects of a top-level JSON array without reading it whole."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    eof = False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if not started and position < len(buffer):
+            if buffer[position] != "[":
+                raise DeserializationError("Expected a JSON array")
+            started = True
+            position += 1
+            continue
+        if started and position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise DeserializationError("Truncated JSON array")
+            chunk = file.read(READ_SIZE)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield record
+        position = end
+
+
+def iter_ndjson(file):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a fixture (JSON array or NDJSON, fixture_data.json format) in "
+        "large batches, bypassing per-object save()"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=("json", "ndjson"),
+            help="Defaults to ndjson for .ndjson/.jsonl files, json otherwise",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--transaction-size",
+            type=int,
+            default=100000,
+            help="Rows written per transaction",
+        )
+        parser.add_argument(
+            "--ignore-conflicts",
+            action="store_true",
+            help="Keep rows that already exist instead of failing on them",
+        )
+        parser.add_argument(
+            "--defer-indexes",
+            action="store_true",
+            help="Drop secondary indexes of loaded models and rebuild them afterwards",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or (
+            "ndjson" if path.endswith((".ndjson", ".jsonl")) else "json"
+        )
+        self.batch_size = options["batch_size"]
+        self.transaction_size = options["transaction_size"]
+        self.pending = defaultdict(list)
+        self.pending_rows = 0
+        self.loaded = Counter()
+        self.media_names = Counter()
+        self.engaged_post_ids = set()
+        self.followed_ids = set()
+        self.slugs = {}
+        self.seen_models = set()
+        self.dropped_indexes = []
+        self.defer_indexes = options["defer_indexes"]
+        self.ignore_conflicts = options["ignore_conflicts"]
+        self.now = timezone.now()
+
+        start = time.perf_counter()
+        with open(path) as file:
+            records = iter_ndjson(file) if fmt == "ndjson" else iter_json_array(file)
+            try:
+                with connection.constraint_checks_disabled():
+                    self.load(Deserializer(records, ignorenonexistent=True))
+            finally:
+                self.restore_indexes()
+
+        for model, count in self.loaded.items():
+            self.stdout.write(f"{model._meta.label}: {count}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {sum(self.loaded.values())} rows "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+        )
+
+    def load(self, objects):
+        objects = iter(objects)
+        while True:
+            with atomic_immediate():
+                for deserialized in objects:
+                    self.add(deserialized)
+                    if self.pending_rows >= self.transaction_size:
+                        break
+                else:
+                    self.flush()
+                    self.update_counters()
+                    self.check_constraints()
+                    self.reset_sequences()
+                    return
+                self.flush()
+
+    def add(self, deserialized):
+        obj = deserialized.object
+        model = type(obj)
+        if model not in self.seen_models:
+            self.seen_models.add(model)
+            if self.defer_indexes:
+                self.drop_indexes(model)
+        self.prepare(obj)
+        self.queue(model, obj)
+        if model in MEDIA_FIELDS:
+            self.media_names.update(media_names(obj))
+        if model in (PostLike, Comment):
+            self.engaged_post_ids.add(obj.post_id)
+
+        for name, targets in (deserialized.m2m_data or {}).items():
+            if obj.pk is None:
+                raise CommandError(f"{model._meta.label} rows with m2m data need pks")
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            if through is Profile.following.through:
+                self.followed_ids.update(targets)
+            self.queue(
+                through,
+                *(
+                    through(
+                        **{
+                            field.m2m_column_name(): obj.pk,
+                            field.m2m_reverse_name(): target,
+                        }
+                    )
+                    for target in targets
+                ),
+            )
+
+    def prepare(self, obj):
+        """Do in memory what `save()` and `pre_save()` would do per row."""
+        for field in obj._meta.local_concrete_fields:
+            auto = getattr(field, "auto_now", False) or getattr(
+                field, "auto_now_add", False
+            )
+            if auto and getattr(obj, field.attname) is None:
+                setattr(obj, field.attname, self.now)
+        if isinstance(obj, Post):
+            obj.score = hot_score(obj.engagement, obj.created_time)
+        if isinstance(obj, Profile):
+            obj.city_key = city_key(obj.city)
+        source = SLUG_SOURCES.get(type(obj))
+        if source and not obj.slug:
+            obj.slug = self.unique_slug(type(obj), *source, obj)
+        elif source:
+            self.taken_slugs(type(obj)).add(obj.slug)
+
+    def taken_slugs(self, model):
+        if model not in self.slugs:
+            self.slugs[model] = set(
+                model._base_manager.values_list("slug", flat=True).iterator()
+            )
+        return self.slugs[model]
+
+    def unique_slug(self, model, source, slugify_function, first_suffix, obj):
+        taken = self.taken_slugs(model)
+        base = slug = slugify_function(getattr(obj, source))
+        index = first_suffix
+        while slug in taken:
+            slug = f"{base}-{index}"
+            index += 1
+        taken.add(slug)
+        return slug
+
+    def queue(self, model, *objs):
+        batch = self.pending[model]
+        batch.extend(objs)
+        self.pending_rows += len(objs)
+        if len(batch) >= self.batch_size:
+            self.insert(model)
+
+    def insert(self, model):
+        batch = self.pending.pop(model, [])
+        with_pk = [obj for obj in batch if obj.pk is not None]
+        without_pk = [obj for obj in batch if obj.pk is None]
+        bulk_insert(model, with_pk, ignore_conflicts=self.ignore_conflicts)
+        bulk_insert(model, without_pk, ignore_conflicts=self.ignore_conflicts)
+        self.loaded[model] += len(batch)
+
+    def flush(self):
+        for model in list(self.pending):
+            self.insert(model)
+        self.pending_rows = 0
+
+    def update_counters(self):
+        """
+        Count media references in one UPDATE per count, not one per row,
+        rescore the posts that got likes or comments and recount the followers
+        of followed profiles.
+        """
+        by_count = defaultdict(list)
+        for name, count in self.media_names.items():
+            by_count[count].append(name)
+        for count, names in by_count.items():
+            change_ref_count(names, count)
+        recompute_scores(self.engaged_post_ids)
+        recount_followers(self.followed_ids)
+
+    def check_constraints(self):
+        connection.check_constraints(
+            table_names=[model._meta.db_table for model in self.loaded]
+        )
+
+    def reset_sequences(self):
+        statements = connection.ops.sequence_reset_sql(no_style(), list(self.loaded))
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def drop_indexes(self, model):
+        # Plain SQL: the SQLite schema editor would check every foreign key in
+        # the database on exit, which is the cost this option avoids.
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for index in model._meta.indexes:
+                cursor.execute(str(index.remove_sql(model, editor)))
+                self.dropped_indexes.append((model, index))
+
+    def restore_indexes(self):
+        if not self.dropped_indexes:
+            return
+        start = time.perf_counter()
+        editor = connection.schema_editor()
+        with atomic_immediate(), connection.cursor() as cursor:
+            for model, index in self.dropped_indexes:
+                existing = connection.introspection.get_constraints(
+                    cursor, model._meta.db_table
+                )
+                # A failed load rolls back the drops of its last transaction.
+                if index.name not in existing:
+                    cursor.execute(str(index.create_sql(model, editor)))
+        self.stdout.write(
+            f"Rebuilt {len(self.dropped_indexes)} indexes "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
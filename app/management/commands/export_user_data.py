@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.export import export_lines
+from user.models import User
+
+
+class Command(BaseCommand):
+    help = "Stream all data of a user as NDJSON to stdout or a file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("email")
+        parser.add_argument("--output", help="File to write instead of stdout")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options["email"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}.")
+
+        if options["output"]:
+            with open(options["output"], "wb") as file:
+                file.writelines(export_lines(user))
+        else:
+            for line in export_lines(user):
+                self.stdout.write(line.decode(), ending="")
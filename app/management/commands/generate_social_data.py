@@ -0,0 +1,199 @@
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from app.bulk import bulk_insert
+from app.models import Comment, Post, PostLike, Profile, city_key
+from app.ranking import recompute_scores
+from user.models import User
+
+EMAIL_DOMAIN = "synthetic.py-net.test"
+PASSWORD = "synthetic-password"
+HASHTAGS = 200
+WORDS = (
+    "coffee morning city travel music sunset friends weekend code python "
+    "mountains books football dinner photo beach rain concert garden"
+).split()
+
+
+def zipf_weights(count, exponent):
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic social graph: users, profiles, a "
+        "power-law follow graph, posts with hashtags, Zipf-distributed likes "
+        "and comments"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--avg-follows", type=int, default=20)
+        parser.add_argument("--avg-posts", type=int, default=5)
+        parser.add_argument("--avg-likes", type=int, default=10)
+        parser.add_argument("--avg-comments", type=int, default=3)
+        parser.add_argument(
+            "--end",
+            default="2024-01-01T00:00:00",
+            help="Timestamp of the newest generated post (UTC)",
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete previously generated users and everything they own",
+        )
+
+    def handle(self, *args, **options):
+        synthetic = User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}")
+        if options["clear"]:
+            synthetic.delete()
+        elif synthetic.exists():
+            raise CommandError("Synthetic data already exists, use --clear.")
+
+        self.rng = random.Random(options["seed"])
+        self.end = datetime.fromisoformat(options["end"]).replace(tzinfo=timezone.utc)
+        self.options = options
+        with transaction.atomic():
+            counts = self.generate(options["users"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                ", ".join(f"{count} {name}" for name, count in counts.items())
+            )
+        )
+
+    def next_id(self, model):
+        return (model._base_manager.aggregate(max_id=Max("id"))["max_id"] or 0) + 1
+
+    def sample_count(self, average):
+        """Heavy-tailed count with the given mean (Pareto, alpha=2)."""
+        return int(average / 2 * self.rng.paretovariate(2))
+
+    def generate(self, size):
+        rng = self.rng
+        password = make_password(PASSWORD)
+        joined = self.end - timedelta(days=365)
+
+        user_id = self.next_id(User)
+        users = [
+            User(
+                id=user_id + i,
+                email=f"user{user_id + i}@{EMAIL_DOMAIN}",
+                password=password,
+                is_active=True,
+                date_joined=joined,
+            )
+            for i in range(size)
+        ]
+        bulk_insert(User, users)
+
+        profile_id = self.next_id(Profile)
+        profiles = []
+        for i, user in enumerate(users):
+            city = rng.choice(("Kyiv", "Lviv", "Odesa", "Kharkiv", "Dnipro"))
+            age_in_days = rng.randrange(16 * 365, 70 * 365)
+            profiles.append(
+                Profile(
+                    id=profile_id + i,
+                    user_id=user.id,
+                    username=f"user{user.id}",
+                    slug=f"user{user.id}",
+                    city=city,
+                    city_key=city_key(city),
+                    birth_date=(self.end - timedelta(days=age_in_days)).date(),
+                )
+            )
+
+        # Preferential attachment: popular profiles (low rank) attract most follows.
+        popularity = zipf_weights(size, 1.0)
+        follows = []
+        for profile in profiles:
+            targets = set(
+                rng.choices(
+                    profiles,
+                    cum_weights=popularity,
+                    k=min(self.sample_count(self.options["avg_follows"]), size - 1),
+                )
+            )
+            targets.discard(profile)
+            follows.extend(
+                Profile.following.through(
+                    from_profile_id=profile.id, to_profile_id=target.id
+                )
+                for target in targets
+            )
+        followers = Counter(follow.to_profile_id for follow in follows)
+        for profile in profiles:
+            profile.followers_count = followers[profile.id]
+        bulk_insert(Profile, profiles)
+        bulk_insert(Profile.following.through, follows)
+
+        tag_weights = zipf_weights(HASHTAGS, 1.1)
+        post_id = self.next_id(Post)
+        posts = []
+        for user, profile in zip(users, profiles):
+            for _ in range(self.sample_count(self.options["avg_posts"])):
+                tags = rng.choices(range(HASHTAGS), cum_weights=tag_weights, k=2)
+                words = rng.sample(WORDS, 6)
+                minutes_ago = rng.randrange(30 * 24 * 60)
+                posts.append(
+                    Post(
+                        id=post_id,
+                        owner_id=user.id,
+                        profile_id=profile.id,
+                        title=" ".join(words[:3]).capitalize(),
+                        content=" ".join(words + [f"#tag{tag}" for tag in tags]),
+                        created_time=self.end - timedelta(minutes=minutes_ago),
+                        slug=f"synthetic-post-{post_id}",
+                    )
+                )
+                post_id += 1
+        bulk_insert(Post, posts)
+
+        # A few posts go viral: engagement follows a Zipf law over a shuffled
+        # order, scaled so the mean stays at --avg-likes / --avg-comments.
+        ranked = posts[:]
+        rng.shuffle(ranked)
+        harmonic = sum(1 / rank for rank in range(1, len(ranked) + 1))
+        likes, comments = [], []
+        for rank, post in enumerate(ranked, start=1):
+            scale = len(ranked) / rank / harmonic
+            like_count = min(int(self.options["avg_likes"] * scale), size)
+            for author in rng.sample(users, like_count):
+                likes.append(
+                    PostLike(
+                        author_id=author.id,
+                        post_id=post.id,
+                        status="UNLIKE" if rng.random() < 0.1 else "LIKE",
+                        created_time=post.created_time
+                        + timedelta(minutes=rng.randrange(1, 1440)),
+                    )
+                )
+            for _ in range(int(self.options["avg_comments"] * scale)):
+                comments.append(
+                    Comment(
+                        post_id=post.id,
+                        user_id=rng.choice(users).id,
+                        content=" ".join(rng.sample(WORDS, 4)),
+                        created_time=post.created_time
+                        + timedelta(minutes=rng.randrange(1, 1440)),
+                    )
+                )
+        bulk_insert(PostLike, likes)
+        bulk_insert(Comment, comments)
+        recompute_scores(post.id for post in posts)
+
+        return {
+            "users": len(users),
+            "follows": len(follows),
+            "posts": len(posts),
+            "likes": len(likes),
+            "comments": len(comments),
+        }
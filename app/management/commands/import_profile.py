@@ -0,0 +1,158 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+BUDGET_PATH = settings.BASE_DIR / "benchmarks" / "import_budgets.json"
+
+# What a process of each role does before it can serve its first unit of work.
+BOOT_SCRIPTS = {
+    "api": (
+        "import django; django.setup(); "
+        "from django.urls import get_resolver; get_resolver().url_patterns"
+    ),
+    "worker": (
+        "import django; django.setup(); "
+        "from py_net.celery import app; app.loader.import_default_modules()"
+    ),
+}
+BOOT_SCRIPTS["beat"] = BOOT_SCRIPTS["worker"]
+
+# Modules a role must never load at boot.
+FORBIDDEN = {
+    "api": ("django_celery_beat",),
+    "worker": (
+        "debug_toolbar",
+        "django.contrib.admin",
+        "django_celery_beat",
+        "drf_spectacular",
+    ),
+    "beat": ("debug_toolbar", "django.contrib.admin", "drf_spectacular"),
+}
+
+
+def profile_role(role):
+    """Boot a fresh interpreter as `role` and return `{module: self_us}`."""
+    env = dict(
+        os.environ,
+        PY_NET_ROLE=role,
+        # Booting never sends a task, but the non-"all" roles need a broker.
+        CELERY_BROKER_URL=os.environ.get("CELERY_BROKER_URL", "memory://"),
+        DJANGO_SETTINGS_MODULE=os.environ.get(
+            "DJANGO_SETTINGS_MODULE", "py_net.settings"
+        ),
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT_SCRIPTS[role]],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        raise CommandError(f"{role} failed to boot:\n{result.stderr[-2000:]}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        "Report what each startup role (api, worker, beat) imports and how long "
+        "it takes, and compare with the import budget"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--roles", default="api,worker,beat")
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument("--budget", default=str(BUDGET_PATH))
+        parser.add_argument(
+            "--save-budget",
+            action="store_true",
+            help="Store this run as the new budget",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=1.5,
+            help="Allowed import-time growth before it counts as a regression",
+        )
+        parser.add_argument(
+            "--module-slack",
+            type=int,
+            default=25,
+            help="Extra modules a role may import before it counts as a regression",
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        problems = []
+        for role in options["roles"].split(","):
+            runs = [profile_role(role) for _ in range(options["repeat"])]
+            modules = runs[0]
+            results[role] = {
+                "modules": len(modules),
+                "ms": round(
+                    statistics.median(sum(run.values()) for run in runs) / 1000, 1
+                ),
+            }
+            self.report(role, modules, results[role], options["top"])
+            problems += [
+                f"{role} imports {name}"
+                for name in FORBIDDEN[role]
+                if name in modules
+            ]
+
+        if options["save_budget"]:
+            with open(options["budget"], "w") as file:
+                json.dump(results, file, indent=2, sort_keys=True)
+                file.write("\n")
+            self.stdout.write(self.style.SUCCESS(f"Saved {options['budget']}"))
+        else:
+            problems += self.compare(results, options)
+        if problems:
+            raise CommandError("Import budget exceeded:\n" + "\n".join(problems))
+
+    def report(self, role, modules, result, top):
+        packages = Counter()
+        for name, self_us in modules.items():
+            packages[name.split(".")[0]] += self_us
+        self.stdout.write(
+            f"\n{role}: {result['modules']} modules, {result['ms']:.1f} ms"
+        )
+        for package, self_us in packages.most_common(top):
+            self.stdout.write(f"  {package:<28}{self_us / 1000:>8.1f} ms")
+
+    def compare(self, results, options):
+        try:
+            with open(options["budget"]) as file:
+                budget = json.load(file)
+        except FileNotFoundError:
+            self.stdout.write(f"No budget at {options['budget']}")
+            return []
+
+        regressions = []
+        for role, result in results.items():
+            allowed = budget.get(role)
+            if allowed is None:
+                continue
+            if result["modules"] > allowed["modules"] + options["module_slack"]:
+                regressions.append(
+                    f"{role}: {result['modules']} modules "
+                    f"(budget {allowed['modules']})"
+                )
+            if result["ms"] > allowed["ms"] * options["tolerance"]:
+                regressions.append(
+                    f"{role}: {result['ms']} ms (budget {allowed['ms']} ms)"
+                )
+        return regressions
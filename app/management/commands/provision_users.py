@@ -0,0 +1,62 @@
+import csv
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.management.commands.bulk_load import iter_ndjson
+from app.provisioning import PROVISION_BATCH_SIZE, Provisioning
+
+
+def iter_csv(file):
+    for row in csv.DictReader(file):
+        yield {name: value for name, value in row.items() if value}
+
+
+class Command(BaseCommand):
+    help = (
+        "Create accounts, and profiles for rows with a username, from a CSV "
+        "(email,password,username) or NDJSON file. Existing emails are "
+        "skipped, so an interrupted run can be repeated."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=("csv", "ndjson"),
+            help="Defaults to ndjson for .ndjson/.jsonl files, csv otherwise",
+        )
+        parser.add_argument("--batch-size", type=int, default=PROVISION_BATCH_SIZE)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Password hashing processes (default: PROVISIONING_WORKERS)",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or (
+            "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+        )
+        provisioning = Provisioning(options["batch_size"], options["workers"])
+        start = time.perf_counter()
+        with open(path, newline="") as file:
+            rows = iter_ndjson(file) if fmt == "ndjson" else iter_csv(file)
+            report = provisioning.run(rows, progress=self.progress)
+
+        for failure in report["failed"]:
+            self.stderr.write(f"Row {failure['row']}: {json.dumps(failure['errors'])}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {report['created']} users, skipped {report['existing']} "
+                f"existing, {len(report['failed'])} failed "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+        )
+
+    def progress(self, report):
+        self.stdout.write(
+            f"{report['created']} created, {report['existing']} existing, "
+            f"{len(report['failed'])} failed"
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from py_net.db.snapshots import snapshot_replicas
+
+
+class Command(BaseCommand):
+    help = "Refresh the SQLite read-replica snapshots from the primary database"
+
+    def handle(self, *args, **options):
+        for alias in snapshot_replicas():
+            self.stdout.write(self.style.SUCCESS(f"Refreshed {alias}"))
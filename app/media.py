@@ -0,0 +1,173 @@
+import mimetypes
+import os
+import posixpath
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# Content-hashed names never change their bytes, so they can be cached forever.
+IMMUTABLE_NAME_RE = re.compile(r"(^|/)[0-9a-f]{64}(\.[\w.]+)?$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+
+
+class RangedFile:
+    """File-like wrapper that stops reading after `length` bytes from `start`."""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def make_etag(statobj):
+    return f'"{statobj.st_mtime_ns:x}-{statobj.st_size:x}"'
+
+
+class UnsatisfiableRange(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """
+    Return `(start, end)` for a single byte range, or None for a header to
+    ignore: several ranges, or one that does not parse (RFC 7233, 3.1).
+    Raise UnsatisfiableRange for a valid range that selects no bytes.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            raise UnsatisfiableRange
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise UnsatisfiableRange
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
+
+
+def is_immutable(path):
+    return bool(IMMUTABLE_NAME_RE.search(path))
+
+
+def not_modified(request, etag, mtime):
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        return if_none_match.strip() == "*" or etag in parse_etags(if_none_match)
+    if_modified_since = parse_http_date_safe(
+        request.META.get("HTTP_IF_MODIFIED_SINCE", "")
+    )
+    return if_modified_since is not None and int(mtime) <= if_modified_since
+
+
+def range_applies(request, etag, mtime):
+    """An If-Range precondition only lets the range through when it still matches."""
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    if_range_date = parse_http_date_safe(if_range)
+    return if_range_date is not None and int(mtime) <= if_range_date
+
+
+def accel_response(path, content_type):
+    """Let the front proxy send the file (nginx X-Accel-Redirect or X-Sendfile)."""
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+        prefix = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip("/")
+        response.headers["X-Accel-Redirect"] = f"{prefix}/{path}"
+    else:
+        response.headers["X-Sendfile"] = safe_join(settings.MEDIA_ROOT, path)
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Endpoint to stream media files with conditional and byte-range support"""
+    path = posixpath.normpath(path).lstrip("/")
+    fullpath = Path(safe_join(settings.MEDIA_ROOT, path))
+    if not fullpath.is_file():
+        raise Http404("Media file does not exist.")
+
+    statobj = fullpath.stat()
+    etag = make_etag(statobj)
+    content_type, encoding = mimetypes.guess_type(str(fullpath))
+    content_type = content_type or "application/octet-stream"
+    cache_control = (
+        IMMUTABLE_CACHE_CONTROL if is_immutable(path) else DEFAULT_CACHE_CONTROL
+    )
+
+    if not_modified(request, etag, statobj.st_mtime):
+        response = HttpResponseNotModified()
+    elif settings.MEDIA_ACCEL_REDIRECT_PREFIX or settings.MEDIA_SENDFILE:
+        # The proxy handles Range and conditional requests itself.
+        response = accel_response(path, content_type)
+    else:
+        response = file_response(request, fullpath, statobj, etag, content_type)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(statobj.st_mtime)
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+def file_response(request, fullpath, statobj, etag, content_type):
+    size = statobj.st_size
+    range_header = request.META.get("HTTP_RANGE")
+    byte_range = None
+    if range_header and range_applies(request, etag, statobj.st_mtime):
+        try:
+            byte_range = parse_range(range_header, size)
+        except UnsatisfiableRange:
+            response = HttpResponse(status=416)
+            response.headers["Content-Range"] = f"bytes */{size}"
+            return response
+
+    if byte_range is None:
+        # FileResponse hands the real file object to wsgi.file_wrapper,
+        # which lets the server use sendfile().
+        response = FileResponse(fullpath.open("rb"), content_type=content_type)
+        response.headers["Accept-Ranges"] = "bytes"
+        return response
+
+    start, end = byte_range
+    length = end - start + 1
+    response = FileResponse(
+        RangedFile(fullpath.open("rb"), start, length),
+        status=206,
+        content_type=content_type,
+        filename=os.path.basename(fullpath),
+    )
+    response.headers["Content-Length"] = str(length)
+    response.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response.headers["Accept-Ranges"] = "bytes"
+    return response
@@ -0,0 +1,47 @@
+# Generated by Django 4.0.4 on 2026-10-19 13:20
+
+import app.models
+import app.storage
+from django.db import migrations, models
+import functools
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0025_auto_20230613_1350'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField()),
+                ('ref_count', models.IntegerField(default=0)),
+                ('created_time', models.DateTimeField(auto_now_add=True)),
+                ('updated_time', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=app.storage.get_media_storage, upload_to=functools.partial(app.models.post_image_file_path, *('posts',), **{})),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='video',
+            field=models.FileField(blank=True, null=True, storage=app.storage.get_media_storage, upload_to=''),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='avatar',
+            field=models.ImageField(blank=True, null=True, storage=app.storage.get_media_storage, upload_to=functools.partial(app.models.post_image_file_path, *('profiles',), **{}), verbose_name='Avatar'),
+        ),
+        migrations.AddIndex(
+            model_name='mediablob',
+            index=models.Index(fields=['ref_count', 'updated_time'], name='app_mediabl_ref_cou_37a3aa_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.0.4 on 2026-10-19 14:04
+
+import math
+
+from django.db import migrations, models
+from django.db.models import Count
+
+GRAVITY = 45000
+
+
+def score_posts(apps, schema_editor):
+    Post = apps.get_model('app', 'Post')
+    likes = dict(
+        apps.get_model('app', 'PostLike').objects.filter(status='LIKE')
+        .values_list('post_id').annotate(Count('id')).order_by()
+    )
+    comments = dict(
+        apps.get_model('app', 'Comment').objects
+        .values_list('post_id').annotate(Count('id')).order_by()
+    )
+    posts = []
+    for post in Post.objects.only('id', 'created_time').iterator():
+        post.engagement = likes.get(post.id, 0) + comments.get(post.id, 0)
+        post.score = (
+            math.log10(post.engagement + 1) + post.created_time.timestamp() / GRAVITY
+        )
+        posts.append(post)
+    Post.objects.bulk_update(posts, ['engagement', 'score'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0029_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='engagement',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(score_posts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['profile', '-score'], name='post_profile_score_idx'),
+        ),
+    ]
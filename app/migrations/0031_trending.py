@@ -0,0 +1,53 @@
+# Generated by Django 4.0.4 on 2026-10-19 14:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0030_post_ranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EngagementBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('POST', 'Post'), ('HASHTAG', 'Hashtag')], max_length=10)),
+                ('key', models.CharField(max_length=100)),
+                ('granularity', models.CharField(choices=[('MINUTE', 'Minute'), ('HOUR', 'Hour')], max_length=10)),
+                ('start', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('source', models.CharField(max_length=30, primary_key=True, serialize=False)),
+                ('last_id', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TrendingEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.CharField(max_length=3)),
+                ('kind', models.CharField(choices=[('POST', 'Post'), ('HASHTAG', 'Hashtag')], max_length=10)),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('key', models.CharField(max_length=100)),
+                ('count', models.PositiveIntegerField()),
+            ],
+            options={
+                'ordering': ['window', 'kind', 'rank'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='trendingentry',
+            constraint=models.UniqueConstraint(fields=('window', 'kind', 'rank'), name='trending_entry_rank_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='engagementbucket',
+            constraint=models.UniqueConstraint(fields=('kind', 'start', 'granularity', 'key'), name='engagement_bucket_unique'),
+        ),
+    ]
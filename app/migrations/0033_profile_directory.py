@@ -0,0 +1,84 @@
+# Generated by Django 4.0.4 on 2026-10-19 14:43
+
+import re
+import unicodedata
+from datetime import datetime
+
+from django.db import migrations, models
+from django.db.models import Count
+
+# Formats the free-form birth dates were entered in; anything else is dropped.
+BIRTH_DATE_FORMATS = ('%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y', '%d-%m-%Y')
+
+
+def parse_birth_date(value):
+    for date_format in BIRTH_DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), date_format).date().isoformat()
+        except ValueError:
+            pass
+    return None
+
+
+def city_key(city):
+    if not city:
+        return None
+    letters = ''.join(
+        char
+        for char in unicodedata.normalize('NFKD', city)
+        if not unicodedata.combining(char)
+    )
+    return ' '.join(re.sub(r'[\W_]+', ' ', letters.casefold()).split()) or None
+
+
+def type_profiles(apps, schema_editor):
+    # Birth dates become ISO strings here, which the DateField column takes.
+    Profile = apps.get_model('app', 'Profile')
+    followers = dict(
+        Profile.following.through.objects.values_list('to_profile_id')
+        .annotate(Count('id')).order_by()
+    )
+    profiles = []
+    for profile in Profile.objects.only('id', 'city', 'birth_date').iterator():
+        if profile.birth_date:
+            profile.birth_date = parse_birth_date(profile.birth_date)
+        profile.city_key = city_key(profile.city)
+        profile.followers_count = followers.get(profile.id, 0)
+        profiles.append(profile)
+    Profile.objects.bulk_update(
+        profiles, ['birth_date', 'city_key', 'followers_count'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0032_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='city_key',
+            field=models.CharField(blank=True, editable=False, max_length=63, null=True),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(type_profiles, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='profile',
+            name='birth_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['city_key', '-followers_count', '-id', 'birth_date'], name='profile_city_directory_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['-followers_count', '-id', 'birth_date'], name='profile_directory_idx'),
+        ),
+    ]
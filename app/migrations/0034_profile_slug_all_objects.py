@@ -0,0 +1,19 @@
+# Generated by Django 4.0.4 on 2026-10-19 15:00
+
+import autoslug.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0033_profile_directory'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='slug',
+            field=autoslug.fields.AutoSlugField(editable=False, manager_name='all_objects', populate_from='username', unique=True),
+        ),
+    ]
@@ -0,0 +1,158 @@
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from app.fast_read import FastRows, reads_fast
+from app.serializers import sparse_fieldset
+from py_net.db.routers import choose_read_alias, read_alias
+from py_net.instrumentation import timed_serialization
+
+
+# Serve safe requests of the view from a read replica when one is usable.
+# (A comment rather than a docstring: drf_spectacular would publish it as the
+# description of every operation of the view.)
+class ReplicaReadMixin:
+    def dispatch(self, request, *args, **kwargs):
+        token = read_alias.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            read_alias.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            read_alias.set(choose_read_alias(request.user))
+
+
+# Fit the read queryset to the fields a `?fields=` / `?omit=` request keeps:
+# relations and counts that are not rendered are neither prefetched nor
+# annotated.
+class SparseFieldsMixin:
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        return self.prepare_queryset(queryset, self.get_serializer_class())
+
+    def prepare_queryset(self, queryset, serializer_class):
+        if not hasattr(serializer_class, "prepare_queryset"):
+            return queryset
+        fields = sparse_fieldset(self.request, serializer_class.Meta.fields)
+        return serializer_class.prepare_queryset(queryset, fields)
+
+
+# List through app.fast_read when the serializer has a compiled values() form,
+# which leaves the queryset to list() rather than prepare_queryset().
+class FastListMixin(SparseFieldsMixin):
+    def fast_list(self, serializer_class):
+        return (
+            settings.FAST_LIST_READS
+            and self.request.method in SAFE_METHODS
+            and reads_fast(serializer_class)
+        )
+
+    def prepare_queryset(self, queryset, serializer_class):
+        if self.action == "list" and self.fast_list(serializer_class):
+            return queryset
+        return super().prepare_queryset(queryset, serializer_class)
+
+    def fast_rows(self, serializer_class):
+        fields = sparse_fieldset(self.request, serializer_class.Meta.fields)
+        return FastRows(serializer_class, fields, self.request)
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        if not self.fast_list(serializer_class):
+            # ListModelMixin.list(), with the serializer output timed.
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(
+                queryset if page is None else page, many=True
+            )
+            data = timed_serialization(lambda: serializer.data)
+            if page is None:
+                return Response(data)
+            return self.get_paginated_response(data)
+        rows = self.fast_rows(serializer_class)
+        queryset = rows.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(timed_serialization(rows.assemble, list(queryset)))
+        data = timed_serialization(rows.assemble, page)
+        return self.get_paginated_response(data)
+
+    def page_response(self, queryset, serializer_class):
+        """A page of `queryset`, rendered the way list() renders pages."""
+        if not self.fast_list(serializer_class):
+            page = self.paginate_queryset(
+                self.prepare_queryset(queryset, serializer_class)
+            )
+            serializer = serializer_class(
+                page, many=True, context=self.get_serializer_context()
+            )
+            return self.get_paginated_response(
+                timed_serialization(lambda: serializer.data)
+            )
+        rows = self.fast_rows(serializer_class)
+        # A keyset cursor needs the key of the last row, rendered or not.
+        keys = getattr(self.paginator, "fields", ())
+        page = self.paginate_queryset(
+            rows.values(queryset, *(key for key in keys if key not in rows.lookups))
+        )
+        return self.get_paginated_response(timed_serialization(rows.assemble, page))
+
+    def list_response(self, queryset, serializer_class):
+        """Unpaginated `queryset`, rendered the way list() renders pages."""
+        if self.fast_list(serializer_class):
+            rows = self.fast_rows(serializer_class)
+            page = list(rows.values(queryset))
+            return Response(timed_serialization(rows.assemble, page))
+        serializer = serializer_class(
+            self.prepare_queryset(queryset, serializer_class),
+            many=True,
+            context=self.get_serializer_context(),
+        )
+        return Response(timed_serialization(lambda: serializer.data))
+
+
+# Multi-get: `?ids=3,1,2` returns those objects of the view's queryset in that
+# order, with one query (plus shared prefetches) per serializer class.
+class BatchReadMixin(FastListMixin):
+    batch_size = 200
+
+    def batch_ids(self):
+        try:
+            ids = [int(pk) for pk in self.request.query_params["ids"].split(",")]
+        except (KeyError, ValueError):
+            raise ValidationError({"ids": "A comma-separated list of ids is required."})
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > self.batch_size:
+            raise ValidationError({"ids": f"At most {self.batch_size} ids."})
+        return ids
+
+    def batch_response(self, queryset, ids, serializer_for):
+        """`ids` of `queryset` in order, each rendered by `serializer_for(pk)`."""
+        groups = {}
+        for pk in ids:
+            groups.setdefault(serializer_for(pk), []).append(pk)
+        rendered = {}
+        for serializer_class, pks in groups.items():
+            rendered.update(self.render_batch(queryset, serializer_class, pks))
+        return Response([rendered[pk] for pk in ids if pk in rendered])
+
+    def render_batch(self, queryset, serializer_class, pks):
+        if self.fast_list(serializer_class):
+            rows = self.fast_rows(serializer_class)
+            page = list(rows.values(queryset.filter(pk__in=pks).order_by()))
+            data = timed_serialization(rows.assemble, page)
+            return {row["pk"]: item for row, item in zip(page, data)}
+        objects = list(
+            self.prepare_queryset(queryset, serializer_class).in_bulk(pks).values()
+        )
+        serializer = serializer_class(
+            objects, many=True, context=self.get_serializer_context()
+        )
+        data = timed_serialization(lambda: serializer.data)
+        return {obj.pk: item for obj, item in zip(objects, data)}
@@ -1,4 +1,6 @@
 import os
+import re
+import unicodedata
 import uuid
 from functools import partial
 
@@ -7,6 +9,8 @@ from django.db import models
 from django.utils.text import slugify
 from autoslug import AutoSlugField
 
+from app.storage import get_media_storage
+from py_net.db.soft_delete import LiveManager
 from user.models import User
 
 
@@ -16,6 +20,18 @@ def post_image_file_path(folder, instance, filename):
     return os.path.join(f"uploads/{folder}/", filename)
 
 
+def city_key(city):
+    """`city` with case, accents, punctuation and spacing folded away."""
+    if not city:
+        return None
+    letters = "".join(
+        char
+        for char in unicodedata.normalize("NFKD", city)
+        if not unicodedata.combining(char)
+    )
+    return " ".join(re.sub(r"[\W_]+", " ", letters.casefold()).split()) or None
+
+
 class Profile(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="profile"
@@ -26,20 +42,58 @@ class Profile(models.Model):
         blank=True,
         null=True,
         upload_to=partial(post_image_file_path, "profiles"),
+        storage=get_media_storage,
+    )
+    slug = AutoSlugField(
+        unique=True, populate_from="username", manager_name="all_objects"
     )
-    slug = AutoSlugField(unique=True, populate_from='username')
     city = models.CharField(max_length=63, blank=True, null=True)
-    birth_date = models.CharField(max_length=63, blank=True, null=True)
+    # city_key(city), set on save by app.signals.
+    city_key = models.CharField(max_length=63, blank=True, null=True, editable=False)
+    birth_date = models.DateField(blank=True, null=True)
     following = models.ManyToManyField(
         "self", related_name="followings", symmetrical=False
     )
+    # Kept in step with `following` by app.signals.count_followers.
+    followers_count = models.PositiveIntegerField(default=0, editable=False)
+    deleted_at = models.DateTimeField(blank=True, null=True, editable=False)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ["username"]
+        indexes = [
+            # The profile list shows live profiles only, in username order.
+            models.Index(
+                fields=["username"],
+                name="profile_live_username_idx",
+                condition=models.Q(deleted_at__isnull=True),
+            ),
+            # The directory, most followed first, optionally in one city. The
+            # birth date is in the index so age filters do not read the table.
+            models.Index(
+                fields=["city_key", "-followers_count", "-id", "birth_date"],
+                name="profile_city_directory_idx",
+                condition=models.Q(deleted_at__isnull=True),
+            ),
+            models.Index(
+                fields=["-followers_count", "-id", "birth_date"],
+                name="profile_directory_idx",
+                condition=models.Q(deleted_at__isnull=True),
+            ),
+        ]
 
     def __str__(self):
         return self.username
 
+    @property
+    def published_posts(self):
+        # Set by ProfileSerializer.prepare_queryset() when a view prefetches them.
+        if hasattr(self, "prefetched_published_posts"):
+            return self.prefetched_published_posts
+        return self.posts.filter(is_published=True)
+
     @property
     def followings_count(self):
         return self.followings.count()
@@ -52,16 +106,44 @@ class Post(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField()
     image = models.ImageField(
-        blank=True, null=True, upload_to=partial(post_image_file_path, "posts")
+        blank=True,
+        null=True,
+        upload_to=partial(post_image_file_path, "posts"),
+        storage=get_media_storage,
     )
-    video = models.FileField(blank=True, null=True)
+    video = models.FileField(blank=True, null=True, storage=get_media_storage)
     created_time = models.DateTimeField(auto_now_add=True)
+    publish_at = models.DateTimeField(blank=True, null=True)
+    is_published = models.BooleanField(default=True)
+    # Likes plus comments, and the ranked feed's sort key; both are kept up
+    # to date by app.signals, see app.ranking.
+    engagement = models.PositiveIntegerField(default=0)
+    score = models.FloatField(default=0)
     slug = models.SlugField(max_length=250, unique=True)
     likes = models.ManyToManyField(User, through="PostLike", related_name="likes")
     profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="posts")
+    deleted_at = models.DateTimeField(blank=True, null=True, editable=False)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ["-created_time"]
+        indexes = [
+            models.Index(
+                fields=["profile", "-created_time"], name="post_profile_created_idx"
+            ),
+            # The admin's date hierarchy filters the whole table by date.
+            models.Index(fields=["created_time"], name="post_created_idx"),
+            models.Index(fields=["profile", "-score"], name="post_profile_score_idx"),
+            # Only scheduled posts are indexed, so the publisher's lookup of
+            # due posts stays small however many posts are published.
+            models.Index(
+                fields=["publish_at"],
+                name="post_scheduled_idx",
+                condition=models.Q(is_published=False),
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -75,7 +157,8 @@ class Post(models.Model):
         unique_slug = slug
         counter = 1
 
-        while Post.objects.filter(slug=unique_slug).exists():
+        # Posts scheduled for deletion keep their slug until the purge.
+        while Post.all_objects.filter(slug=unique_slug).exists():
             unique_slug = f"{slug}-{counter}"
             counter += 1
 
@@ -91,6 +174,15 @@ class Comment(models.Model):
     content = models.TextField()
     created_time = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        ordering = ["created_time"]
+        indexes = [
+            models.Index(
+                fields=["post", "created_time"], name="comment_post_created_idx"
+            ),
+            models.Index(fields=["created_time"], name="comment_created_idx"),
+        ]
+
     def __str__(self):
         return f"Comment by {self.user.username} on {self.post.title}"
 
@@ -109,3 +201,213 @@ class PostLike(models.Model):
 
     class Meta:
         unique_together = ("author", "post")
+        indexes = [
+            models.Index(fields=["post", "status"], name="postlike_post_status_idx"),
+            models.Index(
+                fields=["author", "status", "-created_time"],
+                name="postlike_author_status_idx",
+            ),
+            models.Index(fields=["created_time"], name="postlike_created_idx"),
+        ]
+
+
+class MediaBlob(models.Model):
+    """A deduplicated upload, stored once under its content hash."""
+
+    digest = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.IntegerField(default=0)
+    created_time = models.DateTimeField(auto_now_add=True)
+    updated_time = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["ref_count", "updated_time"])]
+
+    def __str__(self):
+        return self.name
+
+
+class Notification(models.Model):
+    """
+    One inbox entry. Events of the same kind on the same post are merged
+    into the recipient's unread entry: `actor` is the latest one and
+    `actor_count` how many events the entry stands for.
+    """
+
+    class VerbChoices(models.TextChoices):
+        FOLLOW = "FOLLOW"
+        LIKE = "LIKE"
+        COMMENT = "COMMENT"
+
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="notifications",
+    )
+    verb = models.CharField(max_length=10, choices=VerbChoices.choices)
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, blank=True, null=True, related_name="+"
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    actor_count = models.PositiveIntegerField(default=1)
+    is_read = models.BooleanField(default=False)
+    created_time = models.DateTimeField(auto_now_add=True)
+    updated_time = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-updated_time", "-id"]
+        indexes = [
+            models.Index(
+                fields=["recipient", "-updated_time", "-id"],
+                name="notification_inbox_idx",
+            ),
+            models.Index(
+                fields=["recipient", "verb", "post"],
+                name="notification_unread_idx",
+                condition=models.Q(is_read=False),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.verb} for {self.recipient}"
+
+
+class NotificationInbox(models.Model):
+    """Per-user unread counter, kept in step with Notification rows."""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_inbox",
+    )
+    unread_count = models.PositiveIntegerField(default=0)
+
+
+class PendingNotification(models.Model):
+    """
+    An event queued by `app.notifications.notify`, waiting to be merged into
+    the inbox together with the others. The queue stays short, so its
+    foreign keys go without indexes to keep every like and comment cheap.
+    """
+
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name="+",
+    )
+    verb = models.CharField(max_length=10, choices=Notification.VerbChoices.choices)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        db_index=False,
+        related_name="+",
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name="+",
+    )
+
+
+class EngagementBucket(models.Model):
+    """Likes plus comments a post or hashtag got within one minute or hour."""
+
+    class KindChoices(models.TextChoices):
+        POST = "POST"
+        HASHTAG = "HASHTAG"
+
+    class GranularityChoices(models.TextChoices):
+        MINUTE = "MINUTE"
+        HOUR = "HOUR"
+
+    kind = models.CharField(max_length=10, choices=KindChoices.choices)
+    key = models.CharField(max_length=100)
+    granularity = models.CharField(max_length=10, choices=GranularityChoices.choices)
+    start = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also the index of window scans: kind, then a range of starts.
+            models.UniqueConstraint(
+                fields=["kind", "start", "granularity", "key"],
+                name="engagement_bucket_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.key} at {self.start}: {self.count}"
+
+
+class TrendingEntry(models.Model):
+    """One place of a window's top list, rewritten by every rollup."""
+
+    window = models.CharField(max_length=3)
+    kind = models.CharField(
+        max_length=10, choices=EngagementBucket.KindChoices.choices
+    )
+    rank = models.PositiveSmallIntegerField()
+    key = models.CharField(max_length=100)
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["window", "kind", "rank"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["window", "kind", "rank"], name="trending_entry_rank_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.window} {self.kind} #{self.rank}: {self.key}"
+
+
+class RollupWatermark(models.Model):
+    """Highest id of a source table already counted into EngagementBucket."""
+
+    source = models.CharField(max_length=30, primary_key=True)
+    last_id = models.PositiveBigIntegerField(default=0)
+
+
+class DeletionJob(models.Model):
+    """
+    Background removal of a soft-deleted user, profile or post and all that
+    depends on it; `deleted_rows` grows batch by batch.
+    """
+
+    class StatusChoices(models.TextChoices):
+        PENDING = "PENDING"
+        RUNNING = "RUNNING"
+        DONE = "DONE"
+        FAILED = "FAILED"
+
+    target = models.CharField(max_length=30)
+    object_id = models.PositiveBigIntegerField()
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="+",
+    )
+    status = models.CharField(
+        max_length=10, choices=StatusChoices.choices, default=StatusChoices.PENDING
+    )
+    deleted_rows = models.PositiveIntegerField(default=0)
+    created_time = models.DateTimeField(auto_now_add=True)
+    updated_time = models.DateTimeField(auto_now=True)
+    finished_time = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["-id"]
+
+    def __str__(self):
+        return f"{self.target} {self.object_id}: {self.status}"
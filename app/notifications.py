@@ -0,0 +1,132 @@
+"""
+Notification inbox: likes, comments and follows merged per recipient, verb
+and post.
+
+`notify()` only queues a PendingNotification row, in the caller's write
+transaction, and makes sure a delivery runs within DELIVERY_DELAY seconds.
+`deliver_pending()` then merges whatever queued up meanwhile, so a post
+that goes viral costs one delivery per few seconds, not one per like.
+"""
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from app.models import Notification, NotificationInbox, PendingNotification
+from py_net.db.transaction import atomic_immediate
+
+DELIVERY_BATCH_SIZE = 1000
+DELIVERY_DELAY = 2
+DELIVERY_SCHEDULED_KEY = "notifications:delivery-scheduled"
+
+
+def notify(verb, recipient_id, actor_id, post_id=None):
+    """Queue an event; call it inside the transaction that caused it."""
+    if recipient_id == actor_id:
+        return
+    PendingNotification.objects.create(
+        recipient_id=recipient_id, verb=verb, post_id=post_id, actor_id=actor_id
+    )
+    transaction.on_commit(schedule_delivery)
+
+
+def schedule_delivery():
+    # One delivery per DELIVERY_DELAY per process; beat catches any left over.
+    if cache.add(DELIVERY_SCHEDULED_KEY, True, DELIVERY_DELAY):
+        from app.tasks import deliver_notifications
+
+        deliver_notifications.apply_async(countdown=DELIVERY_DELAY)
+
+
+def deliver_pending(batch_size=DELIVERY_BATCH_SIZE):
+    """Deliver queued events, `batch_size` per transaction; returns how many."""
+    cache.delete(DELIVERY_SCHEDULED_KEY)
+    delivered = 0
+    while True:
+        with atomic_immediate():
+            pending = list(
+                PendingNotification.objects.order_by("id").values_list(
+                    "id", "recipient_id", "verb", "post_id", "actor_id"
+                )[:batch_size]
+            )
+            if pending:
+                deliver([event for _, *event in pending])
+                PendingNotification.objects.filter(id__lte=pending[-1][0]).delete()
+        if not pending:
+            return delivered
+        delivered += len(pending)
+
+
+def deliver(events):
+    """
+    Merge `(recipient_id, verb, post_id, actor_id)` events into the inbox.
+
+    Each group of similar events costs one UPDATE of the recipient's unread
+    entry, or one INSERT when there is none, however many events it holds.
+    """
+    groups = defaultdict(list)
+    for recipient_id, verb, post_id, actor_id in events:
+        groups[recipient_id, verb, post_id].append(actor_id)
+
+    new_entries = Counter()
+    now = timezone.now()
+    with atomic_immediate():
+        for (recipient_id, verb, post_id), actor_ids in groups.items():
+            merged = Notification.objects.filter(
+                recipient_id=recipient_id, verb=verb, post_id=post_id, is_read=False
+            ).update(
+                actor_id=actor_ids[-1],
+                actor_count=F("actor_count") + len(actor_ids),
+                updated_time=now,
+            )
+            if not merged:
+                Notification.objects.create(
+                    recipient_id=recipient_id,
+                    verb=verb,
+                    post_id=post_id,
+                    actor_id=actor_ids[-1],
+                    actor_count=len(actor_ids),
+                )
+                new_entries[recipient_id] += 1
+        for recipient_id, count in new_entries.items():
+            NotificationInbox.objects.get_or_create(user_id=recipient_id)
+            NotificationInbox.objects.filter(user_id=recipient_id).update(
+                unread_count=F("unread_count") + count
+            )
+    return len(groups)
+
+
+def mark_read(user, notification_id=None):
+    """Mark one or all of the user's notifications read and fix the counter."""
+    notifications = Notification.objects.filter(recipient=user, is_read=False)
+    if notification_id is not None:
+        notifications = notifications.filter(id=notification_id)
+    with atomic_immediate():
+        read = notifications.update(is_read=True)
+        if read:
+            NotificationInbox.objects.filter(user=user).update(
+                unread_count=F("unread_count") - read
+            )
+    return read
+
+
+def recount_unread(user_ids):
+    """Set `unread_count` from the notification rows, e.g. after a purge."""
+    unread = (
+        Notification.objects.filter(recipient=OuterRef("user"), is_read=False)
+        .order_by()
+        .values("recipient")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    NotificationInbox.objects.filter(user__in=list(user_ids)).update(
+        unread_count=Coalesce(Subquery(unread), 0)
+    )
+
+
+def unread_count(user):
+    inbox = NotificationInbox.objects.filter(user=user).first()
+    return inbox.unread_count if inbox else 0
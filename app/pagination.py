@@ -1,7 +1,131 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+from collections import OrderedDict
+
+from django.core.paginator import Paginator
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    PageNumberPagination,
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class PrimaryKeyCountPaginator(Paginator):
+    """Counts primary keys, so per-row annotations are not computed for all rows."""
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            return self.object_list.values("pk").order_by().count()
+        return len(self.object_list)
 
 
 class PyNetListPagination(PageNumberPagination):
+    django_paginator_class = PrimaryKeyCountPaginator
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 10
+
+
+class NotificationCursorPagination(CursorPagination):
+    page_size = 20
+    ordering = ("-updated_time", "-id")
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only cursor pagination on a unique key of descending integer
+    fields, e.g. `("-followers_count", "-pk")`. The cursor holds the key of
+    the page's last row, so any page is read from an index as cheaply as the
+    first, however many rows share a follower count.
+    """
+
+    page_size = 20
+    ordering = ()
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    @property
+    def fields(self):
+        return [name.lstrip("-") for name in self.ordering]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        queryset = queryset.order_by(*self.ordering)
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            queryset = queryset.filter(self.after(cursor))
+        rows = list(queryset[: self.page_size + 1])
+        page = rows[: self.page_size]
+        self.next_key = self.key(page[-1]) if len(rows) > self.page_size else None
+        return page
+
+    def after(self, key):
+        # (a, b) < (x, y) spelled so the first field is also a plain range,
+        # which the index can seek to: a <= x AND (a < x OR b < y).
+        first, *rest = self.fields
+        condition = Q(**{f"{first}__lt": key[0]})
+        for i, name in enumerate(rest, 1):
+            equal = {field: value for field, value in zip(self.fields, key[:i])}
+            condition |= Q(**equal, **{f"{name}__lt": key[i]})
+        return Q(**{f"{first}__lte": key[0]}) & condition
+
+    def key(self, row):
+        if isinstance(row, dict):
+            return [row[name] for name in self.fields]
+        return [getattr(row, name) for name in self.fields]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            key = base64.urlsafe_b64decode(encoded.encode("ascii")).decode("ascii")
+            key = [int(value) for value in key.split(".")]
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if len(key) != len(self.fields):
+            raise NotFound(self.invalid_cursor_message)
+        return key
+
+    def get_next_link(self):
+        if self.next_key is None:
+            return None
+        encoded = ".".join(str(value) for value in self.next_key)
+        cursor = base64.urlsafe_b64encode(encoded.encode("ascii")).decode("ascii")
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict([("next", self.get_next_link()), ("results", data)])
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            }
+        ]
+
+
+class DirectoryPagination(KeysetPagination):
+    ordering = ("-followers_count", "-pk")
@@ -0,0 +1,215 @@
+"""
+Bulk creation of accounts, with an optional profile each.
+
+Passwords are hashed across a process pool, since the hasher is slow by
+design and would otherwise keep the whole import on one core. Users and
+profiles are then inserted `batch_size` rows per transaction. Rows whose
+email already exists are skipped, not failed, so an interrupted run can be
+started again with the same input and picks up where it stopped.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db.models import Q
+from rest_framework import serializers
+
+from app.bulk import bulk_insert
+from app.models import Profile
+from py_net.db.transaction import atomic_immediate
+from user.models import User
+
+PROVISION_BATCH_SIZE = 1000
+# Rows per API request, hashed in the web worker itself; larger imports
+# belong to `manage.py provision_users` and its process pool.
+MAX_PROVISION_ROWS = 100
+SLUG_LOOKUP_BATCH_SIZE = 250
+
+
+class ProvisionRowSerializer(serializers.Serializer):
+    email = serializers.EmailField()
+    password = serializers.CharField(min_length=5, trim_whitespace=False)
+    username = serializers.CharField(max_length=63, required=False)
+
+
+class ProvisionSerializer(serializers.Serializer):
+    users = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=MAX_PROVISION_ROWS
+    )
+
+
+class ProvisionFailureSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    errors = serializers.DictField()
+
+
+class ProvisionReportSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    existing = serializers.IntegerField()
+    failed = ProvisionFailureSerializer(many=True)
+
+
+class Provisioning:
+    """
+    Create users (and profiles, for rows with a `username`) from dicts of
+    `email`, `password` and `username`. Failures are collected per row,
+    numbered from 1, instead of stopping the run.
+    """
+
+    def __init__(self, batch_size=PROVISION_BATCH_SIZE, workers=None):
+        self.batch_size = batch_size
+        self.workers = workers or settings.PROVISIONING_WORKERS
+        self.created = 0
+        self.existing = 0
+        self.failed = []
+        self.seen_emails = set()
+        self.seen_usernames = set()
+        self.slugs = set()
+        self.slug_bases = set()
+
+    def run(self, rows, progress=None):
+        """Provision `rows`; `progress(report)` is called after each batch."""
+        pool = ProcessPoolExecutor(self.workers) if self.workers > 1 else None
+        try:
+            batch = []
+            for number, row in enumerate(rows, 1):
+                batch.append((number, row))
+                if len(batch) >= self.batch_size:
+                    self.provision(batch, pool)
+                    batch = []
+                    if progress:
+                        progress(self.report())
+            if batch:
+                self.provision(batch, pool)
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+        return self.report()
+
+    def report(self):
+        return {
+            "created": self.created,
+            "existing": self.existing,
+            "failed": self.failed,
+        }
+
+    def fail(self, number, errors):
+        self.failed.append({"row": number, "errors": errors})
+
+    def provision(self, batch, pool):
+        rows = self.validate(batch)
+        existing = set(
+            User._base_manager.filter(
+                email__in=[row["email"] for _, row in rows]
+            ).values_list("email", flat=True)
+        )
+        self.existing += sum(row["email"] in existing for _, row in rows)
+        rows = [(number, row) for number, row in rows if row["email"] not in existing]
+        rows = self.check_usernames(rows)
+        if not rows:
+            return
+        passwords = [row["password"] for _, row in rows]
+        if pool:
+            chunksize = max(1, len(passwords) // (self.workers * 4))
+            hashes = list(pool.map(make_password, passwords, chunksize=chunksize))
+        else:
+            hashes = [make_password(password) for password in passwords]
+        self.insert(
+            [(number, row, hashed) for (number, row), hashed in zip(rows, hashes)]
+        )
+
+    def validate(self, batch):
+        valid = []
+        for number, row in batch:
+            serializer = ProvisionRowSerializer(data=row)
+            if not serializer.is_valid():
+                self.fail(number, serializer.errors)
+                continue
+            row = dict(serializer.validated_data)
+            row["email"] = User.objects.normalize_email(row["email"])
+            if row["email"] in self.seen_emails:
+                self.fail(number, {"email": ["Repeats an earlier row."]})
+                continue
+            self.seen_emails.add(row["email"])
+            valid.append((number, row))
+        return valid
+
+    def check_usernames(self, rows):
+        usernames = [row["username"] for _, row in rows if "username" in row]
+        taken = set(
+            Profile._base_manager.filter(username__in=usernames).values_list(
+                "username", flat=True
+            )
+        )
+        kept = []
+        for number, row in rows:
+            username = row.get("username")
+            if username in taken:
+                self.fail(number, {"username": ["This username is taken."]})
+            elif username in self.seen_usernames:
+                self.fail(number, {"username": ["Repeats an earlier row."]})
+            else:
+                if username:
+                    self.seen_usernames.add(username)
+                kept.append((number, row))
+        return kept
+
+    def insert(self, rows):
+        with atomic_immediate():
+            # Accounts created elsewhere while the passwords were hashed.
+            taken = set(
+                User._base_manager.filter(
+                    email__in=[row["email"] for _, row, _ in rows]
+                ).values_list("email", flat=True)
+            )
+            self.existing += sum(row["email"] in taken for _, row, _ in rows)
+            rows = [entry for entry in rows if entry[1]["email"] not in taken]
+            bulk_insert(
+                User,
+                [User(email=row["email"], password=hashed) for _, row, hashed in rows],
+            )
+            self.load_slugs(
+                [row["username"] for _, row, _ in rows if "username" in row]
+            )
+            user_ids = dict(
+                User._base_manager.filter(
+                    email__in=[row["email"] for _, row, _ in rows]
+                ).values_list("email", "id")
+            )
+            bulk_insert(
+                Profile,
+                [
+                    Profile(
+                        user_id=user_ids[row["email"]],
+                        username=row["username"],
+                        slug=self.unique_slug(row["username"]),
+                    )
+                    for _, row, _ in rows
+                    if "username" in row
+                ],
+            )
+        self.created += len(rows)
+
+    def load_slugs(self, usernames):
+        """Add the taken slugs that `usernames` could collide with to `slugs`."""
+        slugify = Profile._meta.get_field("slug").slugify
+        bases = list({slugify(username) for username in usernames} - self.slug_bases)
+        self.slug_bases.update(bases)
+        for start in range(0, len(bases), SLUG_LOOKUP_BATCH_SIZE):
+            # `base` itself or `base-<n>`: one index range per base.
+            query = Q()
+            for base in bases[start : start + SLUG_LOOKUP_BATCH_SIZE]:
+                query |= Q(slug=base) | Q(slug__gt=f"{base}-", slug__lt=f"{base}.")
+            self.slugs.update(
+                Profile._base_manager.filter(query).values_list("slug", flat=True)
+            )
+
+    def unique_slug(self, username):
+        # The slug Profile's AutoSlugField would give it, without a query per row.
+        base = slug = Profile._meta.get_field("slug").slugify(username)
+        index = 2
+        while slug in self.slugs:
+            slug = f"{base}-{index}"
+            index += 1
+        self.slugs.add(slug)
+        return slug
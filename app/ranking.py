@@ -0,0 +1,69 @@
+"""
+Scores of the ranked feed (`/api/post/?order=ranked`).
+
+    score = log10(engagement + 1) + created_time / GRAVITY
+
+where engagement counts likes and comments: a post needs ten times the
+engagement to outrank one GRAVITY seconds younger. The score is stored on the
+post and moved by one UPDATE whenever a like or comment arrives or goes, so
+ranking a page costs no more than sorting it by time.
+"""
+import math
+
+from django.db.models import Count, F
+from django.db.models.functions import Log
+
+from app.models import Comment, Post, PostLike
+
+GRAVITY = 45000
+
+FEED_ORDERINGS = {
+    "ranked": ("-score", "-id"),
+}
+
+
+def hot_score(engagement, created_time):
+    return math.log10(engagement + 1) + created_time.timestamp() / GRAVITY
+
+
+def counts_as_engagement(instance):
+    if isinstance(instance, PostLike):
+        return instance.status == PostLike.StatusChoices.LIKE
+    return isinstance(instance, Comment)
+
+
+def add_engagement(post_id, delta):
+    """Add `delta` to a post's engagement and shift its score to match."""
+    # Both right-hand sides read the row as it was before the UPDATE.
+    Post.objects.filter(pk=post_id).update(
+        engagement=F("engagement") + delta,
+        score=F("score")
+        + Log(10, F("engagement") + 1 + delta)
+        - Log(10, F("engagement") + 1),
+    )
+
+
+def recompute_scores(post_ids, batch_size=1000):
+    """Recount engagement and rescore posts from scratch, e.g. after bulk loads."""
+    post_ids = sorted(set(post_ids))
+    for start in range(0, len(post_ids), batch_size):
+        batch = post_ids[start:start + batch_size]
+        likes = dict(
+            PostLike.objects.filter(
+                post_id__in=batch, status=PostLike.StatusChoices.LIKE
+            )
+            .values_list("post_id")
+            .annotate(Count("id"))
+            .order_by()
+        )
+        comments = dict(
+            Comment.objects.filter(post_id__in=batch)
+            .values_list("post_id")
+            .annotate(Count("id"))
+            .order_by()
+        )
+        posts = list(Post.objects.filter(id__in=batch).only("id", "created_time"))
+        for post in posts:
+            post.engagement = likes.get(post.id, 0) + comments.get(post.id, 0)
+            post.score = hot_score(post.engagement, post.created_time)
+        Post.objects.bulk_update(posts, ["engagement", "score"])
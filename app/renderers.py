@@ -0,0 +1,89 @@
+"""
+Renderers and parsers picked by content negotiation.
+
+`application/json` is encoded and decoded with orjson, byte for byte what
+DRF's JSONRenderer writes for API data; `application/msgpack` carries the
+same data as MessagePack, with datetimes as timestamps.
+"""
+import msgpack
+import orjson
+from django.db.models.fields.files import FieldFile
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+# JSONRenderer escapes these for JavaScript; orjson leaves them raw.
+LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+_json_encoder = JSONEncoder()
+
+
+def timed_serialization(build, *args):
+    # Imported on use: py_net.instrumentation needs rest_framework.views, which
+    # loads the renderers named in its settings.
+    from py_net.instrumentation import timed_serialization
+
+    return timed_serialization(build, *args)
+
+
+def encode_default(obj):
+    """Types neither encoder knows: file URLs, then whatever DRF's encoder takes."""
+    if isinstance(obj, FieldFile):
+        return obj.url if obj else None
+    return _json_encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return timed_serialization(
+            self.encode, data, accepted_media_type, renderer_context
+        )
+
+    def encode(self, data, accepted_media_type, renderer_context):
+        if data is None:
+            return b""
+        options = ORJSON_OPTIONS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            # orjson indents by two spaces only.
+            options |= orjson.OPT_INDENT_2
+        content = orjson.dumps(data, default=encode_default, option=options)
+        for raw, escaped in LINE_SEPARATORS:
+            if raw in content:
+                content = content.replace(raw, escaped)
+        return content
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return timed_serialization(
+            lambda: msgpack.packb(data, default=encode_default, datetime=True)
+        )
+
+
+class ORJSONParser(BaseParser):
+    media_type = "application/json"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class MessagePackParser(BaseParser):
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), timestamp=3)
+        except (ValueError, msgpack.FormatError, msgpack.StackError) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
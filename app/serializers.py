@@ -1,8 +1,76 @@
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from rest_framework import serializers
-from app.models import Post, PostLike, Profile, Comment
-
-
-class CommentSerializer(serializers.ModelSerializer):
+from rest_framework.validators import UniqueValidator
+from app.models import (
+    Comment,
+    DeletionJob,
+    Notification,
+    Post,
+    PostLike,
+    Profile,
+    city_key,
+)
+
+
+def sparse_fieldset(request, names):
+    """The `names` a request keeps with `?fields=a,b` and `?omit=c`."""
+    params = getattr(request, "query_params", None)
+    if params is None:
+        return list(names)
+    kept = list(names)
+    if params.get("fields"):
+        wanted = set(params["fields"].split(","))
+        kept = [name for name in kept if name in wanted]
+    if params.get("omit"):
+        unwanted = set(params["omit"].split(","))
+        kept = [name for name in kept if name not in unwanted]
+    return kept
+
+
+# Profiles scheduled for deletion keep their username until the purge, so
+# uniqueness is checked against every row, not only the live ones.
+UNIQUE_USERNAME = {"validators": [UniqueValidator(queryset=Profile.all_objects.all())]}
+
+
+def count_related(queryset, field):
+    """Subquery counting the rows of `queryset` whose `field` is the outer row."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(count=Count("*"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+class DynamicFieldsMixin:
+    """
+    Let the request drop fields of the root serializer with `?fields=` and
+    `?omit=`. Views pass the same names to `prepare_queryset()`, which only
+    prefetches and annotates what the kept fields render.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return fields
+        kept = set(sparse_fieldset(self.context.get("request"), fields))
+        return {name: field for name, field in fields.items() if name in kept}
+
+    @classmethod
+    def prepare_queryset(cls, queryset, fields):
+        return queryset
+
+
+class CommentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     owner = serializers.ReadOnlyField(source="user.profile.username")
     post_title = serializers.SerializerMethodField()
 
@@ -14,6 +82,14 @@ class CommentSerializer(serializers.ModelSerializer):
     def get_post_title(obj):
         return obj.post.title
 
+    @classmethod
+    def prepare_queryset(cls, queryset, fields):
+        if "owner" in fields:
+            queryset = queryset.select_related("user__profile")
+        if "post_title" in fields:
+            queryset = queryset.select_related("post")
+        return queryset
+
 
 class CommentCreateSerializer(serializers.ModelSerializer):
     owner = serializers.ReadOnlyField(source="user.profile.username")
@@ -27,7 +103,7 @@ class CommentCreateSerializer(serializers.ModelSerializer):
         )
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     likes_count = serializers.SerializerMethodField()
     unlikes_count = serializers.SerializerMethodField()
 
@@ -49,23 +125,75 @@ class PostSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def get_likes_count(obj):
+        if hasattr(obj, "likes_total"):
+            return obj.likes_total
         return obj.postlikes.filter(status=PostLike.StatusChoices.LIKE).count()
 
     @staticmethod
     def get_unlikes_count(obj):
+        if hasattr(obj, "unlikes_total"):
+            return obj.unlikes_total
         return obj.postlikes.filter(status=PostLike.StatusChoices.UNLIKE).count()
 
+    @classmethod
+    def prepare_queryset(cls, queryset, fields):
+        if "comments" in fields:
+            # The prefetch sets each comment's post, so post_title costs nothing.
+            comments = CommentSerializer.prepare_queryset(
+                Comment.objects.all(), ["owner"]
+            )
+            queryset = queryset.prefetch_related(
+                Prefetch("comments", queryset=comments)
+            )
+        for field, annotation, status in (
+            ("likes_count", "likes_total", PostLike.StatusChoices.LIKE),
+            ("unlikes_count", "unlikes_total", PostLike.StatusChoices.UNLIKE),
+        ):
+            if field in fields:
+                likes = count_related(PostLike.objects.filter(status=status), "post")
+                queryset = queryset.annotate(**{annotation: likes})
+        return queryset
+
+
+class CountedPostSerializer(PostSerializer):
+    """PostSerializer reading like counts from `{(post_id, status): count}`."""
+
+    def get_likes_count(self, obj):
+        return self.context["like_counts"].get(
+            (obj.id, PostLike.StatusChoices.LIKE), 0
+        )
+
+    def get_unlikes_count(self, obj):
+        return self.context["like_counts"].get(
+            (obj.id, PostLike.StatusChoices.UNLIKE), 0
+        )
+
 
 class PostUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
         fields = ("id", "title", "content", "image")
 
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        # Only the edited columns (and the slug Post.save() derives): likes and
+        # comments move engagement and score with F() updates meanwhile.
+        instance.save(update_fields=[*validated_data, "slug"])
+        return instance
+
 
 class PostCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
-        fields = ("id", "title", "content", "image")
+        fields = ("id", "title", "content", "image", "publish_at", "is_published")
+        read_only_fields = ("is_published",)
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        publish_at = attrs.get("publish_at")
+        attrs["is_published"] = publish_at is None or publish_at <= timezone.now()
+        return attrs
 
 
 class PostLikeSerializer(serializers.ModelSerializer):
@@ -84,9 +212,19 @@ class PostLikeSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class ProfileSerializer(serializers.ModelSerializer):
-    followers_count = serializers.SerializerMethodField()
-    posts = PostSerializer(many=True, read_only=True)
+def prepare_profiles(queryset, fields):
+    if "posts" in fields:
+        posts = PostSerializer.prepare_queryset(
+            Post.objects.filter(is_published=True), PostSerializer.Meta.fields
+        )
+        queryset = queryset.prefetch_related(
+            Prefetch("posts", queryset=posts, to_attr="prefetched_published_posts")
+        )
+    return queryset
+
+
+class ProfileSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    posts = PostSerializer(many=True, read_only=True, source="published_posts")
 
     class Meta:
         model = Profile
@@ -100,10 +238,11 @@ class ProfileSerializer(serializers.ModelSerializer):
             "posts",
             "followers_count",
         ]
+        extra_kwargs = {"username": UNIQUE_USERNAME}
 
-    @staticmethod
-    def get_followers_count(obj):
-        return obj.followings.count()
+    @classmethod
+    def prepare_queryset(cls, queryset, fields):
+        return prepare_profiles(queryset, fields)
 
     def get_is_following(self, obj):
         request = self.context.get("request")
@@ -119,9 +258,7 @@ class ProfileSearchSerializer(serializers.ModelSerializer):
         fields = ["id", "username"]
 
 
-class ProfileNoPostSerializer(serializers.ModelSerializer):
-    followers_count = serializers.SerializerMethodField()
-
+class ProfileNoPostSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Profile
         fields = [
@@ -133,10 +270,11 @@ class ProfileNoPostSerializer(serializers.ModelSerializer):
             "avatar",
             "followers_count",
         ]
+        extra_kwargs = {"username": UNIQUE_USERNAME}
 
-    @staticmethod
-    def get_followers_count(obj):
-        return obj.followings.count()
+    @classmethod
+    def prepare_queryset(cls, queryset, fields):
+        return prepare_profiles(queryset, fields)
 
     def get_is_following(self, obj):
         request = self.context.get("request")
@@ -146,10 +284,55 @@ class ProfileNoPostSerializer(serializers.ModelSerializer):
         return False
 
 
+def years_before(day, years):
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        # 29 February in a year without one.
+        return day.replace(year=day.year - years, day=28)
+
+
+class ProfileDirectorySerializer(serializers.Serializer):
+    city = serializers.CharField(required=False)
+    min_age = serializers.IntegerField(required=False, min_value=0, max_value=150)
+    max_age = serializers.IntegerField(required=False, min_value=0, max_value=150)
+
+    def validate(self, attrs):
+        if attrs.get("min_age", 0) > attrs.get("max_age", 150):
+            raise serializers.ValidationError("min_age is above max_age.")
+        return attrs
+
+    def filters(self):
+        """Profile lookups for the validated query."""
+        data = self.validated_data
+        today = timezone.localdate()
+        filters = {}
+        if "city" in data:
+            # An empty key is never stored, so a city of only punctuation
+            # matches nothing rather than every profile without a city.
+            filters["city_key"] = city_key(data["city"]) or ""
+        if "min_age" in data:
+            filters["birth_date__lte"] = years_before(today, data["min_age"])
+        if "max_age" in data:
+            filters["birth_date__gt"] = years_before(today, data["max_age"] + 1)
+        return filters
+
+
+class ProfileDirectoryPageSerializer(serializers.Serializer):
+    next = serializers.URLField(allow_null=True)
+    results = ProfileNoPostSerializer(many=True)
+
+
 class ProfileCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Profile
         fields = ("user", "username", "city", "birth_date", "avatar")
+        extra_kwargs = {
+            "user": {
+                "validators": [UniqueValidator(queryset=Profile.all_objects.all())]
+            },
+            "username": UNIQUE_USERNAME,
+        }
 
 
 class ProfileFollowAddSerializer(serializers.ModelSerializer):
@@ -178,3 +361,47 @@ class LikedPostsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
         fields = ("id", "owner", "title", "postlike")
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    actor = serializers.ReadOnlyField(source="actor.profile.username")
+    text = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Notification
+        fields = (
+            "id",
+            "verb",
+            "post",
+            "actor",
+            "actor_count",
+            "text",
+            "is_read",
+            "updated_time",
+        )
+
+    def get_text(self, obj) -> str:
+        actor = obj.actor
+        actor = actor.profile.username if hasattr(actor, "profile") else actor.email
+        if obj.actor_count > 1:
+            others = obj.actor_count - 1
+            actor = f"{actor} and {others} other{'s' if others > 1 else ''}"
+        return {
+            Notification.VerbChoices.FOLLOW: f"{actor} followed you",
+            Notification.VerbChoices.LIKE: f"{actor} liked your post",
+            Notification.VerbChoices.COMMENT: f"{actor} commented on your post",
+        }[obj.verb]
+
+
+class DeletionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DeletionJob
+        fields = (
+            "id",
+            "target",
+            "object_id",
+            "status",
+            "deleted_rows",
+            "created_time",
+            "finished_time",
+        )
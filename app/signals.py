@@ -0,0 +1,142 @@
+from django.db import connection
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from app.models import Comment, MediaBlob, Post, PostLike, Profile, city_key
+from app.ranking import add_engagement, counts_as_engagement, hot_score
+
+MEDIA_FIELDS = {
+    Post: ("image", "video"),
+    Profile: ("avatar",),
+}
+
+
+def media_names(instance):
+    names = (getattr(instance, field).name for field in MEDIA_FIELDS[type(instance)])
+    return [name for name in names if name]
+
+
+def recount_followers(profile_ids):
+    """Set `followers_count` from the follow rows, e.g. after bulk writes."""
+    follows = (
+        Profile.following.through.objects.filter(to_profile=OuterRef("pk"))
+        .order_by()
+        .values("to_profile")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Profile._base_manager.filter(pk__in=list(profile_ids)).update(
+        followers_count=Coalesce(Subquery(follows), 0)
+    )
+
+
+def add_follow(follower, followed):
+    """
+    Make `follower` follow `followed`; returns False if it already did. The
+    insert skips an existing pair itself, so of two racing follows only the
+    one whose row lands counts.
+    """
+    through = Profile.following.through
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {through._meta.db_table} (from_profile_id, to_profile_id) "
+            "VALUES (%s, %s) ON CONFLICT DO NOTHING",
+            [follower.pk, followed.pk],
+        )
+        added = cursor.rowcount == 1
+    if added:
+        Profile._base_manager.filter(pk=followed.pk).update(
+            followers_count=F("followers_count") + 1
+        )
+    followed.refresh_from_db(fields=["followers_count"])
+    return added
+
+
+def change_ref_count(names, delta):
+    if names:
+        MediaBlob.objects.filter(name__in=names).update(
+            ref_count=F("ref_count") + delta, updated_time=timezone.now()
+        )
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Profile)
+def remember_media_names(sender, instance, raw, **kwargs):
+    instance._old_media_names = []
+    if raw or instance.pk is None:
+        return
+    row = (
+        sender._base_manager.filter(pk=instance.pk)
+        .values(*MEDIA_FIELDS[sender])
+        .first()
+    )
+    if row:
+        instance._old_media_names = [name for name in row.values() if name]
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Profile)
+def count_media_references(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    old_names = getattr(instance, "_old_media_names", [])
+    new_names = media_names(instance)
+    change_ref_count([name for name in new_names if name not in old_names], 1)
+    change_ref_count([name for name in old_names if name not in new_names], -1)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Profile)
+def release_media_references(sender, instance, **kwargs):
+    change_ref_count(media_names(instance), -1)
+
+
+@receiver(pre_save, sender=Post)
+def score_new_post(sender, instance, raw, **kwargs):
+    if not raw and instance._state.adding:
+        instance.score = hot_score(
+            instance.engagement, instance.created_time or timezone.now()
+        )
+
+
+# No post_delete twin: it would stop Django from fast-deleting the likes and
+# comments of a deleted post. Views that delete them call add_engagement().
+@receiver(post_save, sender=PostLike)
+@receiver(post_save, sender=Comment)
+def count_engagement(sender, instance, created, raw, **kwargs):
+    if created and not raw and counts_as_engagement(instance):
+        add_engagement(instance.post_id, 1)
+
+
+@receiver(pre_save, sender=Profile)
+def key_city(sender, instance, raw, **kwargs):
+    instance.city_key = city_key(instance.city)
+
+
+@receiver(m2m_changed, sender=Profile.following.through)
+def count_followers(sender, instance, action, reverse, pk_set, **kwargs):
+    # `reverse` is a change through `followings`: `instance` is the followed
+    # profile and `pk_set` its followers.
+    if action == "post_add" and pk_set:
+        # `pk_set` only holds the pairs add() found missing and inserted in
+        # the same transaction; the follow endpoint uses add_follow().
+        followed = [instance.pk] if reverse else pk_set
+        Profile._base_manager.filter(pk__in=followed).update(
+            followers_count=F("followers_count") + (len(pk_set) if reverse else 1)
+        )
+    elif action == "pre_clear" and not reverse:
+        instance._unfollowed_ids = list(
+            sender.objects.filter(from_profile=instance).values_list(
+                "to_profile_id", flat=True
+            )
+        )
+    elif action == "post_remove" and pk_set:
+        # Removing a pair that was never there sends it too, so recount.
+        recount_followers([instance.pk] if reverse else pk_set)
+    elif action == "post_clear":
+        recount_followers([instance.pk] if reverse else instance._unfollowed_ids)
+    if reverse and action in ("post_add", "post_remove", "post_clear"):
+        instance.refresh_from_db(fields=["followers_count"])
@@ -0,0 +1,80 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+
+from py_net.db.transaction import atomic_immediate
+
+BLOB_DIR = "blobs"
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Store every upload once, under the SHA-256 of its bytes.
+
+    The name produced by `upload_to` only contributes its extension. The
+    bytes are hashed while they are streamed to a temporary file, and the
+    temporary file is then moved to `blobs/<aa>/<sha256><ext>` unless a blob
+    with the same content already exists.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def blob_name(self, digest, name):
+        _, extension = os.path.splitext(name)
+        return f"{BLOB_DIR}/{digest[:2]}/{digest}{extension.lower()}"
+
+    def _save(self, name, content):
+        from app.models import MediaBlob
+
+        temp_dir = self.path(os.path.join(BLOB_DIR, "tmp"))
+        os.makedirs(temp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=temp_dir, delete=False) as temp_file:
+            for chunk in content.chunks():
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                digest.update(chunk)
+                size += len(chunk)
+                temp_file.write(chunk)
+
+        # The file is checked under the write lock, which collect_media_garbage
+        # holds from deleting a blob's file until its row is gone as well.
+        with atomic_immediate():
+            # Reuse the first stored name so the same bytes uploaded with a
+            # different extension still resolve to a single blob.
+            blob, created = MediaBlob.objects.get_or_create(
+                digest=digest.hexdigest(),
+                defaults={
+                    "name": self.blob_name(digest.hexdigest(), name),
+                    "size": size,
+                },
+            )
+            if not created:
+                # Keep an unreferenced blob out of the next garbage collection.
+                MediaBlob.objects.filter(pk=blob.pk).update(
+                    updated_time=timezone.now()
+                )
+            full_path = self.path(blob.name)
+            if os.path.exists(full_path):
+                os.remove(temp_file.name)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                file_move_safe(temp_file.name, full_path, allow_overwrite=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+        return blob.name
+
+
+_media_storage = None
+
+
+def get_media_storage():
+    global _media_storage
+    if _media_storage is None:
+        _media_storage = ContentAddressedStorage()
+    return _media_storage
@@ -1,16 +1,102 @@
+from datetime import timedelta
+
 from celery import shared_task
+from django.db.models import F
+from django.utils import timezone
+
+from app.deletion import purge
+from app.export import delete_old_archives, write_archive
+from app.models import MediaBlob, Post, User
+from app.notifications import deliver_pending
+from app.ranking import recompute_scores
+from app.storage import get_media_storage
+from app.trending import compact_buckets, refresh_trending, roll_up_engagement
+from py_net.db.snapshots import snapshot_replicas
+from py_net.db.transaction import atomic_immediate
+
+MEDIA_GC_GRACE_PERIOD = timedelta(hours=1)
+PUBLISH_BATCH_SIZE = 1000
+
+
+@shared_task
+def publish_due_posts(batch_size=PUBLISH_BATCH_SIZE) -> int:
+    """
+    Publish every scheduled post that is due, a batch per transaction.
+
+    Published posts take their scheduled time as `created_time` and are
+    rescored, so they show up at the top of the feeds.
+    """
+    now = timezone.now()
+    due = Post.objects.filter(is_published=False, publish_at__lte=now)
+    published = 0
+    while True:
+        with atomic_immediate():
+            post_ids = list(
+                due.order_by("publish_at").values_list("id", flat=True)[:batch_size]
+            )
+            if post_ids:
+                Post.objects.filter(id__in=post_ids).update(
+                    is_published=True, created_time=F("publish_at")
+                )
+                recompute_scores(post_ids)
+        if not post_ids:
+            return published
+        published += len(post_ids)
+
+
+@shared_task
+def deliver_notifications() -> int:
+    return deliver_pending()
+
+
+@shared_task
+def export_user_archive(user_id, name) -> str:
+    return write_archive(User.objects.get(id=user_id), name)
 
-from app.models import Post, Profile, User
 
-TITLE = "TEST!!!"
-CONTENT = "Test Post"
-USER_ID = 2
+@shared_task
+def delete_old_exports() -> int:
+    return delete_old_archives()
+
+
+@shared_task
+def roll_up_trending() -> int:
+    roll_up_engagement()
+    return refresh_trending()
+
+
+@shared_task
+def compact_engagement_buckets() -> list:
+    return list(compact_buckets())
+
+
+@shared_task
+def purge_deletion(job_id) -> int:
+    return purge(job_id)
+
+
+@shared_task
+def collect_media_garbage() -> int:
+    """Delete blobs that lost their last reference more than a grace period ago."""
+    storage = get_media_storage()
+    threshold = timezone.now() - MEDIA_GC_GRACE_PERIOD
+    collected = 0
+    for blob in MediaBlob.objects.filter(ref_count__lte=0, updated_time__lt=threshold):
+        # File first, then row, under the write lock an upload of the same
+        # bytes needs too, so it never finds the row without the file. The
+        # row is re-checked so a blob referenced meanwhile survives.
+        with atomic_immediate():
+            unused = MediaBlob.objects.filter(
+                pk=blob.pk, ref_count__lte=0, updated_time__lt=threshold
+            )
+            if not unused.exists():
+                continue
+            storage.delete(blob.name)
+            deleted, _ = unused.delete()
+        collected += deleted
+    return collected
 
 
 @shared_task
-def create_post() -> int:
-    user = User.objects.get(id=USER_ID)
-    profile = Profile.objects.get(user=user)
-    return Post.objects.create(
-        owner=user, title=TITLE, content=CONTENT, profile=profile
-    )
+def refresh_replica_snapshots() -> list:
+    return snapshot_replicas()
@@ -0,0 +1,131 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from app.models import Comment, Post, PostLike, Profile
+
+FEED_URL = reverse("app:async-feed")
+
+
+def async_profile_url(pk):
+    return reverse("app:async-profile-detail", args=[pk])
+
+
+def make_graph(test):
+    User = get_user_model()
+    test.viewer = User.objects.create_user("async.viewer@gmail.com", "12345viewer")
+    test.author = User.objects.create_user("async.author@gmail.com", "12345author")
+    test.viewer_profile = Profile.objects.create(user=test.viewer, username="Viewer")
+    test.author_profile = Profile.objects.create(user=test.author, username="Writer")
+    test.viewer_profile.following.add(test.author_profile)
+
+    start = timezone.now() - timedelta(days=1)
+    for i in range(12):
+        post = Post.objects.create(
+            owner=test.author, profile=test.author_profile, title=f"Async {i}"
+        )
+        Post.objects.filter(pk=post.pk).update(
+            created_time=start + timedelta(minutes=i)
+        )
+        Comment.objects.create(post=post, user=test.viewer, content=f"Nice {i}")
+        if i % 3:
+            PostLike.objects.create(
+                author=test.viewer, post=post, status=PostLike.StatusChoices.LIKE
+            )
+    token = RefreshToken.for_user(test.viewer).access_token
+    test.headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+
+@override_settings(ASYNC_PARALLEL_READS=False)
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        make_graph(self)
+
+    def test_feed_matches_the_sync_endpoint(self):
+        for query in ("", "?page=2"):
+            sync = self.client.get(reverse("app:post-list") + query, **self.headers)
+            response = self.client.get(FEED_URL + query, **self.headers)
+            self.assertEqual(response.status_code, 200)
+            expected = sync.json()
+            for key in ("next", "previous"):
+                if expected[key]:
+                    expected[key] = expected[key].replace("/api/post/", FEED_URL)
+            self.assertEqual(response.json(), expected)
+
+    def test_feed_requires_authentication(self):
+        self.assertEqual(self.client.get(FEED_URL).status_code, 401)
+        response = self.client.get(FEED_URL, HTTP_AUTHORIZATION="Bearer nonsense")
+        self.assertEqual(response.status_code, 401)
+
+    def test_feed_invalid_page(self):
+        response = self.client.get(FEED_URL + "?page=9", **self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_profile_page(self):
+        response = self.client.get(
+            async_profile_url(self.author_profile.pk), **self.headers
+        )
+        data = response.json()
+        self.assertTrue(data["is_following"])
+        self.assertFalse(data["follows_you"])
+        self.assertEqual(data["followers_count"], 1)
+        self.assertEqual(len(data["posts"]), 10)
+        self.assertEqual(data["posts"][0]["title"], "Async 11")
+        self.assertEqual(data["posts"][0]["likes_count"], 1)
+        self.assertEqual(data["posts"][0]["comments"][0]["owner"], "Viewer")
+
+    def test_profile_page_hides_posts_from_non_followers(self):
+        self.viewer_profile.following.clear()
+        response = self.client.get(
+            async_profile_url(self.author_profile.pk), **self.headers
+        )
+        self.assertFalse(response.json()["is_following"])
+        self.assertNotIn("posts", response.json())
+
+    def test_user_without_profile_is_refused_like_the_sync_feed(self):
+        user = get_user_model().objects.create_user("async.np@gmail.com", "12345np")
+        token = RefreshToken.for_user(user).access_token
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        sync = self.client.get(reverse("app:post-list"), **headers)
+        response = self.client.get(FEED_URL, **headers)
+        self.assertEqual(sync.status_code, 403)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), sync.json())
+
+    def test_staff_without_profile_gets_no_posts_like_the_sync_view(self):
+        staff = get_user_model().objects.create_user(
+            "async.staff@gmail.com", "12345staff", is_staff=True
+        )
+        token = RefreshToken.for_user(staff).access_token
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        url = reverse("app:profile-detail", args=[self.author_profile.pk])
+        self.assertNotIn("posts", self.client.get(url, **headers).json())
+        response = self.client.get(async_profile_url(self.author_profile.pk), **headers)
+        self.assertNotIn("posts", response.json())
+
+    def test_missing_profile(self):
+        response = self.client.get(async_profile_url(10**6), **self.headers)
+        self.assertEqual(response.status_code, 404)
+
+
+class ParallelAsyncReadViewTests(TransactionTestCase):
+    """The ASGI path with reads really spread over worker threads."""
+
+    def setUp(self):
+        make_graph(self)
+
+    async def test_concurrent_requests(self):
+        # AsyncClient takes extra headers by their HTTP name.
+        client = AsyncClient()
+        token = self.headers["HTTP_AUTHORIZATION"]
+        responses = [
+            await client.get(url, authorization=token)
+            for url in (FEED_URL, async_profile_url(self.author_profile.pk))
+        ]
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+        self.assertEqual(responses[0].json()["count"], 12)
+        self.assertEqual(len(responses[1].json()["posts"]), 10)
@@ -0,0 +1,107 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from app.models import Comment, Post, Profile
+
+POST_BATCH_URL = "/api/post/batch/"
+PROFILE_BATCH_URL = "/api/profile/batch/"
+
+
+class BatchTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(f"batch{i}@gmail.com", f"12345batch{i}")
+            for i in range(4)
+        ]
+        self.profiles = [
+            Profile.objects.create(user=user, username=f"Batch{i}")
+            for i, user in enumerate(self.users)
+        ]
+        self.reader = self.profiles[0]
+        self.reader.following.add(self.profiles[1])
+        self.posts = {}
+        for name, profile, published in (
+            ("own", self.reader, True),
+            ("followed", self.profiles[1], True),
+            ("draft", self.profiles[1], False),
+            ("stranger", self.profiles[2], True),
+        ):
+            self.posts[name] = Post.objects.create(
+                owner=profile.user,
+                profile=profile,
+                title=name,
+                content="!",
+                is_published=published,
+            )
+            Comment.objects.create(
+                post=self.posts[name], user=self.users[3], content="Nice"
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[0])
+
+    def get(self, url, ids):
+        query = ",".join(str(pk) for pk in ids)
+        return self.client.get(f"{url}?ids={query}")
+
+    def test_posts_in_requested_order(self):
+        ids = [self.posts[name].id for name in ("followed", "own")]
+        response = self.get(POST_BATCH_URL, ids + [ids[0], 10**6])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([post["title"] for post in response.data], ["followed", "own"])
+        self.assertEqual(response.data[0]["comments"][0]["content"], "Nice")
+
+    def test_posts_follow_feed_visibility(self):
+        ids = [post.id for post in self.posts.values()]
+        response = self.get(POST_BATCH_URL, reversed(ids))
+        self.assertEqual([post["title"] for post in response.data], ["followed", "own"])
+
+        self.users[0].is_staff = True
+        self.users[0].save()
+        response = self.get(POST_BATCH_URL, ids)
+        self.assertEqual(len(response.data), 4)
+
+    def test_posts_sparse_and_query_count(self):
+        ids = [self.posts[name].id for name in ("own", "followed")]
+        for fast in (True, False):
+            with override_settings(FAST_LIST_READS=fast):
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(
+                        f"{POST_BATCH_URL}?ids={ids[1]},{ids[0]}&fields=id,title"
+                    )
+            self.assertEqual(
+                response.data,
+                [{"id": ids[1], "title": "followed"}, {"id": ids[0], "title": "own"}],
+            )
+            # The user's profile and follows, then the posts.
+            self.assertLessEqual(len(context.captured_queries), 4)
+
+    def test_profiles_show_posts_like_retrieve(self):
+        ids = [profile.id for profile in reversed(self.profiles)]
+        for fast in (True, False):
+            with override_settings(FAST_LIST_READS=fast):
+                response = self.get(PROFILE_BATCH_URL, ids)
+            self.assertEqual(
+                [(p["username"], "posts" in p) for p in response.data],
+                [
+                    ("Batch3", False),
+                    ("Batch2", False),
+                    ("Batch1", True),
+                    ("Batch0", True),
+                ],
+            )
+            self.assertEqual(response.data[2]["posts"][0]["title"], "followed")
+            for profile in response.data:
+                detail = self.client.get(f"/api/profile/{profile['id']}/")
+                self.assertEqual(detail.json(), profile)
+
+    def test_invalid_ids(self):
+        for query in ("", "?ids=", "?ids=1,x"):
+            response = self.client.get(PROFILE_BATCH_URL + query)
+            self.assertEqual(response.status_code, 400, query)
+        self.assertEqual(self.get(POST_BATCH_URL, range(1, 202)).status_code, 400)
+        # Repeated ids count once.
+        self.assertEqual(self.get(POST_BATCH_URL, [1] * 300).status_code, 200)
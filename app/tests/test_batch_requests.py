@@ -0,0 +1,125 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from app.models import Post, Profile
+from py_net import batch
+
+BATCH_URL = "/api/batch/"
+
+
+def create_reader(follows=1):
+    User = get_user_model()
+    user = User.objects.create_user("batched@gmail.com", "12345batched")
+    profile = Profile.objects.create(user=user, username="Batched")
+    for i in range(follows):
+        other = User.objects.create_user(f"batched{i}@gmail.com", "12345batched")
+        followed = Profile.objects.create(user=other, username=f"Followed{i}")
+        profile.following.add(followed)
+        Post.objects.create(
+            owner=other, profile=followed, title=f"Post {i}", content="!"
+        )
+    return user, profile
+
+
+class BatchRequestTests(TestCase):
+    def setUp(self):
+        self.user, self.profile = create_reader()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def batch(self, *requests):
+        return self.client.post(BATCH_URL, {"requests": requests}, format="json")
+
+    def test_app_start_in_one_round_trip(self):
+        with mock.patch.object(
+            JWTAuthentication, "authenticate", wraps=JWTAuthentication().authenticate
+        ) as authenticate:
+            response = self.batch(
+                {"path": "/api/user/me/"},
+                {"path": f"/api/profile/{self.profile.id}/?fields=username,posts"},
+                {"path": "/api/post/?fields=title"},
+                {"path": "/api/posts/liked/"},
+                {"path": f"/api/profile/{self.profile.id}/following/"},
+            )
+        self.assertEqual(authenticate.call_count, 1)
+        self.assertEqual(response.status_code, 200)
+        statuses = [sub["status"] for sub in response.data]
+        self.assertEqual(statuses, [200] * 5)
+        me, profile, feed, liked, following = [sub["body"] for sub in response.data]
+        self.assertEqual(me["email"], "batched@gmail.com")
+        self.assertEqual(set(profile), {"username", "posts"})
+        self.assertEqual(feed["results"], [{"title": "Post 0"}])
+        self.assertEqual(liked["count"], 0)
+        self.assertEqual([p["username"] for p in following], ["Followed0"])
+
+    def test_writes_run_in_order(self):
+        response = self.batch(
+            {"method": "POST", "path": "/api/post/", "body": {"title": "Mine"}},
+            {
+                "method": "POST",
+                "path": "/api/post/",
+                "body": {"title": "Batched", "content": "#batch"},
+            },
+            {"path": "/api/post/?fields=title&search=batch"},
+        )
+        statuses = [sub["status"] for sub in response.data]
+        self.assertEqual(statuses, [400, 201, 200])
+        self.assertIn("content", response.data[0]["body"])
+        self.assertEqual(response.data[2]["body"]["results"], [{"title": "Batched"}])
+
+    def test_sub_request_errors(self):
+        response = self.batch(
+            {"path": "/api/missing/"},
+            {"path": "/api/post/0/"},
+            {"method": "POST", "path": BATCH_URL, "body": {"requests": []}},
+            {"path": "/api/async/feed/"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [sub["status"] for sub in response.data], [404, 404, 400, 400]
+        )
+
+    def test_invalid_batches(self):
+        self.assertEqual(self.batch({"path": "/admin/"}).status_code, 400)
+        requests = [{"path": "/api/user/me/"}] * (batch.MAX_SUB_REQUESTS + 1)
+        self.assertEqual(self.batch(*requests).status_code, 400)
+        self.client.credentials()
+        self.assertEqual(self.batch({"path": "/api/user/me/"}).status_code, 401)
+
+
+class ParallelBatchTests(TransactionTestCase):
+    def test_reads_run_in_worker_threads(self):
+        user, profile = create_reader(follows=3)
+        client = APIClient()
+        client.force_authenticate(user)
+        threads = set()
+
+        def run(*args):
+            threads.add(threading.get_ident())
+            return original_run(*args)
+
+        original_run = batch.run
+        with mock.patch.object(batch, "can_read_in_parallel", return_value=True):
+            with mock.patch.object(batch, "run", side_effect=run):
+                response = client.post(
+                    BATCH_URL,
+                    {
+                        "requests": [
+                            {"path": f"/api/profile/{pk}/?fields=username"}
+                            for pk in profile.following.values_list("pk", flat=True)
+                        ]
+                    },
+                    format="json",
+                )
+        self.assertEqual(
+            [sub["body"]["username"] for sub in response.data],
+            ["Followed0", "Followed1", "Followed2"],
+        )
+        self.assertNotIn(threading.get_ident(), threads)
@@ -0,0 +1,156 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from datetime import datetime, timezone
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from app.bulk import bulk_insert
+from app.models import Comment, MediaBlob, Post, Profile
+from app.ranking import hot_score
+from user.models import User
+
+
+def fixture_records(users=3):
+    records = []
+    for i in range(1, users + 1):
+        records += [
+            {
+                "model": "user.user",
+                "pk": 1000 + i,
+                "fields": {"email": f"bulk{i}@gmail.com", "password": "!"},
+            },
+            {
+                "model": "app.profile",
+                "pk": 1000 + i,
+                "fields": {
+                    "user": 1000 + i,
+                    "username": ("Bulk Loader", "Bulk-Loader", "Loader 3")[i - 1],
+                    "following": [1000 + j for j in range(1, users + 1) if j != i],
+                },
+            },
+            {
+                "model": "app.post",
+                "pk": 1000 + i,
+                "fields": {
+                    "owner": 1000 + i,
+                    "profile": 1000 + i,
+                    "title": "Same title",
+                    "content": "#bulk",
+                    "image": "blobs/aa/shared.png",
+                },
+            },
+        ]
+    records.append(
+        {
+            "model": "app.comment",
+            "fields": {"post": 1001, "user": 1002, "content": "Loaded"},
+        }
+    )
+    return records
+
+
+class BulkLoadTests(TransactionTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.json_path = os.path.join(directory, "data.json")
+        self.ndjson_path = os.path.join(directory, "data.ndjson")
+        with open(self.json_path, "w") as file:
+            json.dump(fixture_records(), file, indent=2)
+        with open(self.ndjson_path, "w") as file:
+            file.writelines(json.dumps(record) + "\n" for record in fixture_records())
+        MediaBlob.objects.create(
+            digest="a" * 64, name="blobs/aa/shared.png", size=1, ref_count=1
+        )
+
+    def load(self, path, **options):
+        out = StringIO()
+        call_command("bulk_load", path, stdout=out, batch_size=2, **options)
+        return out.getvalue()
+
+    def assert_loaded(self):
+        self.assertEqual(User.objects.filter(email__startswith="bulk").count(), 3)
+        profiles = Profile.objects.filter(id__gt=1000).order_by("id")
+        self.assertEqual(
+            [profile.slug for profile in profiles],
+            ["bulk-loader", "bulk-loader-2", "loader-3"],
+        )
+        self.assertEqual(profiles[0].following.count(), 2)
+        self.assertEqual([profile.followers_count for profile in profiles], [2, 2, 2])
+        posts = Post.objects.filter(id__gt=1000).order_by("id")
+        self.assertEqual(
+            [post.slug for post in posts],
+            ["same-title", "same-title-1", "same-title-2"],
+        )
+        self.assertIsNotNone(posts[0].created_time)
+        self.assertEqual([post.engagement for post in posts], [1, 0, 0])
+        self.assertAlmostEqual(posts[0].score, hot_score(1, posts[0].created_time))
+        self.assertEqual(Comment.objects.get(content="Loaded").post_id, 1001)
+        self.assertEqual(MediaBlob.objects.get().ref_count, 4)
+
+    def test_json_array(self):
+        self.assertIn("Loaded 16 rows", self.load(self.json_path))
+        self.assert_loaded()
+
+    def test_ndjson_in_small_transactions(self):
+        self.load(self.ndjson_path, transaction_size=3)
+        self.assert_loaded()
+
+    def test_defer_indexes_rebuilds_them(self):
+        output = self.load(self.json_path, defer_indexes=True)
+
+        self.assertIn("Rebuilt 9 indexes", output)
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Post._meta.db_table
+            )
+        self.assertIn("post_profile_created_idx", constraints)
+        self.assertIn("post_scheduled_idx", constraints)
+        self.assert_loaded()
+
+
+class BulkInsertTests(TestCase):
+    def test_prepared_values_are_kept_without_a_query_per_row(self):
+        users = [User(email=f"insert{i}@gmail.com", password="!") for i in range(3)]
+        bulk_insert(User, users)
+        users = list(User.objects.filter(email__startswith="insert").order_by("pk"))
+        created = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        profiles = [
+            Profile(user=user, username=f"Same {i}", slug=f"kept-{i}")
+            for i, user in enumerate(users)
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            bulk_insert(Profile, profiles)
+        profiles = list(Profile.objects.filter(user__in=users).order_by("pk"))
+        with CaptureQueriesContext(connection) as post_queries:
+            bulk_insert(
+                Post,
+                [
+                    Post(
+                        owner_id=profile.user_id,
+                        profile=profile,
+                        title="Old",
+                        slug=f"old-{profile.pk}",
+                        content="",
+                        created_time=created,
+                    )
+                    for profile in profiles
+                ],
+            )
+
+        # bulk_create() would run pre_save(): a slug query per profile and
+        # auto_now_add stamping the posts with the current time.
+        self.assertEqual((len(queries), len(post_queries)), (1, 1))
+        self.assertEqual(
+            [profile.slug for profile in profiles], ["kept-0", "kept-1", "kept-2"]
+        )
+        times = Post.objects.filter(profile__in=profiles).values_list(
+            "created_time", flat=True
+        )
+        self.assertEqual(set(times), {created})
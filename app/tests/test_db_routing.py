@@ -0,0 +1,99 @@
+import os
+import tempfile
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from app.models import Profile
+from py_net.db import routers
+
+REPLICA_SETTINGS = {
+    "DATABASE_REPLICAS": ["replica1"],
+    "REPLICA_SNAPSHOT_PATHS": {},
+    "REPLICA_MAX_LAG": 60,
+    "REPLICA_HEALTH_CHECK_INTERVAL": 0,
+}
+
+
+@override_settings(**REPLICA_SETTINGS)
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        routers._health.clear()
+        self.user = get_user_model().objects.create_user("reader@gmail.com", "12345r")
+
+    @mock.patch("py_net.db.routers.check_replica", return_value=True)
+    def test_reads_go_to_healthy_replica(self, _):
+        self.assertEqual(routers.choose_read_alias(self.user), "replica1")
+
+    @mock.patch("py_net.db.routers.check_replica", return_value=False)
+    def test_unhealthy_replica_falls_back_to_primary(self, _):
+        self.assertIsNone(routers.choose_read_alias(self.user))
+
+    @mock.patch("py_net.db.routers.check_replica", return_value=True)
+    def test_write_pins_user_to_primary(self, _):
+        Profile.objects.create(user=self.user, username="Reader")
+        client = APIClient()
+        client.force_authenticate(self.user)
+        profile = Profile.objects.create(
+            user=get_user_model().objects.create_user("star@gmail.com", "12345s"),
+            username="Star",
+        )
+
+        response = client.post(f"/api/profile/{profile.id}/follow/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(routers.choose_read_alias(self.user))
+
+    def test_batch_pins_only_after_a_write(self):
+        Profile.objects.create(user=self.user, username="Reader")
+        profile = Profile.objects.create(
+            user=get_user_model().objects.create_user("star@gmail.com", "12345s"),
+            username="Star",
+        )
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        with mock.patch("py_net.db.routers.check_replica", return_value=False):
+            response = client.post(
+                "/api/batch/", {"requests": [{"path": "/api/post/"}]}, format="json"
+            )
+        self.assertEqual(response.data[0]["status"], 200)
+        self.assertFalse(routers.is_pinned(self.user))
+
+        aliases = []
+
+        def choose_read_alias(user):
+            aliases.append(routers.choose_read_alias(user))
+            return aliases[-1]
+
+        with mock.patch("py_net.db.routers.check_replica", return_value=True):
+            with mock.patch("app.mixins.choose_read_alias", choose_read_alias):
+                response = client.post(
+                    "/api/batch/",
+                    {
+                        "requests": [
+                            {
+                                "method": "POST",
+                                "path": f"/api/profile/{profile.id}/follow/",
+                            },
+                            {"path": f"/api/profile/{profile.id}/followers/"},
+                        ]
+                    },
+                    format="json",
+                )
+        self.assertEqual([sub["status"] for sub in response.data], [200, 200])
+        # The read after the write saw the primary, not a replica.
+        self.assertEqual(aliases, [None])
+        self.assertTrue(routers.is_pinned(self.user))
+
+    def test_lagging_snapshot_is_not_used(self):
+        with tempfile.NamedTemporaryFile() as snapshot:
+            stale = time.time() - 3600
+            os.utime(snapshot.name, (stale, stale))
+            with self.settings(REPLICA_SNAPSHOT_PATHS={"replica1": snapshot.name}):
+                self.assertFalse(routers.check_replica("replica1"))
@@ -0,0 +1,149 @@
+from unittest import mock
+
+from django.apps import apps
+from django.contrib.admin.models import ADDITION, LogEntry
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, modify_settings
+from rest_framework.test import APIClient
+
+from app.deletion import purge, schedule_deletion
+from app.models import Comment, DeletionJob, Post, PostLike, Profile
+
+
+def create_member(name):
+    user = get_user_model().objects.create_user(
+        f"{name}@deletion.test", f"12345{name}"
+    )
+    profile = Profile.objects.create(user=user, username=name.title())
+    return user, profile
+
+
+def create_post(profile, title):
+    return Post.objects.create(
+        owner=profile.user, profile=profile, title=title, content="!"
+    )
+
+
+class DeletionTests(TestCase):
+    def setUp(self):
+        self.user, self.profile = create_member("leaving")
+        self.other, self.other_profile = create_member("staying")
+        self.profile.following.add(self.other_profile)
+        self.other_profile.following.add(self.profile)
+        self.posts = [create_post(self.profile, f"Post {i}") for i in range(3)]
+        for post in self.posts:
+            Comment.objects.create(post=post, user=self.other, content="Nice")
+            PostLike.objects.create(post=post, author=self.other)
+        self.other_post = create_post(self.other_profile, "Stays")
+        Comment.objects.create(post=self.other_post, user=self.user, content="Hi")
+        PostLike.objects.create(post=self.other_post, author=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_deleted_post_is_hidden_then_purged(self):
+        post = self.posts[0]
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.delete(f"/api/post/{post.id}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(Post.all_objects.filter(pk=post.pk).exists())
+        self.assertFalse(Comment.objects.filter(post_id=post.pk).exists())
+        job = DeletionJob.objects.get()
+        self.assertEqual(job.status, DeletionJob.StatusChoices.DONE)
+        # The post, its comment and its like.
+        self.assertEqual(job.deleted_rows, 3)
+
+        response = self.client.get("/api/deletions/")
+        self.assertEqual(response.data["results"][0]["deleted_rows"], 3)
+
+    def test_scheduled_rows_are_hidden_before_the_purge(self):
+        response = self.client.delete("/api/user/me/")
+        self.assertEqual(response.status_code, 204)
+        job = DeletionJob.objects.get()
+        self.assertEqual(job.status, DeletionJob.StatusChoices.PENDING)
+        self.assertFalse(get_user_model().objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Profile.objects.filter(pk=self.profile.pk).exists())
+        self.assertTrue(Profile.all_objects.filter(pk=self.profile.pk).exists())
+        # The profile is hidden, not its posts: they go with the purge.
+        self.assertEqual(Post.objects.filter(profile=self.profile).count(), 3)
+
+        other = APIClient()
+        other.force_authenticate(self.other)
+        response = other.get(f"/api/profile/{self.profile.id}/")
+        self.assertEqual(response.status_code, 404)
+        response = other.get(f"/api/profile/{self.other_profile.id}/followers/")
+        self.assertEqual(response.data, [])
+
+    def test_user_purge_in_small_batches(self):
+        job = schedule_deletion(self.user, self.user)
+        deleted = purge(job.id, batch_size=2)
+        job.refresh_from_db()
+        self.assertEqual(job.status, DeletionJob.StatusChoices.DONE)
+        # The user, profile, posts, comments, likes and follow rows.
+        self.assertEqual(deleted, 15)
+        self.assertEqual(job.deleted_rows, deleted)
+        self.assertFalse(get_user_model().all_objects.filter(pk=self.user.pk))
+        self.assertFalse(Profile.all_objects.filter(pk=self.profile.pk))
+        self.assertFalse(Post.all_objects.filter(owner=self.user))
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(PostLike.objects.exists())
+        self.assertFalse(Profile.following.through.objects.exists())
+        self.other_post.refresh_from_db()
+        self.assertEqual(self.other_post.engagement, 0)
+        # Purging again is a no-op.
+        self.assertEqual(purge(job.id), deleted)
+
+    def test_scheduled_rows_keep_unique_values_until_the_purge(self):
+        schedule_deletion(self.posts[0], self.user)
+        response = self.client.post("/api/post/", {"title": "Post 0", "content": "!"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Post.objects.get(title="Post 0").slug, "post-0-1")
+
+        schedule_deletion(self.user, self.user)
+        response = APIClient().post(
+            "/api/user/register/",
+            {"email": "leaving@deletion.test", "password": "12345leaving"},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("email", response.data)
+
+        newcomer = get_user_model().objects.create_user(
+            "newcomer@deletion.test", "12345newcomer"
+        )
+        client = APIClient()
+        client.force_authenticate(newcomer)
+        response = client.post(
+            "/api/profile/", {"user": newcomer.pk, "username": "Leaving"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("username", response.data)
+        self.assertEqual(Profile.all_objects.filter(username="Leaving").count(), 1)
+
+
+class WorkerRolePurgeTests(TransactionTestCase):
+    def test_staff_user_purge_without_the_admin_app(self):
+        staff, profile = create_member("staff")
+        staff.is_staff = True
+        staff.save()
+        LogEntry.objects.log_action(
+            staff.pk, None, str(profile.pk), "Staff", ADDITION, "Added."
+        )
+        # Leave the purge to the worker below instead of the eager task.
+        with mock.patch("app.tasks.purge_deletion.delay"):
+            job = schedule_deletion(staff, staff)
+
+        # PY_NET_ROLE=worker leaves the admin out of INSTALLED_APPS.
+        with modify_settings(INSTALLED_APPS={"remove": ["django.contrib.admin"]}):
+            # Setting changes keep the relation caches; drop them so the
+            # delete collector no longer sees LogEntry, as in a worker.
+            apps.clear_cache()
+            self.addCleanup(apps.clear_cache)
+            deleted = purge(job.id)
+
+        # The user, profile and log entry.
+        self.assertEqual(deleted, 3)
+        self.assertFalse(get_user_model().all_objects.filter(pk=staff.pk))
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM django_admin_log")
+            self.assertEqual(cursor.fetchone()[0], 0)
@@ -0,0 +1,142 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from app.models import Profile, city_key
+from app.signals import add_follow, recount_followers
+
+DIRECTORY_URL = "/api/profile/directory/"
+TODAY = date(2026, 3, 1)
+# Ties go to the newest profile; the fixture data's comes last.
+ALL_BY_FOLLOWERS = ["Elder", "Lviv", "Unknown", "Adult", "Teen", "Anonimus"]
+
+
+def create_profile(name, city=None, birth_date=None):
+    user = get_user_model().objects.create_user(
+        f"{name.lower()}@directory.test", f"12345{name}"
+    )
+    return Profile.objects.create(
+        user=user, username=name, city=city, birth_date=birth_date
+    )
+
+
+class FollowersCountTests(TestCase):
+    def setUp(self):
+        self.a, self.b, self.c = (create_profile(name) for name in "ABC")
+
+    def counts(self):
+        return [
+            Profile.objects.get(pk=profile.pk).followers_count
+            for profile in (self.a, self.b, self.c)
+        ]
+
+    def test_follows_either_way(self):
+        self.a.following.add(self.b, self.c)
+        self.c.followings.add(self.b)
+        self.assertEqual(self.c.followers_count, 2)
+        self.a.following.add(self.b)
+        self.assertEqual(self.counts(), [0, 1, 2])
+
+        self.a.following.remove(self.b, self.b)
+        self.c.followings.remove(self.a)
+        self.assertEqual(self.counts(), [0, 0, 1])
+        self.b.following.add(self.a)
+        self.b.following.clear()
+        self.assertEqual(self.counts(), [0, 0, 0])
+
+    def test_racing_follows_count_once(self):
+        self.assertTrue(add_follow(self.a, self.b))
+        # The later of two concurrent follows finds its row already there.
+        self.assertFalse(add_follow(self.a, self.b))
+        self.assertEqual(self.b.followers_count, 1)
+        self.assertEqual(self.counts(), [0, 1, 0])
+        self.assertEqual(list(self.a.following.all()), [self.b])
+
+    def test_recount(self):
+        self.a.following.add(self.b)
+        Profile.objects.update(followers_count=9)
+        recount_followers([self.a.pk, self.b.pk])
+        self.assertEqual(self.counts(), [0, 1, 9])
+
+
+class TypedProfileTests(TestCase):
+    def test_free_form_values_were_converted(self):
+        # fixture_data.json had "30.05.2000" and "NY".
+        profile = Profile.objects.get(username="Anonimus")
+        self.assertEqual(profile.birth_date, date(2000, 5, 30))
+        self.assertEqual(profile.city_key, "ny")
+
+    def test_spellings_share_a_key(self):
+        self.assertEqual(city_key(" São  Paulo "), "sao paulo")
+        self.assertEqual(city_key("sao-paulo"), "sao paulo")
+        self.assertIsNone(city_key("--"))
+        profile = create_profile("Keyed", city="Kyïv")
+        self.assertEqual(profile.city_key, "kyiv")
+
+
+@mock.patch("django.utils.timezone.localdate", return_value=TODAY)
+class DirectoryTests(TestCase):
+    def setUp(self):
+        self.profiles = {
+            name: create_profile(name, city, birth_date)
+            for name, city, birth_date in (
+                ("Teen", "Kyiv", date(2010, 3, 2)),
+                ("Adult", "KYIV", date(2008, 3, 1)),
+                ("Elder", "Kyiv", date(1950, 1, 1)),
+                ("Lviv", "Lviv", date(1990, 1, 1)),
+                ("Unknown", "Kyiv", None),
+            )
+        }
+        for follower, followed in (
+            ("Teen", "Elder"),
+            ("Adult", "Elder"),
+            ("Lviv", "Elder"),
+            ("Teen", "Lviv"),
+            ("Elder", "Lviv"),
+        ):
+            self.profiles[follower].following.add(self.profiles[followed])
+        self.client = APIClient()
+        self.client.force_authenticate(self.profiles["Teen"].user)
+
+    def names(self, query=""):
+        response = self.client.get(DIRECTORY_URL + query)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [profile["username"] for profile in response.data["results"]]
+
+    def test_most_followed_first(self, localdate):
+        for fast in (True, False):
+            with override_settings(FAST_LIST_READS=fast):
+                self.assertEqual(self.names(), ALL_BY_FOLLOWERS)
+
+    def test_city_and_age(self, localdate):
+        self.assertEqual(
+            self.names("?city=kyiv"), ["Elder", "Unknown", "Adult", "Teen"]
+        )
+        self.assertEqual(self.names("?city=Kyiv&min_age=18"), ["Elder", "Adult"])
+        self.assertEqual(self.names("?city=Kyiv&max_age=17"), ["Teen"])
+        self.assertEqual(self.names("?min_age=30&max_age=40"), ["Lviv"])
+        self.assertEqual(self.names("?city=!"), [])
+
+    def test_cursor_pages(self, localdate):
+        for fast in (True, False):
+            with override_settings(FAST_LIST_READS=fast):
+                with mock.patch("app.pagination.DirectoryPagination.page_size", 2):
+                    names, url = [], DIRECTORY_URL + "?fields=username"
+                    while url:
+                        data = self.client.get(url).data
+                        self.assertLessEqual(len(data["results"]), 2)
+                        names += [profile["username"] for profile in data["results"]]
+                        url = data["next"]
+            self.assertEqual(names, ALL_BY_FOLLOWERS)
+
+    def test_invalid_query(self, localdate):
+        for query, status in (
+            ("?min_age=x", 400),
+            ("?min_age=40&max_age=30", 400),
+            ("?cursor=nonsense", 404),
+        ):
+            response = self.client.get(DIRECTORY_URL + query)
+            self.assertEqual(response.status_code, status, query)
@@ -0,0 +1,99 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from urllib.parse import urlparse
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from app.export import export_lines, export_storage
+from app.tasks import delete_old_exports
+from app.models import Comment, Post, PostLike, Profile
+
+EXPORT_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(EXPORT_ROOT=EXPORT_ROOT)
+class ExportTests(TestCase):
+    def setUp(self):
+        self.addCleanup(shutil.rmtree, EXPORT_ROOT, ignore_errors=True)
+        User = get_user_model()
+        self.user = User.objects.create_user("export@gmail.com", "12345e")
+        self.other = other = User.objects.create_user("other@gmail.com", "12345o")
+        profile = Profile.objects.create(user=self.user, username="Exporter")
+        other_profile = Profile.objects.create(user=other, username="Other")
+        profile.following.add(other_profile)
+        for i in range(5):
+            post = Post.objects.create(
+                owner=self.user, profile=profile, title=f"Post {i}", content="Hi"
+            )
+            Comment.objects.create(post=post, user=self.user, content="Mine")
+        other_post = Post.objects.create(
+            owner=other, profile=other_profile, title="Other", content="Hi"
+        )
+        PostLike.objects.create(post=other_post, author=self.user, status="LIKE")
+        Comment.objects.create(post=other_post, user=other, content="Not mine")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def rows(self, lines):
+        return [json.loads(line) for line in lines]
+
+    def test_stream_contains_only_the_users_data(self):
+        response = self.client.get("/api/export/")
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = self.rows(b"".join(response.streaming_content).splitlines())
+        kinds = [row["type"] for row in rows]
+        self.assertEqual(
+            kinds, ["profile"] + ["post"] * 5 + ["comment"] * 5 + ["like", "follow"]
+        )
+        self.assertNotIn("Not mine", [row.get("content") for row in rows])
+
+    def test_one_query_per_section_whatever_the_chunk_size(self):
+        with CaptureQueriesContext(connection) as queries:
+            rows = self.rows(export_lines(self.user, chunk_size=2))
+
+        self.assertEqual(len(rows), 13)
+        self.assertEqual(len(queries), 5)
+
+    def test_command_writes_ndjson(self):
+        out = StringIO()
+        call_command("export_user_data", "export@gmail.com", stdout=out)
+
+        self.assertEqual(len(self.rows(out.getvalue().splitlines())), 13)
+
+    def test_archive_is_served_only_to_its_owner(self):
+        response = self.client.post("/api/export/archive/")
+
+        self.assertEqual(response.status_code, 202)
+        url = urlparse(response.data["url"]).path
+        response = self.client.get(url)
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        archive = gzip.decompress(b"".join(response.streaming_content))
+        self.assertEqual(len(self.rows(archive.splitlines())), 13)
+
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_old_archives_are_deleted(self):
+        self.client.post("/api/export/archive/")
+        self.client.post("/api/export/archive/")
+        storage = export_storage()
+        directory = str(self.user.id)
+        old, new = sorted(storage.listdir(directory)[1])
+        stale = time.time() - 2 * 24 * 3600
+        os.utime(storage.path(f"{directory}/{old}"), (stale, stale))
+
+        self.assertEqual(delete_old_exports(), 1)
+        self.assertEqual(storage.listdir(directory)[1], [new])
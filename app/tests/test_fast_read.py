@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from app.models import Comment, Post, PostLike, Profile
+from app.serializers import PostSerializer
+
+POST_URL = "/api/post/"
+COMMENT_URL = "/api/comment/"
+PROFILE_URL = "/api/profile/"
+
+
+class FastReadParityTests(TestCase):
+    """The values() list path renders exactly what the serializers render."""
+
+    def setUp(self):
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(f"fast{i}@gmail.com", f"12345fast{i}")
+            for i in range(4)
+        ]
+        self.profiles = [
+            Profile.objects.create(user=user, username=f"Fast{i}", city="Kyiv")
+            for i, user in enumerate(self.users)
+        ]
+        Profile.objects.filter(pk=self.profiles[1].pk).update(
+            avatar="uploads/profiles/fast.png", birth_date="1990-01-01"
+        )
+        self.reader = self.profiles[0]
+        self.reader.following.add(*self.profiles[1:])
+        self.profiles[2].following.add(self.reader)
+        for i in range(12):
+            profile = self.profiles[1 + i % 3]
+            post = Post.objects.create(
+                owner=profile.user,
+                profile=profile,
+                title=f"Post {i}",
+                content=f"#fast {i}",
+                is_published=i != 5,
+            )
+            if i % 4 == 0:
+                Post.objects.filter(pk=post.pk).update(image="uploads/posts/p.png")
+            for user in self.users[: i % 4]:
+                PostLike.objects.create(
+                    post=post,
+                    author=user,
+                    status=("LIKE", "UNLIKE")[user.pk % 2],
+                )
+                Comment.objects.create(post=post, user=user, content=f"On {i}")
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[0])
+
+    def get(self, url, fast):
+        with override_settings(FAST_LIST_READS=fast):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return response.content, len(context.captured_queries)
+
+    def assert_parity(self, url):
+        fast, fast_queries = self.get(url, fast=True)
+        slow, slow_queries = self.get(url, fast=False)
+        self.assertEqual(fast, slow, url)
+        self.assertLessEqual(fast_queries, slow_queries, url)
+        return fast
+
+    def test_post_list(self):
+        content = self.assert_parity(POST_URL)
+        self.assertIn(b"http://testserver/media/uploads/posts/p.png", content)
+        self.assert_parity(POST_URL + "?page=2")
+        self.assert_parity(POST_URL + "?order=ranked&search=fast")
+
+    def test_post_list_sparse(self):
+        self.assert_parity(POST_URL + "?fields=id,comments,likes_count")
+        self.assert_parity(POST_URL + "?omit=comments,image")
+
+    def test_comment_list(self):
+        self.assert_parity(COMMENT_URL)
+        self.assert_parity(COMMENT_URL + "?fields=owner,post_title")
+
+    def test_profile_list(self):
+        content = self.assert_parity(PROFILE_URL)
+        self.assertIn(b"http://testserver/media/uploads/profiles/fast.png", content)
+        self.users[0].is_staff = True
+        self.users[0].save()
+        content = self.assert_parity(PROFILE_URL)
+        self.assertIn(b'"posts":[{', content)
+
+    def test_follow_lists(self):
+        self.assert_parity(f"{PROFILE_URL}{self.profiles[2].id}/followers_list/")
+        self.assert_parity(f"{PROFILE_URL}{self.reader.id}/following_list/")
+
+    def test_serializers_are_bypassed(self):
+        with mock.patch.object(
+            PostSerializer, "to_representation", side_effect=AssertionError
+        ):
+            self.get(POST_URL, fast=True)
+            with self.assertRaises(AssertionError):
+                self.get(POST_URL, fast=False)
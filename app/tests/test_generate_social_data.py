@@ -0,0 +1,38 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from app.models import Comment, Post, PostLike, Profile
+
+
+class GenerateSocialDataTests(TestCase):
+    def generate(self, **options):
+        out = StringIO()
+        call_command("generate_social_data", users=40, stdout=out, **options)
+        return out.getvalue()
+
+    def test_dataset_is_deterministic(self):
+        first = self.generate()
+        second = self.generate(clear=True)
+
+        self.assertEqual(first, second)
+        self.assertEqual(
+            Profile.objects.filter(username__startswith="user").count(), 40
+        )
+        self.assertTrue(Post.objects.exists())
+        self.assertTrue(PostLike.objects.exists())
+        self.assertTrue(Comment.objects.exists())
+
+    def test_follow_graph_is_skewed(self):
+        self.generate()
+        followers = sorted(
+            (profile.followings.count() for profile in Profile.objects.all()),
+            reverse=True,
+        )
+        self.assertGreater(followers[0], 4 * max(followers[len(followers) // 2], 1))
+
+    def test_refuses_to_generate_twice(self):
+        self.generate()
+        with self.assertRaises(CommandError):
+            self.generate()
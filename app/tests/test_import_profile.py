@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from app.management.commands.import_profile import FORBIDDEN, profile_role
+
+
+class ImportProfileTests(SimpleTestCase):
+    def test_worker_boots_without_http_stack(self):
+        modules = profile_role("worker")
+
+        self.assertIn("celery.app.base", modules)
+        for name in FORBIDDEN["worker"] + ("app.views", "rest_framework.views"):
+            self.assertNotIn(name, modules)
+
+    def test_api_loads_views_but_not_beat(self):
+        modules = profile_role("api")
+
+        self.assertIn("app.views", modules)
+        self.assertNotIn("django_celery_beat", modules)
+
+    def test_worker_refuses_to_boot_without_a_broker(self):
+        env = {
+            key: value
+            for key, value in os.environ.items()
+            if key not in ("CELERY_BROKER_URL", "CELERY_TASK_ALWAYS_EAGER")
+        }
+        env.update(PY_NET_ROLE="worker", DJANGO_SETTINGS_MODULE="py_net.settings")
+        result = subprocess.run(
+            [sys.executable, "-c", "import django; django.setup()"],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("needs CELERY_BROKER_URL", result.stderr)
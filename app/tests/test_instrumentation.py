@@ -0,0 +1,74 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from app.models import Post, Profile
+from py_net import instrumentation
+
+SERVER_TIMING = re.compile(
+    r'^db;dur=[\d.]+;desc="(\d+) queries", serializer;dur=([\d.]+), '
+    r"view;dur=([\d.]+)$"
+)
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("timing@gmail.com", "12345t")
+        profile = Profile.objects.create(user=self.user, username="Timing")
+        Post.objects.create(
+            owner=self.user, profile=profile, title="Timed", content="Timed"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_header_reports_queries_and_timings(self):
+        response = self.client.get("/api/post/")
+
+        match = SERVER_TIMING.match(response["Server-Timing"])
+        self.assertIsNotNone(match, response["Server-Timing"])
+        self.assertGreater(int(match.group(1)), 0)
+        self.assertGreaterEqual(float(match.group(3)), float(match.group(2)))
+
+    def test_serializer_time_without_patching_drf(self):
+        data = serializers.BaseSerializer.__dict__["data"]
+        for url in ("/api/post/", "/api/post/?format=msgpack"):
+            response = self.client.get(url)
+            match = SERVER_TIMING.match(response["Server-Timing"])
+            self.assertGreater(float(match.group(2)), 0, url)
+        self.assertEqual(data.fget.__module__, "rest_framework.serializers")
+
+    def test_histograms_are_recorded_per_endpoint(self):
+        self.client.get("/api/post/")
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.get("/api/metrics/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn("# TYPE pynet_request_duration_seconds histogram", body)
+        self.assertIn(
+            'pynet_db_queries_count{endpoint="app:post-list",method="GET"}', body
+        )
+
+    def test_metrics_are_staff_only(self):
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 403)
+
+
+class HistogramTests(TestCase):
+    def test_buckets_are_cumulative(self):
+        histogram = instrumentation.Histogram("test_seconds", "Test.", (0.1, 1))
+        labels = (("endpoint", "x"),)
+        for value in (0.05, 0.5, 5):
+            histogram.observe(labels, value)
+
+        lines = histogram.render().splitlines()
+
+        self.assertIn('test_seconds_bucket{endpoint="x",le="0.1"} 1', lines)
+        self.assertIn('test_seconds_bucket{endpoint="x",le="1"} 2', lines)
+        self.assertIn('test_seconds_bucket{endpoint="x",le="+Inf"} 3', lines)
+        self.assertIn('test_seconds_count{endpoint="x"} 3', lines)
@@ -0,0 +1,176 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from rest_framework import status
+
+from app.models import MediaBlob, Post, Profile
+from app.storage import get_media_storage
+from app.tasks import collect_media_garbage
+
+MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = bytes(range(256)) * 4
+HASHED_NAME = "blobs/ab/" + "ab" * 32 + ".mp4"
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class MediaServeTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for name in ("uploads/posts/video.mp4", HASHED_NAME):
+            path = os.path.join(MEDIA_ROOT, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_full_response(self):
+        response = self.client.get("/media/uploads/posts/video.mp4")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Length"], str(len(CONTENT)))
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+
+    def test_byte_range(self):
+        response = self.client.get(
+            "/media/uploads/posts/video.mp4", HTTP_RANGE="bytes=10-19"
+        )
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[10:20])
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(CONTENT)}")
+        self.assertEqual(response["Content-Length"], "10")
+
+    def test_suffix_range(self):
+        response = self.client.get(
+            "/media/uploads/posts/video.mp4", HTTP_RANGE="bytes=-5"
+        )
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[-5:])
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(
+            "/media/uploads/posts/video.mp4", HTTP_RANGE="bytes=5000-"
+        )
+        self.assertEqual(
+            response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+        self.assertEqual(response["Content-Range"], f"bytes */{len(CONTENT)}")
+
+    def test_unsupported_or_invalid_range_returns_full_file(self):
+        for header in ("bytes=0-1,5-6", "bytes=9-0", "bytes=-", "items=0-1", "x"):
+            response = self.client.get(
+                "/media/uploads/posts/video.mp4", HTTP_RANGE=header
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK, header)
+            self.assertEqual(b"".join(response.streaming_content), CONTENT)
+
+    def test_stale_if_range_returns_full_file(self):
+        response = self.client.get(
+            "/media/uploads/posts/video.mp4",
+            HTTP_RANGE="bytes=0-9",
+            HTTP_IF_RANGE='"stale"',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_if_none_match(self):
+        etag = self.client.get("/media/uploads/posts/video.mp4")["ETag"]
+        response = self.client.get(
+            "/media/uploads/posts/video.mp4", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_content_hashed_name_is_immutable(self):
+        response = self.client.get(f"/media/{HASHED_NAME}")
+        self.assertEqual(
+            response["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+
+    def test_missing_file(self):
+        response = self.client.get("/media/uploads/posts/missing.mp4")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(MEDIA_ACCEL_REDIRECT_PREFIX="/protected-media/")
+    def test_accel_redirect(self):
+        response = self.client.get("/media/uploads/posts/video.mp4")
+        self.assertEqual(
+            response["X-Accel-Redirect"], "/protected-media/uploads/posts/video.mp4"
+        )
+        self.assertEqual(response.content, b"")
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = get_user_model().objects.create_user(
+            "media@gmail.com", "12345media"
+        )
+        self.profile = Profile.objects.create(user=self.user, username="Media")
+
+    def create_post(self, title, content=CONTENT):
+        post = Post(owner=self.user, profile=self.profile, title=title, content="")
+        post.image.save("photo.png", ContentFile(content), save=False)
+        post.save()
+        return post
+
+    def test_same_content_is_stored_once(self):
+        post1 = self.create_post("First")
+        post2 = self.create_post("Second")
+
+        self.assertEqual(post1.image.name, post2.image.name)
+        self.assertRegex(post1.image.name, r"^blobs/[0-9a-f]{2}/[0-9a-f]{64}\.png$")
+        blob = MediaBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(blob.size, len(CONTENT))
+
+    def test_unreferenced_blob_is_collected(self):
+        post1 = self.create_post("First")
+        post2 = self.create_post("Second")
+        name = post1.image.name
+
+        post1.delete()
+        self.assertEqual(MediaBlob.objects.get().ref_count, 1)
+        post2.image = None
+        post2.save()
+        self.assertEqual(MediaBlob.objects.get().ref_count, 0)
+
+        self.assertEqual(collect_media_garbage(), 0)
+        MediaBlob.objects.update(updated_time=post2.created_time - timedelta(days=1))
+        self.assertEqual(collect_media_garbage(), 1)
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertFalse(get_media_storage().exists(name))
+
+    def test_upload_while_collecting_keeps_its_file(self):
+        post = self.create_post("First")
+        name = post.image.name
+        post.image = None
+        post.save()
+        MediaBlob.objects.update(updated_time=post.created_time - timedelta(days=1))
+        storage = get_media_storage()
+        delete = storage.delete
+
+        def upload_after_delete(name):
+            # The same bytes come in between the file and the row going.
+            delete(name)
+            self.create_post("Second")
+
+        with mock.patch.object(storage, "delete", side_effect=upload_after_delete):
+            self.assertEqual(collect_media_garbage(), 0)
+        self.assertEqual(MediaBlob.objects.get().name, name)
+        self.assertTrue(storage.exists(name))
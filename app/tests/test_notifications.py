@@ -0,0 +1,160 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from app.deletion import schedule_deletion
+from app.models import Notification, PendingNotification, Post, Profile
+from app.notifications import deliver, deliver_pending, notify
+
+NOTIFICATIONS_URL = "/api/notifications/"
+
+
+class NotificationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(f"fan{i}@gmail.com", f"12345fan{i}")
+            for i in range(4)
+        ]
+        self.profiles = [
+            Profile.objects.create(user=user, username=f"Fan{i}")
+            for i, user in enumerate(self.users)
+        ]
+        self.author = self.users[0]
+        self.post = Post.objects.create(
+            owner=self.author, profile=self.profiles[0], title="Viral", content="!"
+        )
+        self.client = APIClient()
+
+    def as_user(self, user):
+        self.client.force_authenticate(user)
+        return self.client
+
+    def like(self, user, post=None):
+        post = post or self.post
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.as_user(user).post(
+                f"/api/post/{post.id}/postlike/create/", {"status": "LIKE"}
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def inbox(self):
+        return self.as_user(self.author).get(NOTIFICATIONS_URL).data["results"]
+
+    def unread(self):
+        response = self.as_user(self.author).get(f"{NOTIFICATIONS_URL}unread-count/")
+        return response.data["unread_count"]
+
+    def test_likes_on_a_post_are_merged(self):
+        for user in self.users[1:]:
+            self.like(user)
+
+        (entry,) = self.inbox()
+        self.assertEqual(entry["actor_count"], 3)
+        self.assertEqual(entry["text"], "Fan3 and 2 others liked your post")
+        self.assertEqual(self.unread(), 1)
+
+    def test_follow_and_comment_are_separate_entries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.as_user(self.users[1]).post(
+                f"/api/profile/{self.profiles[0].id}/follow/"
+            )
+            self.as_user(self.users[1]).post(
+                f"/api/profile/{self.profiles[0].id}/follow/"
+            )
+            self.as_user(self.users[2]).post(
+                f"/api/post/{self.post.id}/comment/create/", {"content": "Wow"}
+            )
+
+        texts = sorted(entry["text"] for entry in self.inbox())
+        self.assertEqual(texts, ["Fan1 followed you", "Fan2 commented on your post"])
+        self.assertEqual(self.unread(), 2)
+
+    def test_own_actions_do_not_notify(self):
+        self.like(self.author)
+        self.assertEqual(self.inbox(), [])
+
+    def test_reading_starts_a_new_entry(self):
+        self.like(self.users[1])
+        self.as_user(self.author).post(f"{NOTIFICATIONS_URL}read/")
+        self.assertEqual(self.unread(), 0)
+
+        self.like(self.users[2])
+
+        entries = self.inbox()
+        self.assertEqual([entry["is_read"] for entry in entries], [False, True])
+        self.assertEqual(self.unread(), 1)
+        self.as_user(self.author).post(
+            f"{NOTIFICATIONS_URL}{entries[0]['id']}/read/"
+        )
+        self.assertEqual(self.unread(), 0)
+
+    def test_read_with_a_bad_id(self):
+        response = self.as_user(self.author).post(f"{NOTIFICATIONS_URL}x/read/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_purge_fixes_the_unread_count(self):
+        self.like(self.users[1])
+        other_post = Post.objects.create(
+            owner=self.author, profile=self.profiles[0], title="Stays", content="!"
+        )
+        self.like(self.users[1], other_post)
+        self.assertEqual(self.unread(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule_deletion(self.post, self.author)
+        self.assertEqual(self.unread(), 1)
+
+    def test_batch_costs_one_write_per_group(self):
+        events = [
+            (self.author.id, Notification.VerbChoices.LIKE, self.post.id, user.id)
+            for user in self.users[1:]
+        ] * 100
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(deliver(events), 1)
+
+        writes = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith(("INSERT", "UPDATE"))
+        ]
+        self.assertLessEqual(len(writes), 4)
+        self.assertEqual(Notification.objects.get().actor_count, 300)
+
+    def test_events_queue_up_for_one_delivery(self):
+        with mock.patch("app.tasks.deliver_notifications.apply_async") as apply_async:
+            for user in self.users[1:]:
+                self.like(user)
+        apply_async.assert_called_once()
+        self.assertEqual(PendingNotification.objects.count(), 3)
+        self.assertEqual(self.inbox(), [])
+
+        notify(Notification.VerbChoices.FOLLOW, self.author.id, self.users[1].id)
+        with mock.patch("app.notifications.deliver", wraps=deliver) as delivered:
+            self.assertEqual(deliver_pending(batch_size=3), 4)
+        self.assertEqual(delivered.call_count, 2)
+        self.assertEqual([entry["actor_count"] for entry in self.inbox()], [1, 3])
+        self.assertFalse(PendingNotification.objects.exists())
+
+    def test_inbox_is_cursor_paginated(self):
+        for post_number in range(25):
+            post = Post.objects.create(
+                owner=self.author,
+                profile=self.profiles[0],
+                title=f"Post {post_number}",
+                content="!",
+            )
+            self.like(self.users[1], post)
+
+        first = self.as_user(self.author).get(NOTIFICATIONS_URL).data
+        second = self.client.get(first["next"]).data
+
+        self.assertEqual(len(first["results"]), 20)
+        self.assertEqual(len(second["results"]), 5)
+        self.assertEqual(self.unread(), 25)
@@ -150,6 +150,19 @@ class AuthenticatedProfileApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(profile_ids, [self.profile1.id, self.profile2.id])
 
+    def test_follower_avatars_are_absolute_like_the_profile_page(self):
+        Profile.objects.filter(pk=self.profile1.pk).update(avatar="avatar.jpg")
+        response = self.client.get(
+            reverse("app:profile-followers", kwargs={"pk": self.profile.id})
+        )
+        detail = self.client.get(
+            reverse("app:profile-detail", kwargs={"pk": self.profile1.id})
+        )
+
+        avatar = response.data[0]["avatar"]
+        self.assertTrue(avatar.startswith("http://testserver/"), avatar)
+        self.assertEqual(avatar, detail.data["avatar"])
+
     def test_list_followings(self):
         self.profile.followings.add(self.profile1)
         response = self.client.get(
@@ -0,0 +1,134 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from app.models import Profile
+from app.provisioning import MAX_PROVISION_ROWS, Provisioning
+from user.models import User
+
+PROVISION_URL = "/api/user/provision/"
+
+
+def row(email, password="12345", **fields):
+    return {"email": email, "password": password, **fields}
+
+
+class ProvisionUsersTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            "provisioner@gmail.com", "12345provisioner", is_staff=True
+        )
+        taken = User.objects.create_user("taken@partner.test", "12345taken")
+        Profile.objects.create(user=taken, username="Taken")
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_rows_fail_one_by_one(self):
+        response = self.client.post(
+            PROVISION_URL,
+            {
+                "users": [
+                    row("ann@partner.TEST", username="Ann"),
+                    row("bob@partner.test"),
+                    row("not an email"),
+                    row("ann@partner.test"),
+                    row("cy@partner.test", password="123"),
+                    row("dee@partner.test", username="Taken"),
+                    row("taken@partner.test"),
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["existing"], 1)
+        self.assertEqual(
+            [(item["row"], list(item["errors"])) for item in response.data["failed"]],
+            [(3, ["email"]), (4, ["email"]), (5, ["password"]), (6, ["username"])],
+        )
+        ann = User.objects.get(email="ann@partner.test")
+        self.assertTrue(ann.check_password("12345"))
+        self.assertEqual(ann.profile.slug, "ann")
+        self.assertFalse(Profile.objects.filter(user__email="bob@partner.test"))
+
+    def test_slugs_are_looked_up_per_username(self):
+        for username in ("ann", "Annex"):
+            user = User.objects.create_user(f"{username}@other.test", "12345")
+            Profile.objects.create(user=user, username=username)
+        provisioning = Provisioning(workers=1)
+        provisioning.run([row("ann@partner.test", username="ANN")])
+
+        ann = User.objects.get(email="ann@partner.test")
+        self.assertEqual(ann.profile.slug, "ann-2")
+        # Only slugs the new username could collide with were loaded.
+        self.assertEqual(provisioning.slugs, {"ann", "ann-2"})
+
+    def test_large_requests_are_refused(self):
+        rows = [row(f"many{i}@partner.test") for i in range(MAX_PROVISION_ROWS + 1)]
+        with mock.patch("app.provisioning.ProcessPoolExecutor") as pool:
+            response = self.client.post(PROVISION_URL, {"users": rows}, format="json")
+            self.assertEqual(response.status_code, 400)
+            response = self.client.post(
+                PROVISION_URL, {"users": rows[:-1]}, format="json"
+            )
+        self.assertEqual(response.data["created"], MAX_PROVISION_ROWS)
+        pool.assert_not_called()
+
+    def test_staff_only(self):
+        self.client.force_authenticate(User.objects.get(email="taken@partner.test"))
+        response = self.client.post(PROVISION_URL, {"users": [{}]}, format="json")
+        self.assertEqual(response.status_code, 403)
+
+    def test_hashes_in_worker_processes(self):
+        rows = [
+            {"email": f"pooled{i}@partner.test", "password": f"12345pooled{i}"}
+            for i in range(4)
+        ]
+        report = Provisioning(batch_size=3, workers=2).run(rows)
+        self.assertEqual(report, {"created": 4, "existing": 0, "failed": []})
+        user = User.objects.get(email="pooled3@partner.test")
+        self.assertTrue(user.check_password("12345pooled3"))
+
+
+class ProvisionUsersCommandTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.path = os.path.join(directory, "users.csv")
+        with open(self.path, "w") as file:
+            file.write("email,password,username\n")
+            usernames = ["Csv User", "Csv-User", "CSV user", "csv user!", "Csv  User"]
+            for i, username in enumerate(usernames):
+                file.write(f"csv{i}@partner.test,12345csv{i},{username}\n")
+
+    def provision(self):
+        out, err = StringIO(), StringIO()
+        call_command(
+            "provision_users",
+            self.path,
+            batch_size=2,
+            workers=1,
+            stdout=out,
+            stderr=err,
+        )
+        return out.getvalue(), err.getvalue()
+
+    def test_repeated_run_resumes(self):
+        User.objects.create_user("csv1@partner.test", "12345csv1")
+        out, err = self.provision()
+        self.assertIn("Created 4 users, skipped 1 existing, 0 failed", out)
+        self.assertEqual(
+            list(
+                Profile.objects.filter(user__email__startswith="csv")
+                .order_by("user__email")
+                .values_list("slug", flat=True)
+            ),
+            ["csv-user", "csv-user-2", "csv-user-3", "csv-user-4"],
+        )
+
+        out, err = self.provision()
+        self.assertIn("Created 0 users, skipped 5 existing, 0 failed", out)
@@ -0,0 +1,165 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from app.models import Comment, EngagementBucket, Post, PostLike, Profile
+from app.trending import WINDOWS, top_keys
+
+# A scan of a table; the admin's capped COUNT(*) scans its own LIMITed subquery.
+FULL_SCAN_RE = re.compile(r"^SCAN (?!subquery$)(\w+)$")
+
+
+def query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[3] for row in cursor.fetchall()]
+
+
+class QueryPlanTests(TestCase):
+    """Every hot endpoint must be answered through indexes, never a table scan."""
+
+    def setUp(self):
+        self.client = APIClient()
+        users = [
+            get_user_model().objects.create_user(f"plan{i}@gmail.com", f"12345plan{i}")
+            for i in range(3)
+        ]
+        self.profiles = [
+            Profile.objects.create(user=user, username=f"Plan{i}")
+            for i, user in enumerate(users)
+        ]
+        self.profiles[0].following.add(self.profiles[1])
+        self.posts = [
+            Post.objects.create(
+                owner=user, profile=profile, title=f"Plan {i}", content="#plan"
+            )
+            for i, (user, profile) in enumerate(zip(users, self.profiles))
+        ]
+        for user in users:
+            Comment.objects.create(post=self.posts[1], user=user, content="Nice")
+            PostLike.objects.create(post=self.posts[1], author=user, status="LIKE")
+        self.user = users[0]
+        self.client.force_authenticate(self.user)
+
+    def plans_for(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return [
+            (query["sql"], query_plan(query["sql"]))
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT")
+        ]
+
+    def assert_indexed(self, url, *expected_indexes):
+        plans = self.plans_for(url)
+        for sql, plan in plans:
+            for step in plan:
+                match = FULL_SCAN_RE.match(step)
+                self.assertIsNone(match, f"{url} scans a whole table:\n{sql}\n{plan}")
+        used = "\n".join(step for _, plan in plans for step in plan)
+        for index in expected_indexes:
+            self.assertIn(index, used, f"{url} no longer uses {index}")
+
+    # Feeds look up posts per followed profile through either per-profile index
+    # (post_profile_created_idx or post_profile_score_idx), then sort the merge.
+    def test_feed(self):
+        self.assert_indexed(
+            "/api/post/", "INDEX post_profile_", "postlike_post_status_idx"
+        )
+
+    def test_ranked_feed(self):
+        self.assert_indexed("/api/post/?order=ranked", "INDEX post_profile_")
+
+    # A page's comments come in one `post_id IN (...)` query, which the planner
+    # may sort rather than read in comment_post_created_idx order.
+    def test_feed_comments(self):
+        plans = self.plans_for("/api/post/")
+        self.assertEqual(
+            len([sql for sql, _ in plans if 'FROM "app_comment"' in sql]), 1
+        )
+        self.assert_indexed("/api/post/", "SEARCH app_comment USING INDEX")
+
+    def test_post_detail(self):
+        self.assert_indexed(
+            f"/api/post/{self.posts[1].id}/",
+            "postlike_post_status_idx",
+            "comment_post_created_idx",
+        )
+
+    def test_comment_list(self):
+        self.assert_indexed("/api/comment/", "INDEX post_profile_")
+
+    def test_liked_posts(self):
+        self.client.force_authenticate(self.posts[2].owner)
+        self.assert_indexed("/api/posts/liked/", "postlike_author_status_idx")
+
+    def test_profile_detail(self):
+        self.assert_indexed(f"/api/profile/{self.profiles[1].id}/")
+
+    def test_profile_list(self):
+        self.assert_indexed("/api/profile/")
+
+    def test_followers_and_following(self):
+        self.assert_indexed(f"/api/profile/{self.profiles[1].id}/followers/")
+        self.assert_indexed(f"/api/profile/{self.profiles[0].id}/following/")
+
+    # Filtered, ordered by follower count and paged by cursor in the index.
+    def test_directory(self):
+        for url, index in (
+            ("/api/profile/directory/?min_age=18", "profile_directory_idx"),
+            (
+                "/api/profile/directory/?city=Kyiv&max_age=40&cursor=MC4x",
+                "profile_city_directory_idx",
+            ),
+        ):
+            self.assert_indexed(url, index)
+            for sql, plan in self.plans_for(url):
+                self.assertNotIn("USE TEMP B-TREE", "\n".join(plan), sql)
+
+    def test_profile_search(self):
+        self.assert_indexed("/api/profile/search/Plan/")
+
+    def test_notification_inbox(self):
+        self.assert_indexed("/api/notifications/", "notification_inbox_idx")
+
+    def test_admin_date_and_email_filters(self):
+        admin = get_user_model().objects.create_superuser(
+            "plan.admin@gmail.com", "12345admin"
+        )
+        self.client.force_login(admin)
+        today = timezone.now()
+        date = f"created_time__year={today.year}&created_time__month={today.month}"
+        for model, index in (
+            ("post", "post_created_idx"),
+            ("comment", "comment_created_idx"),
+            ("postlike", "postlike_created_idx"),
+        ):
+            self.assert_indexed(f"/admin/app/{model}/?{date}", index)
+        self.assert_indexed("/admin/app/post/?owner=plan1@gmail.com")
+        self.assert_indexed("/admin/app/profile/?city=Kyiv")
+
+    def test_due_scheduled_posts(self):
+        due = Post.objects.filter(is_published=False, publish_at__lte=timezone.now())
+        sql, params = (
+            due.order_by("publish_at").values("id")[:1000].query.sql_with_params()
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = "\n".join(row[3] for row in cursor.fetchall())
+        self.assertIn("post_scheduled_idx", plan)
+
+    def test_trending_window(self):
+        since = timezone.now() - WINDOWS["7d"]
+        query = top_keys(EngagementBucket.KindChoices.POST, since).query
+        sql, params = query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = "\n".join(row[3] for row in cursor.fetchall())
+        # SQLite names the index of engagement_bucket_unique itself.
+        self.assertIn("(kind=? AND start>?)", plan)
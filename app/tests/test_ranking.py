@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from app.models import Comment, Post, PostLike, Profile
+from app.ranking import hot_score, recompute_scores
+from app.serializers import PostUpdateSerializer
+from app.tasks import publish_due_posts
+
+POST_URL = "/api/post/"
+
+
+class RankedFeedTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(f"rank{i}@gmail.com", f"12345rank{i}")
+            for i in range(4)
+        ]
+        self.profiles = [
+            Profile.objects.create(user=user, username=f"Rank{i}")
+            for i, user in enumerate(self.users)
+        ]
+        self.reader = self.profiles[0]
+        self.reader.following.add(self.profiles[1])
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[0])
+
+    def create_post(self, title, hours_ago=0):
+        post = Post.objects.create(
+            owner=self.users[1], profile=self.profiles[1], title=title, content="!"
+        )
+        if hours_ago:
+            Post.objects.filter(pk=post.pk).update(
+                created_time=post.created_time - timedelta(hours=hours_ago)
+            )
+            recompute_scores([post.pk])
+        post.refresh_from_db()
+        return post
+
+    def like(self, post, user):
+        PostLike.objects.create(
+            post=post, author=user, status=PostLike.StatusChoices.LIKE
+        )
+
+    def titles(self, query=""):
+        response = self.client.get(POST_URL + query)
+        return [post["title"] for post in response.data["results"]]
+
+    def test_new_post_is_scored_by_age(self):
+        post = self.create_post("Fresh")
+        self.assertEqual(post.engagement, 0)
+        self.assertAlmostEqual(post.score, hot_score(0, post.created_time), places=3)
+
+    def test_likes_and_comments_move_the_score(self):
+        post = self.create_post("Engaging")
+        for user in self.users[1:]:
+            self.like(post, user)
+        PostLike.objects.create(
+            post=post, author=self.users[0], status=PostLike.StatusChoices.UNLIKE
+        )
+        Comment.objects.create(post=post, user=self.users[2], content="Yes")
+        post.refresh_from_db()
+        self.assertEqual(post.engagement, 4)
+        self.assertAlmostEqual(post.score, hot_score(4, post.created_time), places=3)
+
+        incremental = post.score
+        recompute_scores([post.pk])
+        post.refresh_from_db()
+        self.assertAlmostEqual(post.score, incremental)
+
+    def test_deleting_a_comment_takes_its_engagement_back(self):
+        post = self.create_post("Commented")
+        comment = Comment.objects.create(post=post, user=self.users[0], content="!")
+        response = self.client.delete(f"/api/comment/{comment.pk}/")
+        self.assertEqual(response.status_code, 204)
+        post.refresh_from_db()
+        self.assertEqual(post.engagement, 0)
+        self.assertAlmostEqual(post.score, hot_score(0, post.created_time), places=3)
+
+    def test_editing_a_post_keeps_likes_made_while_editing(self):
+        post = self.create_post("Draft title")
+        self.like(Post.objects.get(pk=post.pk), self.users[2])
+        serializer = PostUpdateSerializer(
+            post, data={"title": "Edited title"}, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        post.refresh_from_db()
+        self.assertEqual(post.title, "Edited title")
+        self.assertEqual(post.engagement, 1)
+        self.assertAlmostEqual(post.score, hot_score(1, post.created_time), places=3)
+
+    def test_ranked_feed_prefers_engagement_over_recency(self):
+        popular = self.create_post("Popular", hours_ago=2)
+        self.create_post("Quiet")
+        for user in self.users[1:]:
+            self.like(popular, user)
+
+        self.assertEqual(self.titles(), ["Quiet", "Popular"])
+        self.assertEqual(self.titles("?order=ranked"), ["Popular", "Quiet"])
+
+    def test_published_posts_are_rescored(self):
+        post = Post.objects.create(
+            owner=self.users[1],
+            profile=self.profiles[1],
+            title="Scheduled",
+            content="!",
+            publish_at=timezone.now() - timedelta(minutes=1),
+            is_published=False,
+        )
+        publish_due_posts()
+        post.refresh_from_db()
+        self.assertAlmostEqual(post.score, hot_score(0, post.publish_at))
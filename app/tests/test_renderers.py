@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+import msgpack
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from app.models import Comment, Post, Profile
+from app.renderers import MessagePackRenderer, ORJSONRenderer
+
+POST_URL = "/api/post/"
+
+
+class RendererTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user("render@gmail.com", "12345render")
+        self.profile = Profile.objects.create(user=self.user, username="Render")
+        for i in range(3):
+            post = Post.objects.create(
+                owner=self.user,
+                profile=self.profile,
+                title=f"Пост {i}",
+                content="Line\u2028break #render",
+            )
+            Comment.objects.create(post=post, user=self.user, content="Nice")
+        Post.objects.filter(title="Пост 0").update(image="uploads/posts/r.png")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_json_matches_drf_renderer(self):
+        response = self.client.get(POST_URL)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_msgpack_by_accept_header(self):
+        json_response = self.client.get(POST_URL)
+        response = self.client.get(POST_URL, HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(response.content), json_response.json())
+        self.assertLess(len(response.content), len(json_response.content))
+
+    def test_msgpack_request_body(self):
+        response = self.client.post(
+            POST_URL,
+            msgpack.packb({"title": "Packed", "content": "#msgpack"}),
+            content_type="application/msgpack",
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertTrue(Post.objects.filter(title="Packed").exists())
+
+        response = self.client.post(
+            POST_URL, b"\xc1", content_type="application/msgpack"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_native_types(self):
+        post = Post.objects.get(title="Пост 0")
+        created = datetime(2024, 5, 1, 12, 30, 15, 250, tzinfo=timezone.utc)
+        data = {"image": post.image, "empty": Post().image, "at": created}
+
+        self.assertEqual(
+            ORJSONRenderer().render(data),
+            JSONRenderer().render(
+                {"image": post.image.url, "empty": None, "at": created}
+            ),
+        )
+        unpacked = msgpack.unpackb(MessagePackRenderer().render(data), timestamp=3)
+        self.assertEqual(
+            unpacked, {"image": post.image.url, "empty": None, "at": created}
+        )
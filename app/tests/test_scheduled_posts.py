@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from app.models import Post, Profile
+from app.tasks import publish_due_posts
+
+POST_URL = "/api/post/"
+
+
+class ScheduledPostTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.author = User.objects.create_user("author@gmail.com", "12345a")
+        self.reader = User.objects.create_user("reader@gmail.com", "12345r")
+        self.author_profile = Profile.objects.create(user=self.author, username="Au")
+        reader_profile = Profile.objects.create(user=self.reader, username="Re")
+        reader_profile.following.add(self.author_profile)
+        self.client = APIClient()
+
+    def schedule(self, minutes, title="Later"):
+        return Post.objects.create(
+            owner=self.author,
+            profile=self.author_profile,
+            title=title,
+            content="Scheduled",
+            publish_at=timezone.now() + timedelta(minutes=minutes),
+            is_published=False,
+        )
+
+    def feed_ids(self, user):
+        self.client.force_authenticate(user)
+        return [post["id"] for post in self.client.get(POST_URL).data["results"]]
+
+    def test_create_with_publish_at_schedules_post(self):
+        self.client.force_authenticate(self.author)
+        publish_at = timezone.now() + timedelta(hours=1)
+
+        response = self.client.post(
+            POST_URL,
+            {"title": "Later", "content": "Soon", "publish_at": publish_at.isoformat()},
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.data["is_published"])
+        self.assertFalse(Post.objects.get(id=response.data["id"]).is_published)
+
+    def test_create_without_publish_at_publishes_now(self):
+        self.client.force_authenticate(self.author)
+
+        response = self.client.post(POST_URL, {"title": "Now", "content": "Now"})
+
+        self.assertTrue(response.data["is_published"])
+        self.assertIn(response.data["id"], self.feed_ids(self.reader))
+
+    def test_scheduled_post_is_visible_only_to_its_owner(self):
+        post = self.schedule(60)
+
+        self.assertIn(post.id, self.feed_ids(self.author))
+        self.assertNotIn(post.id, self.feed_ids(self.reader))
+
+    def test_draft_cannot_be_liked_or_commented_by_others(self):
+        post = self.schedule(60)
+        stranger = get_user_model().objects.create_user("st@gmail.com", "12345s")
+        Profile.objects.create(user=stranger, username="St")
+        for user, status in ((self.reader, 404), (stranger, 404), (self.author, 201)):
+            self.client.force_authenticate(user)
+            response = self.client.post(
+                f"{POST_URL}{post.id}/postlike/create/", {"status": "LIKE"}
+            )
+            self.assertEqual(response.status_code, status, user)
+            response = self.client.post(
+                f"{POST_URL}{post.id}/comment/create/", {"content": "Hi"}
+            )
+            self.assertEqual(response.status_code, status, user)
+        self.assertEqual(post.postlikes.count(), 1)
+        self.assertEqual(post.comments.count(), 1)
+
+    def test_published_post_can_be_liked_without_following(self):
+        post = self.schedule(-1)
+        publish_due_posts()
+        stranger = get_user_model().objects.create_user("st@gmail.com", "12345s")
+        Profile.objects.create(user=stranger, username="St")
+        self.client.force_authenticate(stranger)
+
+        response = self.client.post(
+            f"{POST_URL}{post.id}/postlike/create/", {"status": "LIKE"}
+        )
+
+        self.assertEqual(response.status_code, 201)
+
+    def test_publisher_publishes_due_posts_in_batches(self):
+        due = [self.schedule(-minutes, f"Due {minutes}") for minutes in range(1, 6)]
+        later = self.schedule(60)
+
+        self.assertEqual(publish_due_posts(batch_size=2), 5)
+
+        self.assertFalse(Post.objects.get(id=later.id).is_published)
+        for post in due:
+            post.refresh_from_db()
+            self.assertTrue(post.is_published)
+            self.assertEqual(post.created_time, post.publish_at)
+        self.assertIn(due[0].id, self.feed_ids(self.reader))
+        self.assertEqual(publish_due_posts(), 0)
@@ -0,0 +1,60 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from py_net import schema
+
+
+class SchemaArtifactTests(SimpleTestCase):
+    def setUp(self):
+        schema.load_schema.cache_clear()
+        self.addCleanup(schema.load_schema.cache_clear)
+
+    def test_committed_schema_matches_code(self):
+        call_command("build_schema", check=True, stdout=StringIO())
+
+    def test_version_is_the_schema_hash(self):
+        content, etag = schema.load_schema()
+
+        self.assertEqual(content, settings.SCHEMA_PATH.read_bytes())
+        version = schema.version_path().read_text().strip()
+        self.assertEqual(version, schema.schema_version(content))
+        self.assertEqual(etag, f'"{version[:32]}"')
+
+    def test_operation_ids_are_unique(self):
+        operation_ids = [
+            line.split(":", 1)[1].strip()
+            for line in settings.SCHEMA_PATH.read_text().splitlines()
+            if line.strip().startswith("operationId:")
+        ]
+        self.assertEqual(len(operation_ids), len(set(operation_ids)))
+
+    def test_schema_is_served_with_etag(self):
+        # A stale committed artifact must surface in the check above, so serve
+        # a private copy here rather than letting the view rebuild it in place.
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with override_settings(SCHEMA_PATH=Path(directory.name) / "openapi.yaml"):
+            response = self.client.get("/api/schema/")
+            cached = self.client.get(
+                "/api/schema/", HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content.startswith(b"openapi: 3.0.3"))
+        self.assertEqual(cached.status_code, 304)
+
+    def test_stale_schema_is_generated_in_memory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "openapi.yaml"
+            path.write_bytes(b"stale")
+            with override_settings(SCHEMA_PATH=path):
+                content, _ = schema.load_schema()
+
+                self.assertTrue(content.startswith(b"openapi: 3.0.3"))
+                self.assertEqual(path.read_bytes(), b"stale")
+                self.assertFalse(schema.version_path().exists())
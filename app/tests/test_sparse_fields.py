@@ -0,0 +1,106 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from app.models import Comment, Post, PostLike, Profile
+
+POST_URL = "/api/post/"
+PROFILE_URL = "/api/profile/"
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(f"sparse{i}@gmail.com", f"12345sparse{i}")
+            for i in range(4)
+        ]
+        self.profiles = [
+            Profile.objects.create(user=user, username=f"Sparse{i}")
+            for i, user in enumerate(self.users)
+        ]
+        self.reader = self.profiles[0]
+        self.author = self.profiles[1]
+        for profile in self.profiles[2:] + [self.reader]:
+            profile.following.add(self.author)
+        for i in range(3):
+            post = Post.objects.create(
+                owner=self.users[1], profile=self.author, title=f"Post {i}", content="!"
+            )
+            for user in self.users[2:]:
+                Comment.objects.create(post=post, user=user, content="Nice")
+                PostLike.objects.create(
+                    post=post, author=user, status=PostLike.StatusChoices.LIKE
+                )
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[0])
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return response.data, len(context.captured_queries)
+
+    def test_post_list_fields(self):
+        data, _ = self.get(POST_URL + "?fields=id,title,unknown")
+        self.assertEqual(len(data["results"]), 3)
+        for post in data["results"]:
+            self.assertEqual(set(post), {"id", "title"})
+
+    def test_post_list_omit(self):
+        data, _ = self.get(POST_URL + "?omit=comments,likes_count")
+        post = data["results"][0]
+        self.assertNotIn("comments", post)
+        self.assertNotIn("likes_count", post)
+        self.assertEqual(post["unlikes_count"], 0)
+
+    def test_counts_and_comments_are_batched(self):
+        data, full = self.get(POST_URL)
+        post = data["results"][0]
+        self.assertEqual(post["likes_count"], 2)
+        self.assertEqual(len(post["comments"]), 2)
+        self.assertEqual(post["comments"][0]["owner"], "Sparse2")
+
+        Post.objects.create(
+            owner=self.users[1], profile=self.author, title="More", content="!"
+        )
+        _, more = self.get(POST_URL)
+        self.assertEqual(more, full)
+
+    def test_dropped_fields_skip_their_queries(self):
+        _, full = self.get(POST_URL)
+        _, sparse = self.get(POST_URL + "?fields=id,title")
+        self.assertEqual(sparse, full - 1)
+
+    def test_profile_detail_keeps_nested_post_fields(self):
+        data, _ = self.get(f"{PROFILE_URL}{self.author.id}/?fields=username,posts")
+        self.assertEqual(set(data), {"username", "posts"})
+        self.assertEqual(len(data["posts"]), 3)
+        self.assertEqual(data["posts"][0]["likes_count"], 2)
+        self.assertIn("comments", data["posts"][0])
+
+    def test_profile_detail_without_posts_for_strangers(self):
+        data, _ = self.get(f"{PROFILE_URL}{self.profiles[2].id}/")
+        self.assertNotIn("posts", data)
+        self.assertEqual(data["followers_count"], 0)
+
+    def test_followers_list(self):
+        url = f"{PROFILE_URL}{self.author.id}/followers_list/"
+        data, full = self.get(url + "?fields=username,followers_count")
+        self.assertEqual(
+            sorted(profile["username"] for profile in data),
+            ["Sparse0", "Sparse2", "Sparse3"],
+        )
+        self.assertEqual(set(data[0]), {"username", "followers_count"})
+
+        self.profiles[3].following.add(self.profiles[2])
+        self.users.append(get_user_model().objects.create_user("sparse9@gmail.com"))
+        Profile.objects.create(user=self.users[-1], username="Sparse9").following.add(
+            self.author
+        )
+        data, more = self.get(url + "?fields=username,followers_count")
+        self.assertEqual(more, full)
+        counts = {profile["username"]: profile["followers_count"] for profile in data}
+        self.assertEqual(counts["Sparse2"], 1)
@@ -0,0 +1,26 @@
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from app.models import Profile
+from py_net.db.transaction import atomic_immediate
+
+
+class SQLiteBackendTests(TransactionTestCase):
+    def begins(self, block):
+        with CaptureQueriesContext(connection) as queries:
+            with block():
+                Profile.objects.count()
+        return [
+            query["sql"] for query in queries if query["sql"].startswith("BEGIN")
+        ]
+
+    def test_atomic_immediate_takes_the_write_lock_at_begin(self):
+        self.assertEqual(self.begins(atomic_immediate), ["BEGIN IMMEDIATE"])
+        self.assertEqual(self.begins(transaction.atomic), ["BEGIN DEFERRED"])
+
+    def test_busy_timeout_follows_the_timeout_option(self):
+        timeout = connection.settings_dict["OPTIONS"]["timeout"]
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], timeout * 1000)
@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from app.models import Comment, EngagementBucket, Post, PostLike, Profile
+from app.tasks import compact_engagement_buckets, roll_up_trending
+from app.trending import roll_up_engagement
+
+TRENDING_URL = "/api/trending/"
+
+
+class TrendingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(f"trend{i}@gmail.com", f"12345trend{i}")
+            for i in range(4)
+        ]
+        self.profiles = [
+            Profile.objects.create(user=user, username=f"Trend{i}")
+            for i, user in enumerate(self.users)
+        ]
+        self.hot = self.create_post("Hot", "#Django #python")
+        self.warm = self.create_post("Warm", "#python")
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[0])
+
+    def create_post(self, title, content):
+        return Post.objects.create(
+            owner=self.users[0], profile=self.profiles[0], title=title, content=content
+        )
+
+    def like(self, post, user, ago=None):
+        like = PostLike.objects.create(
+            post=post, author=user, status=PostLike.StatusChoices.LIKE
+        )
+        if ago:
+            PostLike.objects.filter(pk=like.pk).update(
+                created_time=timezone.now() - ago
+            )
+
+    def trending(self, window=""):
+        query = f"?window={window}" if window else ""
+        response = self.client.get(TRENDING_URL + query)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_top_posts_and_hashtags(self):
+        for user in self.users[1:]:
+            self.like(self.hot, user)
+        self.like(self.warm, self.users[1])
+        Comment.objects.create(post=self.warm, user=self.users[2], content="!")
+        PostLike.objects.create(
+            post=self.warm, author=self.users[3], status=PostLike.StatusChoices.UNLIKE
+        )
+        roll_up_trending()
+
+        data = self.trending("1h")
+        self.assertEqual(
+            [(post["title"], post["count"]) for post in data["posts"]],
+            [("Hot", 3), ("Warm", 2)],
+        )
+        self.assertEqual(
+            [(tag["hashtag"], tag["count"]) for tag in data["hashtags"]],
+            [("python", 5), ("django", 3)],
+        )
+
+    def test_windows(self):
+        self.like(self.hot, self.users[1], ago=timedelta(hours=3))
+        self.like(self.warm, self.users[1], ago=timedelta(days=2))
+        roll_up_trending()
+
+        self.assertEqual(self.trending("1h")["posts"], [])
+        self.assertEqual([p["title"] for p in self.trending()["posts"]], ["Hot"])
+        self.assertEqual(
+            [p["title"] for p in self.trending("7d")["posts"]], ["Hot", "Warm"]
+        )
+        response = self.client.get(TRENDING_URL + "?window=1y")
+        self.assertEqual(response.status_code, 400)
+
+    def test_rollup_counts_each_row_once(self):
+        self.like(self.hot, self.users[1])
+        self.assertEqual(roll_up_engagement(), 1)
+        self.assertEqual(roll_up_engagement(), 0)
+        self.like(self.hot, self.users[2])
+        self.assertEqual(roll_up_engagement(), 1)
+        bucket = EngagementBucket.objects.get(kind="POST")
+        self.assertEqual(bucket.count, 2)
+
+    def test_compaction(self):
+        for user in self.users[1:]:
+            self.like(self.hot, user, ago=timedelta(hours=5))
+        # Older than the longest window: never bucketed.
+        self.like(self.warm, self.users[1], ago=timedelta(days=8))
+        self.like(self.warm, self.users[2])
+        roll_up_engagement()
+        self.assertEqual(
+            set(EngagementBucket.objects.values_list("granularity", flat=True)),
+            {"MINUTE"},
+        )
+        EngagementBucket.objects.create(
+            kind="HASHTAG",
+            key="stale",
+            granularity="HOUR",
+            start=timezone.now() - timedelta(days=9),
+            count=1,
+        )
+
+        compact_engagement_buckets()
+
+        hot = EngagementBucket.objects.get(key=str(self.hot.id))
+        self.assertEqual((hot.granularity, hot.count), ("HOUR", 3))
+        self.assertEqual(hot.start.minute, 0)
+        warm = EngagementBucket.objects.get(key=str(self.warm.id))
+        self.assertEqual((warm.granularity, warm.count), ("MINUTE", 1))
+        self.assertFalse(EngagementBucket.objects.filter(key="stale").exists())
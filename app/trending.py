@@ -0,0 +1,222 @@
+"""
+Trending posts and hashtags over sliding windows.
+
+Nothing here runs per request. A beat task folds the likes and comments added
+since its last run into per-minute `EngagementBucket` rows (found by primary
+key, past a `RollupWatermark`) and rewrites the top list of every window into
+`TrendingEntry` and the cache. Compaction merges minute buckets into hourly
+ones once they fall out of the 1h window and drops buckets older than the
+longest window.
+"""
+import re
+from collections import Counter
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncHour, TruncMinute
+from django.utils import timezone
+
+from app.models import (
+    Comment,
+    EngagementBucket,
+    Post,
+    PostLike,
+    RollupWatermark,
+    TrendingEntry,
+)
+from py_net.db.transaction import atomic_immediate
+
+WINDOWS = {
+    "1h": timedelta(hours=1),
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+}
+DEFAULT_WINDOW = "24h"
+TRENDING_SIZE = 20
+# Minute buckets are kept while they can still fall in the 1h window.
+MINUTE_RETENTION = timedelta(hours=2)
+# Workers and web processes may not share a cache, so entries expire quickly
+# and are reloaded from TrendingEntry.
+CACHE_SECONDS = 60
+HASHTAG_RE = re.compile(r"#(\w+)")
+
+POST = EngagementBucket.KindChoices.POST
+HASHTAG = EngagementBucket.KindChoices.HASHTAG
+MINUTE = EngagementBucket.GranularityChoices.MINUTE
+HOUR = EngagementBucket.GranularityChoices.HOUR
+
+
+def sources():
+    return {
+        "postlike": PostLike.objects.filter(status=PostLike.StatusChoices.LIKE),
+        "comment": Comment.objects.all(),
+    }
+
+
+def cache_key(window):
+    return f"trending:{window}"
+
+
+def post_hashtags(post_ids, chunk_size=500):
+    post_ids = list(post_ids)
+    hashtags = {}
+    for start in range(0, len(post_ids), chunk_size):
+        rows = Post.objects.filter(id__in=post_ids[start:start + chunk_size])
+        for post_id, content in rows.values_list("id", "content"):
+            hashtags[post_id] = {tag.lower() for tag in HASHTAG_RE.findall(content)}
+    return hashtags
+
+
+def add_to_buckets(increments, granularity):
+    """Add `{(kind, key, start): count}` to the buckets of a granularity."""
+    if not increments:
+        return
+    kinds, keys, starts = (set(values) for values in zip(*increments))
+    existing = {
+        (bucket.kind, bucket.key, bucket.start): bucket
+        for bucket in EngagementBucket.objects.filter(
+            kind__in=kinds, start__in=starts, granularity=granularity, key__in=keys
+        )
+    }
+    updated, created = [], []
+    for (kind, key, start), count in increments.items():
+        bucket = existing.get((kind, key, start))
+        if bucket:
+            bucket.count += count
+            updated.append(bucket)
+        else:
+            created.append(
+                EngagementBucket(
+                    kind=kind,
+                    key=key,
+                    start=start,
+                    granularity=granularity,
+                    count=count,
+                )
+            )
+    EngagementBucket.objects.bulk_update(updated, ["count"], batch_size=500)
+    EngagementBucket.objects.bulk_create(created, batch_size=500)
+
+
+def roll_up_engagement(now=None):
+    """Count likes and comments added since the last run into minute buckets."""
+    since = (now or timezone.now()) - max(WINDOWS.values())
+    per_post = Counter()
+    with atomic_immediate():
+        for source, queryset in sources().items():
+            watermark, _ = RollupWatermark.objects.get_or_create(source=source)
+            last_id = queryset.model.objects.aggregate(last=Max("id"))["last"] or 0
+            rows = (
+                queryset.filter(
+                    id__gt=watermark.last_id, id__lte=last_id, created_time__gte=since
+                )
+                .annotate(minute=TruncMinute("created_time"))
+                .values_list("post_id", "minute")
+                .annotate(Count("id"))
+                .order_by()
+            )
+            for post_id, minute, count in rows:
+                per_post[post_id, minute] += count
+            watermark.last_id = last_id
+            watermark.save(update_fields=["last_id"])
+
+        hashtags = post_hashtags({post_id for post_id, _ in per_post})
+        increments = Counter()
+        for (post_id, minute), count in per_post.items():
+            increments[POST, str(post_id), minute] += count
+            for tag in hashtags.get(post_id, ()):
+                increments[HASHTAG, tag, minute] += count
+        add_to_buckets(increments, MINUTE)
+    return sum(per_post.values())
+
+
+def top_keys(kind, since):
+    """`(key, total)` rows of the most engaged keys since `since`."""
+    return (
+        EngagementBucket.objects.filter(kind=kind, start__gte=since)
+        .values_list("key")
+        .annotate(total=Sum("count"))
+        .order_by("-total", "key")[:TRENDING_SIZE]
+    )
+
+
+def refresh_trending(now=None):
+    """Recompute the top lists of every window and publish them."""
+    now = now or timezone.now()
+    entries = [
+        TrendingEntry(window=window, kind=kind, rank=rank, key=key, count=total)
+        for window, length in WINDOWS.items()
+        for kind in (POST, HASHTAG)
+        for rank, (key, total) in enumerate(top_keys(kind, now - length), start=1)
+    ]
+    with atomic_immediate():
+        TrendingEntry.objects.all().delete()
+        TrendingEntry.objects.bulk_create(entries)
+    cache.set_many(
+        {cache_key(window): load_trending(window) for window in WINDOWS},
+        CACHE_SECONDS,
+    )
+    return len(entries)
+
+
+def load_trending(window):
+    entries = list(TrendingEntry.objects.filter(window=window))
+    post_ids = [int(entry.key) for entry in entries if entry.kind == POST]
+    posts = Post.objects.filter(is_published=True).select_related("profile")
+    posts = posts.in_bulk(post_ids)
+    return {
+        "window": window,
+        "posts": [
+            {
+                "id": post.id,
+                "title": post.title,
+                "profile": post.profile.username,
+                "count": entry.count,
+            }
+            for entry in entries
+            if entry.kind == POST and (post := posts.get(int(entry.key)))
+        ],
+        "hashtags": [
+            {"hashtag": entry.key, "count": entry.count}
+            for entry in entries
+            if entry.kind == HASHTAG
+        ],
+    }
+
+
+def get_trending(window):
+    """A window's top posts and hashtags, from the cache or TrendingEntry."""
+    return cache.get_or_set(
+        cache_key(window), lambda: load_trending(window), CACHE_SECONDS
+    )
+
+
+def compact_buckets(now=None):
+    """
+    Merge minute buckets older than MINUTE_RETENTION into hourly ones and drop
+    buckets past the longest window. Returns `(merged, expired)` row counts.
+    """
+    now = now or timezone.now()
+    cutoff = (now - MINUTE_RETENTION).replace(minute=0, second=0, microsecond=0)
+    expiry = now - max(WINDOWS.values()) - timedelta(hours=1)
+    merged = expired = 0
+    with atomic_immediate():
+        for kind in (POST, HASHTAG):
+            minutes = EngagementBucket.objects.filter(
+                kind=kind, start__lt=cutoff, granularity=MINUTE
+            )
+            rows = (
+                minutes.annotate(hour=TruncHour("start"))
+                .values_list("key", "hour")
+                .annotate(Sum("count"))
+                .order_by()
+            )
+            add_to_buckets(
+                Counter({(kind, key, hour): count for key, hour, count in rows}), HOUR
+            )
+            merged += minutes.delete()[0]
+            expired += EngagementBucket.objects.filter(
+                kind=kind, start__lt=expiry
+            ).delete()[0]
+    return merged, expired
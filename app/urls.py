@@ -1,6 +1,7 @@
 from django.urls import include, path
 from rest_framework import routers
 
+from app import async_views
 from app.views import (
     PostViewSet,
     PostLikeCreateView,
@@ -9,12 +10,20 @@ from app.views import (
     CommentCreateView,
     LikedPostsView,
     CommentViewSet,
+    NotificationViewSet,
+    DeletionJobViewSet,
+    ExportView,
+    ExportArchiveDownloadView,
+    ExportArchiveView,
+    TrendingView,
 )
 
 router = routers.DefaultRouter()
 router.register("profile", ProfileViewSet)
 router.register("post", PostViewSet)
 router.register("comment", CommentViewSet)
+router.register("notifications", NotificationViewSet, basename="notification")
+router.register("deletions", DeletionJobViewSet, basename="deletion")
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -34,6 +43,20 @@ urlpatterns = [
         name="comment-create",
     ),
     path("posts/liked/", LikedPostsView.as_view(), name="liked-posts"),
+    path("async/feed/", async_views.feed, name="async-feed"),
+    path(
+        "async/profile/<int:pk>/",
+        async_views.profile_detail,
+        name="async-profile-detail",
+    ),
+    path("trending/", TrendingView.as_view(), name="trending"),
+    path("export/", ExportView.as_view(), name="export"),
+    path("export/archive/", ExportArchiveView.as_view(), name="export-archive"),
+    path(
+        "export/archive/<slug:archive_id>/",
+        ExportArchiveDownloadView.as_view(),
+        name="export-archive-download",
+    ),
     path(
         "profile/<int:profile_pk>/follow/",
         ProfileViewSet.as_view({"post": "follow"}),
@@ -1,16 +1,35 @@
 from django.db.models import Q
+from django.http import FileResponse, Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.views import generic
-from drf_spectacular.utils import OpenApiParameter, extend_schema
-from rest_framework import viewsets, generics, filters, status
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
+from rest_framework import viewsets, generics, filters, mixins, status
 from rest_framework.decorators import action
 from rest_framework.permissions import BasePermission
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from app.models import Post, PostLike, Profile, Comment
-from app.pagination import PyNetListPagination
+from app.deletion import schedule_deletion
+from app.export import (
+    archive_name,
+    export_lines,
+    export_storage,
+    new_archive_id,
+)
+from app.mixins import BatchReadMixin, FastListMixin, ReplicaReadMixin
+from app.models import Comment, DeletionJob, Notification, Post, PostLike, Profile
+from app.notifications import mark_read, notify, unread_count
+from app.pagination import (
+    DirectoryPagination,
+    NotificationCursorPagination,
+    PyNetListPagination,
+)
+from app.ranking import FEED_ORDERINGS, add_engagement
+from app.signals import add_follow
+from app.trending import DEFAULT_WINDOW, WINDOWS, get_trending
 from app.permissions import IsOwnerOrReadOnly, HasProfilePermission, IsUserOrReadOnly
 from app.serializers import (
     PostSerializer,
@@ -24,11 +43,78 @@ from app.serializers import (
     ProfileNoPostSerializer,
     CommentCreateSerializer,
     ProfileCreateSerializer,
+    ProfileDirectorySerializer,
+    ProfileDirectoryPageSerializer,
     ProfileSearchSerializer,
+    NotificationSerializer,
+    DeletionJobSerializer,
+)
+from app.tasks import export_user_archive
+from py_net.db.transaction import atomic_immediate
+
+
+SPARSE_FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        name="fields",
+        description="Comma-separated fields to return (default: all)",
+        required=False,
+    ),
+    OpenApiParameter(
+        name="omit",
+        description="Comma-separated fields to leave out",
+        required=False,
+    ),
+]
+
+
+BATCH_IDS_PARAMETER = OpenApiParameter(
+    name="ids",
+    description="Comma-separated ids (at most 200); unknown or hidden ones are"
+                " left out",
+    required=True,
 )
 
 
-class PostViewSet(viewsets.ModelViewSet):
+def visible_posts(user):
+    """
+    Posts `user` may see: every post for staff, otherwise their own and the
+    published posts of the profiles they follow.
+    """
+    if user.is_staff:
+        return Post.objects.all()
+    profile = getattr(user, "profile", None)
+    if profile is None:
+        return Post.objects.none()
+    return Post.objects.filter(
+        Q(profile__in=profile.following.all(), is_published=True)
+        | Q(profile=profile)
+    )
+
+
+def profiles_with_posts(user, ids):
+    """Those of `ids` whose posts `user` sees: followed, own, or any to staff."""
+    try:
+        follower = user.profile
+    except Profile.DoesNotExist:
+        return set()
+    if user.is_staff:
+        return set(ids)
+    followed = follower.following.filter(pk__in=ids).values_list("pk", flat=True)
+    return {*followed, follower.pk}
+
+
+def open_posts(user):
+    """
+    Posts `user` may like or comment on: any published post, and drafts only
+    for their owner and staff.
+    """
+    if user.is_staff:
+        return Post.objects.all()
+    return Post.objects.filter(Q(is_published=True) | Q(owner=user))
+
+
+@extend_schema_view(retrieve=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS))
+class PostViewSet(BatchReadMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     serializer_class = PostSerializer
     permission_classes = (IsOwnerOrReadOnly, HasProfilePermission)
     queryset = Post.objects.all().select_related("owner")
@@ -38,18 +124,42 @@ class PostViewSet(viewsets.ModelViewSet):
     search_fields = ["content"]
 
     def get_queryset(self):
-        user = self.request.user
-        queryset = Post.objects.all().select_related("owner")
+        queryset = visible_posts(self.request.user).select_related("owner")
         if not self.request.user.is_staff:
-            following_profiles = user.profile.following.all()
-            queryset = Post.objects.filter(Q(profile__in=following_profiles) | Q(profile=user.profile)).select_related(
-                "owner")
-
             if self.action == "list" and self.request.method == "retrieve":
                 profile_pk = self.kwargs["profile_pk"]
                 return queryset.filter(profile_id=profile_pk)
+        ordering = FEED_ORDERINGS.get(self.request.query_params.get("order"))
+        if ordering:
+            queryset = queryset.order_by(*ordering)
         return queryset
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="order",
+                enum=list(FEED_ORDERINGS),
+                description="ranked: most engaging first, with older posts"
+                            " decaying (default: newest first)",
+                required=False,
+            ),
+            *SPARSE_FIELDS_PARAMETERS,
+        ],
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=[BATCH_IDS_PARAMETER, *SPARSE_FIELDS_PARAMETERS],
+        responses=PostSerializer(many=True),
+    )
+    @action(detail=False, methods=["get"])
+    def batch(self, request):
+        """Endpoint to get the posts with the given ids, in that order"""
+        return self.batch_response(
+            self.get_queryset(), self.batch_ids(), lambda pk: PostSerializer
+        )
+
     def get_serializer_class(self):
         if self.action == "create":
             return PostCreateSerializer
@@ -63,7 +173,11 @@ class PostViewSet(viewsets.ModelViewSet):
         user = self.request.user
         title = self.request.data.get("title")
         content = self.request.data.get("content")
-        serializer.save(profile=profile, owner=user, content=content, title=title)
+        with atomic_immediate():
+            serializer.save(profile=profile, owner=user, content=content, title=title)
+
+    def perform_destroy(self, instance):
+        schedule_deletion(instance, self.request.user)
 
 
 class PostLikeCreateView(generics.CreateAPIView):
@@ -75,11 +189,16 @@ class PostLikeCreateView(generics.CreateAPIView):
     def perform_create(self, serializer):
         post = self.get_post()
         author = self.request.user
-        serializer.save(author=author, post=post)
+        with atomic_immediate():
+            postlike = serializer.save(author=author, post=post)
+            if postlike.status == PostLike.StatusChoices.LIKE:
+                notify(
+                    Notification.VerbChoices.LIKE, post.owner_id, author.id, post.id
+                )
 
     def get_post(self):
         post_id = self.kwargs["pk"]
-        post = get_object_or_404(Post, pk=post_id)
+        post = get_object_or_404(open_posts(self.request.user), pk=post_id)
         return post
 
     def get_serializer_context(self):
@@ -88,7 +207,13 @@ class PostLikeCreateView(generics.CreateAPIView):
         return context
 
 
-class ProfileViewSet(viewsets.ModelViewSet):
+@extend_schema_view(
+    list=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
+    retrieve=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
+    followers_list=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
+    following_list=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
+)
+class ProfileViewSet(BatchReadMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     serializer_class = ProfileSerializer
     queryset = Profile.objects.all().select_related("user")
     permission_classes = (IsUserOrReadOnly,)
@@ -98,6 +223,9 @@ class ProfileViewSet(viewsets.ModelViewSet):
         user = self.request.user
         serializer.save(user=user)
 
+    def perform_destroy(self, instance):
+        schedule_deletion(instance, self.request.user)
+
     def get_permissions(self):
         if self.action == "follow":
             return [IsAuthenticated()]
@@ -112,26 +240,73 @@ class ProfileViewSet(viewsets.ModelViewSet):
         if self.action == "follow":
             return ProfileFollowAddSerializer
         if self.action == "retrieve" and self.request.user.is_authenticated:
-            profile = self.get_object()
+            # Not self.get_object(): filter_queryset() asks for this class.
             try:
-                follower = self.request.user.profile
-                if (
-                        profile.followings.filter(id=follower.id).exists()
-                        or profile == follower or self.request.user.is_staff
-                ):
-                    return ProfileSerializer
-            except Exception:
+                pk = int(self.kwargs["pk"])
+            except ValueError:
                 return ProfileNoPostSerializer
+            if pk in self.profiles_with_posts([pk]):
+                return ProfileSerializer
 
         return ProfileNoPostSerializer
 
+    def profiles_with_posts(self, ids):
+        return profiles_with_posts(self.request.user, ids)
+
+    @extend_schema(
+        parameters=[BATCH_IDS_PARAMETER, *SPARSE_FIELDS_PARAMETERS],
+        responses=ProfileSerializer(many=True),
+        description="Profiles the user may not see posts of come without `posts`.",
+    )
+    @action(detail=False, methods=["get"])
+    def batch(self, request):
+        """Endpoint to get the profiles with the given ids, in that order"""
+        ids = self.batch_ids()
+        with_posts = (
+            self.profiles_with_posts(ids) if request.user.is_authenticated else set()
+        )
+
+        def serializer_for(pk):
+            return ProfileSerializer if pk in with_posts else ProfileNoPostSerializer
+
+        return self.batch_response(self.get_queryset(), ids, serializer_for)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="city",
+                description="Matched ignoring case, accents and punctuation",
+                required=False,
+            ),
+            OpenApiParameter(name="min_age", type=int, required=False),
+            OpenApiParameter(name="max_age", type=int, required=False),
+            OpenApiParameter(name="cursor", required=False),
+            *SPARSE_FIELDS_PARAMETERS,
+        ],
+        responses=ProfileDirectoryPageSerializer,
+    )
+    @action(detail=False, methods=["get"], pagination_class=DirectoryPagination)
+    def directory(self, request):
+        """Endpoint to find profiles by city and age, most followed first"""
+        query = ProfileDirectorySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        return self.page_response(
+            Profile.objects.filter(**query.filters()), ProfileNoPostSerializer
+        )
+
     @action(detail=True, methods=["post"])
     def follow(self, request, pk=None):
         """Endpoint to join the profile followers"""
         try:
             profile = self.get_object()
             following = request.user.profile
-            profile.followings.add(following)
+            with atomic_immediate():
+                if add_follow(following, profile):
+                    notify(
+                        Notification.VerbChoices.FOLLOW,
+                        profile.user_id,
+                        request.user.id,
+                    )
             serializer = self.get_serializer(profile, context={"request": request})
             return Response(serializer.data)
         except Profile.DoesNotExist:
@@ -145,9 +320,7 @@ class ProfileViewSet(viewsets.ModelViewSet):
                 return Response("Create profile, please.", status=status.HTTP_404_NOT_FOUND)
             else:
                 user = self.get_object()
-                followers = user.followings.all()
-                serializer = ProfileSerializer(followers, many=True)
-                return Response(serializer.data)
+                return self.list_response(user.followings.all(), ProfileSerializer)
         except Profile.DoesNotExist:
             return Response("Create profile, please.", status=status.HTTP_404_NOT_FOUND)
 
@@ -159,14 +332,12 @@ class ProfileViewSet(viewsets.ModelViewSet):
                 return Response("Create profile, please.", status=status.HTTP_404_NOT_FOUND)
             else:
                 profile = self.get_object()
-                following = profile.following.all()
-                serializer = ProfileSerializer(following, many=True)
-                return Response(serializer.data)
+                return self.list_response(profile.following.all(), ProfileSerializer)
         except Profile.DoesNotExist:
             return Response("Create profile, please.", status=status.HTTP_404_NOT_FOUND)
 
 
-class ProfileSearchView(generics.ListAPIView):
+class ProfileSearchView(ReplicaReadMixin, generics.ListAPIView):
     serializer_class = ProfileSearchSerializer
     permission_classes = (IsAuthenticated, HasProfilePermission)
     lookup_field = "username"
@@ -198,14 +369,20 @@ class CommentCreateView(generics.CreateAPIView):
 
     def perform_create(self, serializer):
         post_id = self.kwargs["pk"]
-        post = get_object_or_404(Post, pk=post_id)
         user = self.request.user
+        post = get_object_or_404(open_posts(user), pk=post_id)
         content = self.request.data.get("content")
         comment = Comment(user=user, post=post, content=content)
-        comment.save()
+        with atomic_immediate():
+            comment.save()
+            notify(Notification.VerbChoices.COMMENT, post.owner_id, user.id, post.id)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+@extend_schema_view(
+    list=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
+    retrieve=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
+)
+class CommentViewSet(FastListMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     queryset = Comment.objects.all().select_related("user")
     permission_classes = (IsUserOrReadOnly, HasProfilePermission)
@@ -219,6 +396,11 @@ class CommentViewSet(viewsets.ModelViewSet):
         )
         return queryset
 
+    def perform_destroy(self, instance):
+        with atomic_immediate():
+            instance.delete()
+            add_engagement(instance.post_id, -1)
+
 
 class LikedPostsView(generics.ListAPIView):
     serializer_class = LikedPostsSerializer
@@ -235,3 +417,123 @@ class LikedPostsView(generics.ListAPIView):
 
         liked_posts = [post_like.post for post_like in post_likes]
         return liked_posts
+
+
+class NotificationViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """The user's notification inbox, newest activity first"""
+
+    serializer_class = NotificationSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = NotificationCursorPagination
+
+    def get_queryset(self):
+        return Notification.objects.filter(
+            recipient=self.request.user
+        ).select_related("actor__profile")
+
+    @action(detail=False, methods=["get"], url_path="unread-count")
+    def unread_count(self, request):
+        """Endpoint to get the number of unread notifications"""
+        return Response({"unread_count": unread_count(request.user)})
+
+    @extend_schema(operation_id="notifications_read_all_create")
+    @action(detail=False, methods=["post"], url_path="read")
+    def read_all(self, request):
+        """Endpoint to mark every notification read"""
+        return Response({"read": mark_read(request.user)})
+
+    @action(detail=True, methods=["post"])
+    def read(self, request, pk=None):
+        """Endpoint to mark one notification read"""
+        try:
+            notification_id = int(pk)
+        except ValueError:
+            raise Http404
+        return Response({"read": mark_read(request.user, notification_id)})
+
+
+class DeletionJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Progress of the deletions the user asked for"""
+
+    serializer_class = DeletionJobSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = PyNetListPagination
+
+    def get_queryset(self):
+        return DeletionJob.objects.filter(requested_by=self.request.user)
+
+
+class ExportView(APIView):
+    """Endpoint to download all of the user's data as NDJSON"""
+
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(responses={(200, "application/x-ndjson"): OpenApiTypes.STR})
+    def get(self, request):
+        response = StreamingHttpResponse(
+            export_lines(request.user), content_type="application/x-ndjson"
+        )
+        response["Content-Disposition"] = 'attachment; filename="export.ndjson"'
+        return response
+
+
+class ExportArchiveView(APIView):
+    """Endpoint to build a gzipped export in the background, for large accounts"""
+
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(request=None, responses={202: OpenApiTypes.OBJECT})
+    def post(self, request):
+        archive_id = new_archive_id()
+        name = archive_name(request.user, archive_id)
+        export_user_archive.delay(request.user.id, name)
+        url = reverse("app:export-archive-download", args=[archive_id])
+        return Response(
+            {"url": request.build_absolute_uri(url)},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class ExportArchiveDownloadView(APIView):
+    """Endpoint to download one of the user's export archives once it is built"""
+
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(responses={(200, "application/gzip"): OpenApiTypes.BINARY})
+    def get(self, request, archive_id):
+        storage = export_storage()
+        name = archive_name(request.user, archive_id)
+        if not storage.exists(name):
+            raise Http404("Not built yet, or expired.")
+        return FileResponse(
+            storage.open(name),
+            as_attachment=True,
+            filename="export.ndjson.gz",
+            content_type="application/gzip",
+        )
+
+
+class TrendingView(APIView):
+    """Endpoint to get the most liked and commented posts and hashtags"""
+
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="window",
+                enum=list(WINDOWS),
+                description=f"Time window (default {DEFAULT_WINDOW})",
+                required=False,
+            ),
+        ],
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    def get(self, request):
+        window = request.query_params.get("window", DEFAULT_WINDOW)
+        if window not in WINDOWS:
+            return Response(
+                {"window": f"Choose one of {', '.join(WINDOWS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(get_trending(window))
@@ -0,0 +1,158 @@
+"""
+`POST /api/batch/`: several API calls in one round trip.
+
+Sub-requests run in-process against the URL routes, in order, as the user
+the batch authenticated (each view skips its own authentication). Writes run
+one by one on the request's connection; runs of consecutive GETs are spread
+over worker threads, each with its own connection, when the database lets
+other connections see this one's data (not an in-memory database, not inside
+a transaction).
+
+A successful write sub-request pins the user's later reads, in the batch and
+after it, to the primary; a batch of only reads leaves them on the replicas.
+"""
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from itertools import groupby
+from urllib.parse import urlsplit
+
+import orjson
+from django.db import connection, connections
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from drf_spectacular.utils import extend_schema
+from rest_framework import serializers
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from py_net.middleware import pin_after_write
+
+logger = logging.getLogger(__name__)
+
+MAX_SUB_REQUESTS = 20
+MAX_WORKERS = 4
+
+
+class SubRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(
+        choices=["GET", "POST", "PUT", "PATCH", "DELETE"], default="GET"
+    )
+    path = serializers.RegexField(r"^/api/")
+    body = serializers.JSONField(required=False)
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True, max_length=MAX_SUB_REQUESTS)
+
+
+class SubResponseSerializer(serializers.Serializer):
+    status = serializers.IntegerField()
+    body = serializers.JSONField(allow_null=True)
+
+
+def error(status, detail):
+    return {"status": status, "body": {"detail": detail}}
+
+
+def build_request(request, method, path, body):
+    """A request for `path` carrying `request`'s user, host and headers."""
+    url = urlsplit(path)
+    content = orjson.dumps(body) if body is not None else b""
+    sub = HttpRequest()
+    sub.method = method
+    sub.path = sub.path_info = url.path
+    sub.META = {
+        **request.META,
+        "REQUEST_METHOD": method,
+        "PATH_INFO": url.path,
+        "QUERY_STRING": url.query,
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(content)),
+        "HTTP_ACCEPT": "application/json",
+    }
+    sub.GET = QueryDict(url.query)
+    sub.COOKIES = request.COOKIES
+    sub._stream = BytesIO(content)
+    sub._read_started = False
+    sub.user = request.user
+    # DRF's Request picks these up instead of running the view's authenticators.
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    return sub
+
+
+def run(request, method, path, body):
+    """Status and data of one sub-request."""
+    try:
+        match = resolve(urlsplit(path).path)
+    except Resolver404:
+        return error(404, "Not found.")
+    view_class = getattr(match.func, "cls", None)
+    if view_class is None or not issubclass(view_class, APIView):
+        return error(400, "Not available in a batch.")
+    if issubclass(view_class, BatchView):
+        return error(400, "Batches cannot be nested.")
+    sub = build_request(request, method, path, body)
+    sub.resolver_match = match
+    try:
+        response = match.func(sub, *match.args, **match.kwargs)
+    except Exception:
+        logger.exception("Batched %s %s failed", method, path)
+        return error(500, "Server error.")
+    if not isinstance(response, Response):
+        return error(406, "Not available in a batch.")
+    pin_after_write(request.user, method, response.status_code)
+    return {"status": response.status_code, "body": response.data}
+
+
+def run_in_thread(context, *args):
+    try:
+        return context.run(run, *args)
+    finally:
+        connections.close_all()
+
+
+def can_read_in_parallel():
+    is_in_memory_db = getattr(connection, "is_in_memory_db", lambda: False)
+    return not connection.in_atomic_block and not is_in_memory_db()
+
+
+class BatchView(APIView):
+    """Endpoint to run several API requests in one round trip"""
+
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        request=BatchSerializer,
+        responses=SubResponseSerializer(many=True),
+    )
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        calls = [
+            (call["method"], call["path"], call.get("body"))
+            for call in serializer.validated_data["requests"]
+        ]
+        parallel = can_read_in_parallel()
+        responses = []
+        for reads, group in groupby(calls, key=lambda call: call[0] == "GET"):
+            group = list(group)
+            if reads and parallel and len(group) > 1:
+                responses += self.run_in_parallel(request, group)
+            else:
+                responses += [run(request, *call) for call in group]
+        response = Response(responses)
+        # run() already pinned the user if a sub-request wrote something.
+        response.skip_primary_pin = True
+        return response
+
+    def run_in_parallel(self, request, calls):
+        with ThreadPoolExecutor(min(MAX_WORKERS, len(calls))) as pool:
+            futures = [
+                pool.submit(run_in_thread, contextvars.copy_context(), request, *call)
+                for call in calls
+            ]
+            return [future.result() for future in futures]
@@ -0,0 +1,57 @@
+"""
+SQLite backend tuned for a production web + Celery deployment.
+
+Every new connection switches the database to WAL and applies the pragmas
+below; `OPTIONS["pragmas"]` overrides individual values and
+`OPTIONS["transaction_mode"]` sets the default BEGIN mode. The busy timeout
+is `OPTIONS["timeout"]`, in seconds, as for Django's own backend.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+}
+
+TRANSACTION_MODES = ("DEFERRED", "IMMEDIATE", "EXCLUSIVE")
+# sqlite3.connect()'s default, in seconds.
+DEFAULT_TIMEOUT = 5
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        options = self.settings_dict["OPTIONS"]
+        self.pragmas = {
+            **PRAGMAS,
+            "busy_timeout": int(options.get("timeout", DEFAULT_TIMEOUT) * 1000),
+            **options.get("pragmas", {}),
+        }
+        self.transaction_mode = options.get("transaction_mode", "DEFERRED").upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"Unknown SQLite transaction mode {self.transaction_mode!r}."
+            )
+        # Mode for the next BEGIN only, see py_net.db.transaction.atomic_immediate.
+        self.next_transaction_mode = None
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        kwargs.pop("pragmas", None)
+        kwargs.pop("transaction_mode", None)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.next_transaction_mode or self.transaction_mode
+        self.next_transaction_mode = None
+        self.cursor().execute(f"BEGIN {mode}")
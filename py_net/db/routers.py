@@ -0,0 +1,85 @@
+import contextvars
+import os
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Alias chosen for reads of the current request, set by ReplicaReadMixin.
+read_alias = contextvars.ContextVar("read_alias", default=None)
+
+_health = {}
+
+
+def pin_key(user_id):
+    return f"db-primary-pin:{user_id}"
+
+
+def pin_to_primary(user):
+    """Send the user's reads to the primary for REPLICA_STICKY_SECONDS."""
+    cache.set(pin_key(user.pk), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned(user):
+    return user.is_authenticated and cache.get(pin_key(user.pk), False)
+
+
+def snapshot_lag(alias):
+    path = settings.REPLICA_SNAPSHOT_PATHS.get(alias)
+    if path is None:
+        return 0
+    try:
+        return time.time() - os.path.getmtime(path)
+    except OSError:
+        return float("inf")
+
+
+def check_replica(alias):
+    if snapshot_lag(alias) > settings.REPLICA_MAX_LAG:
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except Exception:
+        return False
+    return True
+
+
+def replica_is_healthy(alias):
+    checked_at, healthy = _health.get(alias, (0, False))
+    if time.monotonic() - checked_at > settings.REPLICA_HEALTH_CHECK_INTERVAL:
+        healthy = check_replica(alias)
+        _health[alias] = (time.monotonic(), healthy)
+    return healthy
+
+
+def choose_read_alias(user):
+    """Pick a healthy replica, or None to read from the primary."""
+    if not settings.DATABASE_REPLICAS or is_pinned(user):
+        return None
+    replicas = [
+        alias for alias in settings.DATABASE_REPLICAS if replica_is_healthy(alias)
+    ]
+    return random.choice(replicas) if replicas else None
+
+
+class ReplicaRouter:
+    """
+    Send reads of replica-enabled views to a read replica and everything
+    else, including all writes, to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
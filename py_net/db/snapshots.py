@@ -0,0 +1,26 @@
+import os
+import sqlite3
+
+from django.conf import settings
+
+
+def snapshot_database(source_path, target_path):
+    """Copy a live SQLite database into `target_path` with the online backup API."""
+    temp_path = f"{target_path}.tmp"
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(temp_path)
+    try:
+        source.backup(target)
+        # Read-only connections cannot open a WAL database without its -shm file.
+        target.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        target.close()
+        source.close()
+    os.replace(temp_path, target_path)
+
+
+def snapshot_replicas():
+    source_path = settings.DATABASES["default"]["NAME"]
+    for path in settings.REPLICA_SNAPSHOT_PATHS.values():
+        snapshot_database(source_path, path)
+    return list(settings.REPLICA_SNAPSHOT_PATHS)
@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class HideDeletedMixin:
+    """
+    Manager mixin leaving out rows marked with `deleted_at`. Foreign key
+    access and cascades go through `_base_manager`, which still sees them.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class LiveManager(HideDeletedMixin, models.Manager):
+    pass
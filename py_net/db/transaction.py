@@ -0,0 +1,26 @@
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+@contextmanager
+def atomic_immediate(using=None):
+    """
+    Like `transaction.atomic`, but take SQLite's write lock at BEGIN.
+
+    A deferred transaction that reads first and writes later has to upgrade
+    its lock, and that upgrade fails with "database is locked" without
+    waiting for busy_timeout. Starting with BEGIN IMMEDIATE makes concurrent
+    writers queue up instead. Nested blocks and other backends fall back to
+    a plain atomic block.
+    """
+    connection = transaction.get_connection(using)
+    supported = hasattr(connection, "next_transaction_mode")
+    if supported and not connection.in_atomic_block:
+        connection.next_transaction_mode = "IMMEDIATE"
+    try:
+        with transaction.atomic(using=using):
+            yield
+    finally:
+        if supported:
+            connection.next_transaction_mode = None
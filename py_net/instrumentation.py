@@ -0,0 +1,132 @@
+"""
+Always-on request instrumentation: SQL, serializer and view time per
+request, aggregated into per-endpoint histograms in Prometheus text format.
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.http import HttpResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+current_timings = contextvars.ContextVar("current_timings", default=None)
+
+
+class RequestTimings:
+    __slots__ = ("db_time", "db_queries", "serializer_time", "serializer_depth")
+
+    def __init__(self):
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """`connection.execute_wrapper` hook that times every query."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.db_queries += 1
+
+
+class Histogram:
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.series = defaultdict(lambda: [[0] * (len(buckets) + 1), 0.0, 0])
+        self.lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self.lock:
+            counts, _, _ = series = self.series[labels]
+            counts[bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            items = [
+                (labels, list(counts), total, count)
+                for labels, (counts, total, count) in sorted(self.series.items())
+            ]
+        for labels, counts, total, count in items:
+            label_text = ",".join(f'{key}="{value}"' for key, value in labels)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}'
+                )
+            lines.append(f"{self.name}_sum{{{label_text}}} {total}")
+            lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return "\n".join(lines)
+
+
+REQUEST_DURATION = Histogram(
+    "pynet_request_duration_seconds", "Time spent in the view.", DURATION_BUCKETS
+)
+DB_DURATION = Histogram(
+    "pynet_db_duration_seconds", "Time spent running SQL.", DURATION_BUCKETS
+)
+SERIALIZER_DURATION = Histogram(
+    "pynet_serializer_duration_seconds",
+    "Time spent building serializer output.",
+    DURATION_BUCKETS,
+)
+DB_QUERIES = Histogram("pynet_db_queries", "SQL queries per request.", QUERY_BUCKETS)
+HISTOGRAMS = (REQUEST_DURATION, DB_DURATION, SERIALIZER_DURATION, DB_QUERIES)
+
+
+def record(endpoint, method, view_time, timings):
+    labels = (("endpoint", endpoint), ("method", method))
+    REQUEST_DURATION.observe(labels, view_time)
+    DB_DURATION.observe(labels, timings.db_time)
+    SERIALIZER_DURATION.observe(labels, timings.serializer_time)
+    DB_QUERIES.observe(labels, timings.db_queries)
+
+
+def render_metrics():
+    return "\n".join(histogram.render() for histogram in HISTOGRAMS) + "\n"
+
+
+def timed_serialization(build, *args):
+    """
+    Call `build(*args)`, counting its time as the request's serializer time.
+    The list mixins time building their data with it and the renderers time
+    encoding it; a call inside another is counted once.
+    """
+    timings = current_timings.get()
+    if timings is None or timings.serializer_depth:
+        return build(*args)
+    timings.serializer_depth += 1
+    start = time.perf_counter()
+    try:
+        return build(*args)
+    finally:
+        timings.serializer_time += time.perf_counter() - start
+        timings.serializer_depth -= 1
+
+
+class MetricsView(APIView):
+    """Prometheus scrape endpoint, staff only."""
+
+    permission_classes = (IsAdminUser,)
+    schema = None
+
+    def get(self, request):
+        return HttpResponse(
+            render_metrics(), content_type="text/plain; version=0.0.4"
+        )
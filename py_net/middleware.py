@@ -0,0 +1,72 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from py_net import instrumentation
+from py_net.db.routers import pin_to_primary
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def pin_after_write(user, method, status_code):
+    """Pin `user` to the primary if a `method` request succeeded in writing."""
+    if (
+        settings.DATABASE_REPLICAS
+        and method not in SAFE_METHODS
+        and status_code < 400
+        and user is not None
+        and user.is_authenticated
+    ):
+        pin_to_primary(user)
+
+
+class PrimaryPinMiddleware:
+    """
+    After a successful write, keep the user's reads on the primary for a while.
+    Views that pin per write themselves set `skip_primary_pin` on the response.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not getattr(response, "skip_primary_pin", False):
+            user = getattr(request, "user", None)
+            pin_after_write(user, request.method, response.status_code)
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Report SQL, serializer and view time in a `Server-Timing` header and
+    feed them into the per-endpoint histograms served at /api/metrics/.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = instrumentation.RequestTimings()
+        token = instrumentation.current_timings.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                start = time.perf_counter()
+                response = self.get_response(request)
+                view_time = time.perf_counter() - start
+        finally:
+            instrumentation.current_timings.reset(token)
+
+        match = request.resolver_match
+        endpoint = match.view_name if match else "unresolved"
+        instrumentation.record(endpoint, request.method, view_time, timings)
+        response["Server-Timing"] = (
+            f'db;dur={timings.db_time * 1000:.1f};desc="{timings.db_queries} '
+            f'queries", serializer;dur={timings.serializer_time * 1000:.1f}, '
+            f"view;dur={view_time * 1000:.1f}"
+        )
+        return response
@@ -0,0 +1,93 @@
+"""
+The OpenAPI schema is generated by `manage.py build_schema` into
+`schema/openapi.yaml`, next to `schema/openapi.version`, the hash of that
+content; both are committed and served from memory, with the hash as ETag.
+Only a schema change moves the version; `build_schema --check` catches drift
+from the code. If the file is missing or does not match its version, the
+schema is generated in memory instead; requests never write to the tree.
+"""
+import hashlib
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import condition, require_safe
+
+SCHEMA_CONTENT_TYPE = "application/vnd.oai.openapi; charset=utf-8"
+
+
+def schema_version(content):
+    """Hash of the rendered schema."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def drop_shadowed_endpoints(endpoints, **kwargs):
+    """Leave out routes an earlier URL pattern always answers first."""
+    seen = set()
+    kept = []
+    for endpoint in endpoints:
+        path, _, method, _ = endpoint
+        key = (re.sub(r"{[^}]+}", "{}", path), method)
+        if key not in seen:
+            seen.add(key)
+            kept.append(endpoint)
+    return kept
+
+
+def version_path():
+    return settings.SCHEMA_PATH.with_suffix(".version")
+
+
+def generate_schema():
+    from drf_spectacular.generators import SchemaGenerator
+    from drf_spectacular.renderers import OpenApiYamlRenderer
+
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    return OpenApiYamlRenderer().render(schema, renderer_context={})
+
+
+def build_schema():
+    """Regenerate the schema file and stamp it with its version."""
+    content = generate_schema()
+    settings.SCHEMA_PATH.parent.mkdir(parents=True, exist_ok=True)
+    settings.SCHEMA_PATH.write_bytes(content)
+    version_path().write_text(schema_version(content))
+    return content
+
+
+def committed_schema():
+    """The schema file if it matches its version, else None."""
+    try:
+        content = settings.SCHEMA_PATH.read_bytes()
+        committed_version = version_path().read_text().strip()
+    except FileNotFoundError:
+        return None
+    return content if schema_version(content) == committed_version else None
+
+
+@lru_cache(maxsize=None)
+def load_schema():
+    """Return `(content, etag)`, generating the schema if the file is unusable."""
+    content = committed_schema() or generate_schema()
+    return content, f'"{schema_version(content)[:32]}"'
+
+
+@require_safe
+@condition(etag_func=lambda request: load_schema()[1])
+def schema_view(request):
+    response = HttpResponse(load_schema()[0], content_type=SCHEMA_CONTENT_TYPE)
+    response["Cache-Control"] = "public, max-age=300"
+    return response
+
+
+@lru_cache(maxsize=None)
+def _swagger_view():
+    from drf_spectacular.views import SpectacularSwaggerView
+
+    return SpectacularSwaggerView.as_view(url_name="schema")
+
+
+def swagger_view(request, *args, **kwargs):
+    """Swagger UI; drf_spectacular's views are only imported on first use."""
+    return _swagger_view()(request, *args, **kwargs)
@@ -33,16 +33,33 @@ ALLOWED_HOSTS = []
 
 # Application definition
 
+# Which process this is: "api" (web workers), "worker" (Celery workers),
+# "beat" (Celery beat) or "all" (development, migrations, tests). Each role
+# installs only the apps and middleware it uses, so workers boot faster.
+PY_NET_ROLE = os.getenv("PY_NET_ROLE", "all")
+PY_NET_ROLES = ("all", "api", "worker", "beat")
+if PY_NET_ROLE not in PY_NET_ROLES:
+    raise ValueError(f"PY_NET_ROLE must be one of {PY_NET_ROLES}")
+SERVES_HTTP = PY_NET_ROLE in ("all", "api")
+DEBUG_TOOLBAR = DEBUG and SERVES_HTTP
+
 INSTALLED_APPS = [
-    "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
-    "django.contrib.sessions",
-    "django.contrib.messages",
-    "django.contrib.staticfiles",
-    "drf_spectacular",
-    "django_celery_beat",
-    "debug_toolbar",
+]
+if SERVES_HTTP:
+    INSTALLED_APPS += [
+        "django.contrib.admin",
+        "django.contrib.sessions",
+        "django.contrib.messages",
+        "django.contrib.staticfiles",
+        "drf_spectacular",
+    ]
+if PY_NET_ROLE in ("all", "beat"):
+    INSTALLED_APPS.append("django_celery_beat")
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS.append("debug_toolbar")
+INSTALLED_APPS += [
     "rest_framework",
     "app",
     "user",
@@ -50,6 +67,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "py_net.middleware.ServerTimingMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -57,9 +75,14 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "py_net.middleware.PrimaryPinMiddleware",
 ]
+if not DEBUG_TOOLBAR:
+    MIDDLEWARE.remove("debug_toolbar.middleware.DebugToolbarMiddleware")
 
-ROOT_URLCONF = "py_net.urls"
+# Celery runs the system checks at boot, and those import the URLconf. Workers
+# serve no HTTP, so they get an empty one instead of every view and serializer.
+ROOT_URLCONF = "py_net.urls" if SERVES_HTTP else "py_net.urls_headless"
 
 TEMPLATES = [
     {
@@ -80,17 +103,63 @@ TEMPLATES = [
 AUTH_USER_MODEL = "user.User"
 
 WSGI_APPLICATION = "py_net.wsgi.application"
+ASGI_APPLICATION = "py_net.asgi.application"
+
+# Async views (app.async_views) run independent queries of a request at the
+# same time, each in a worker thread with its own connection. Off, they run
+# one after another on the request's thread, as tests need to see their data.
+ASYNC_PARALLEL_READS = os.getenv("ASYNC_PARALLEL_READS", "True") == "True"
+
+# Post, comment and profile lists are built from values() rows by
+# app.fast_read rather than by their serializers. Off, the serializers run.
+FAST_LIST_READS = os.getenv("FAST_LIST_READS", "True") == "True"
+
+# Processes app.provisioning hashes passwords in (default: one per CPU).
+PROVISIONING_WORKERS = int(os.getenv("PROVISIONING_WORKERS", "0")) or os.cpu_count()
 
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "py_net.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "600")),
+        "OPTIONS": {
+            "timeout": 20,
+        },
     }
 }
 
+# Read replicas for feed, profile and search reads. Locally they are SQLite
+# snapshots of the primary refreshed by `manage.py snapshot_replicas`:
+# DB_REPLICA_PATHS = /var/lib/py_net/replica1.sqlite3,/var/lib/py_net/replica2.sqlite3
+REPLICA_SNAPSHOT_PATHS = {
+    f"replica{number}": path
+    for number, path in enumerate(
+        filter(None, os.getenv("DB_REPLICA_PATHS", "").split(",")), start=1
+    )
+}
+
+for alias, path in REPLICA_SNAPSHOT_PATHS.items():
+    DATABASES[alias] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": f"file:{path}?mode=ro",
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_REPLICAS = list(REPLICA_SNAPSHOT_PATHS)
+
+DATABASE_ROUTERS = ["py_net.db.routers.ReplicaRouter"]
+
+# Reads fall back to the primary when a snapshot is older than this.
+REPLICA_MAX_LAG = int(os.getenv("DB_REPLICA_MAX_LAG", "60"))
+
+REPLICA_HEALTH_CHECK_INTERVAL = 5
+
+# Read-your-writes: a user's reads stay on the primary this long after a write.
+REPLICA_STICKY_SECONDS = 5
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -137,6 +206,19 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 MEDIA_URL = "/media/"
 
+# Personal data archives, kept apart from media so that they are only served
+# to their owner, and deleted once they are EXPORT_MAX_AGE old.
+EXPORT_ROOT = BASE_DIR / "exports"
+
+EXPORT_MAX_AGE = timedelta(days=1)
+
+# Hand media downloads off to the front proxy instead of streaming them
+# from Django: nginx internal location prefix for X-Accel-Redirect,
+# or X-Sendfile for Apache/lighttpd.
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX")
+
+MEDIA_SENDFILE = os.getenv("MEDIA_SENDFILE", "False") == "True"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
 
@@ -152,6 +234,17 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "app.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+        "app.renderers.MessagePackRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "app.renderers.ORJSONParser",
+        "app.renderers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 SIMPLE_JWT = {
@@ -161,6 +254,9 @@ SIMPLE_JWT = {
     "AUTH_HEADER_NAME": "HTTP_AUTHORIZATION",
 }
 
+# Prebuilt by `manage.py build_schema`; generated in memory if the code changed since.
+SCHEMA_PATH = BASE_DIR / "schema" / "openapi.yaml"
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Social Media API",
     "DESCRIPTION": "The API allow users to create profiles,"
@@ -169,6 +265,7 @@ SPECTACULAR_SETTINGS = {
                    " and perform basic social media actions.",
     "VERSION": "1.0.0",
     "SERVE_INCLUDE_SCHEMA": False,
+    "PREPROCESSING_HOOKS": ["py_net.schema.drop_shadowed_endpoints"],
     "SWAGGER_UI_SETTINGS": {
         "deepLinking": True,
         "defaultModelRendering": "model",
@@ -179,6 +276,44 @@ SPECTACULAR_SETTINGS = {
 
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND")
+if not CELERY_BROKER_URL and PY_NET_ROLE != "all":
+    raise ValueError(f"PY_NET_ROLE={PY_NET_ROLE} needs CELERY_BROKER_URL")
+# Tasks run inline only when asked to, or on a brokerless "all" process
+# (tests, local runs); a deployed role never silently does the work itself.
+CELERY_TASK_ALWAYS_EAGER = (
+    os.getenv("CELERY_TASK_ALWAYS_EAGER", str(not CELERY_BROKER_URL)) == "True"
+)
 CELERY_TIMEZONE = "Europe/Kiev"
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
+CELERY_BEAT_SCHEDULE = {
+    "publish-due-posts": {
+        "task": "app.tasks.publish_due_posts",
+        "schedule": timedelta(seconds=30),
+    },
+    "deliver-notifications": {
+        "task": "app.tasks.deliver_notifications",
+        "schedule": timedelta(minutes=1),
+    },
+    "roll-up-trending": {
+        "task": "app.tasks.roll_up_trending",
+        "schedule": timedelta(minutes=1),
+    },
+    "compact-engagement-buckets": {
+        "task": "app.tasks.compact_engagement_buckets",
+        "schedule": timedelta(hours=1),
+    },
+    "collect-media-garbage": {
+        "task": "app.tasks.collect_media_garbage",
+        "schedule": timedelta(hours=6),
+    },
+    "delete-old-exports": {
+        "task": "app.tasks.delete_old_exports",
+        "schedule": timedelta(hours=1),
+    },
+}
+if REPLICA_SNAPSHOT_PATHS:
+    CELERY_BEAT_SCHEDULE["refresh-replica-snapshots"] = {
+        "task": "app.tasks.refresh_replica_snapshots",
+        "schedule": timedelta(seconds=REPLICA_MAX_LAG // 2),
+    }
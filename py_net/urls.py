@@ -14,20 +14,28 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from django.urls import path, include, re_path
+
+from app.media import serve_media
+from py_net.batch import BatchView
+from py_net.instrumentation import MetricsView
+from py_net.schema import schema_view, swagger_view
 
 urlpatterns = [
                   path("admin/", admin.site.urls),
                   path("api/", include("app.urls", namespace="app")),
-                  path("__debug__/", include("debug_toolbar.urls")),
                   path("api/user/", include("user.urls", namespace="user")),
-                  path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
-                  path(
-                      "api/doc/swagger/",
-                      SpectacularSwaggerView.as_view(url_name="schema"),
-                      name="swagger-ui",
+                  path("api/batch/", BatchView.as_view(), name="batch"),
+                  path("api/metrics/", MetricsView.as_view(), name="metrics"),
+                  path("api/schema/", schema_view, name="schema"),
+                  path("api/doc/swagger/", swagger_view, name="swagger-ui"),
+                  re_path(
+                      r"^%s(?P<path>.*)$" % settings.MEDIA_URL.lstrip("/"),
+                      serve_media,
+                      name="media",
                   ),
-              ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+              ]
+
+if settings.DEBUG_TOOLBAR:
+    urlpatterns.append(path("__debug__/", include("debug_toolbar.urls")))
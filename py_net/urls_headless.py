@@ -0,0 +1,3 @@
+"""URLconf of the Celery roles, which serve no HTTP requests."""
+
+urlpatterns = []
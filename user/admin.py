@@ -2,11 +2,12 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from django.utils.translation import gettext as _
 
+from app.admin import ScheduledDeletionMixin
 from .models import User
 
 
 @admin.register(User)
-class UserAdmin(DjangoUserAdmin):
+class UserAdmin(ScheduledDeletionMixin, DjangoUserAdmin):
     """Define admin model for custom User model with no email field."""
 
     fieldsets = (
@@ -2,8 +2,10 @@ from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 from django.utils.translation import gettext as _
 
+from py_net.db.soft_delete import HideDeletedMixin
 
-class UserManager(BaseUserManager):
+
+class UserManager(HideDeletedMixin, BaseUserManager):
     """Define a model manager for User model with no username field."""
 
     use_in_migrations = True
@@ -40,8 +42,11 @@ class UserManager(BaseUserManager):
 class User(AbstractUser):
     username = None
     email = models.EmailField(_("email address"), unique=True)
+    # Set by app.deletion.schedule_deletion(); the row goes once purged.
+    deleted_at = models.DateTimeField(blank=True, null=True, editable=False)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
     objects = UserManager()
+    all_objects = models.Manager()
@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model, authenticate
 from django.utils.translation import gettext as _
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -8,7 +9,15 @@ class UserSerializer(serializers.ModelSerializer):
         model = get_user_model()
         fields = ("id", "email", "password", "is_staff")
         read_only_fields = ("id", "is_staff")
-        extra_kwargs = {"password": {"write_only": True, "min_length": 5}}
+        extra_kwargs = {
+            "password": {"write_only": True, "min_length": 5},
+            # Accounts scheduled for deletion keep their email until the purge.
+            "email": {
+                "validators": [
+                    UniqueValidator(queryset=get_user_model().all_objects.all())
+                ]
+            },
+        }
 
     def create(self, validated_data):
         """Create a new user with encrypted password and return it"""
@@ -5,7 +5,7 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
-from user.views import CreateUserView, ManageUserView
+from user.views import CreateUserView, ManageUserView, ProvisionUsersView
 
 urlpatterns = [
     path("register/", CreateUserView.as_view(), name="create"),
@@ -13,6 +13,7 @@ urlpatterns = [
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", TokenVerifyView.as_view(), name="token_verify"),
     path("me/", ManageUserView.as_view(), name="manage"),
+    path("provision/", ProvisionUsersView.as_view(), name="provision"),
 ]
 
 app_name = "user"
@@ -1,6 +1,15 @@
+from drf_spectacular.utils import extend_schema
 from rest_framework import generics
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from app.deletion import schedule_deletion
+from app.provisioning import (
+    ProvisionReportSerializer,
+    ProvisionSerializer,
+    Provisioning,
+)
 from user.serializers import UserSerializer
 
 
@@ -8,9 +17,29 @@ class CreateUserView(generics.CreateAPIView):
     serializer_class = UserSerializer
 
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = UserSerializer
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
         return self.request.user
+
+    def perform_destroy(self, instance):
+        schedule_deletion(instance, instance)
+
+
+class ProvisionUsersView(APIView):
+    """
+    Staff endpoint to create many accounts, with optional profiles, at once.
+    Emails that already exist are counted, not failed, so a partly applied
+    request can be sent again.
+    """
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(request=ProvisionSerializer, responses=ProvisionReportSerializer)
+    def post(self, request):
+        serializer = ProvisionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        provisioning = Provisioning(workers=1)
+        return Response(provisioning.run(serializer.validated_data["users"]))